@@ -4,3 +4,20 @@ import pytest
 @pytest.fixture(autouse=True)
 def disable_rate_limiting(settings):
     settings.RATELIMIT_ENABLE = False
+
+
+@pytest.fixture(autouse=True)
+def write_through_activity(settings):
+    # Sem thread de flush nos testes: a atividade é gravada na hora, dentro da transação do teste
+    settings.ACTIVITY_FLUSH_INTERVAL = 0
+
+
+@pytest.fixture(autouse=True)
+def clear_response_caches():
+    from django.core.cache import cache  # noqa: PLC0415
+
+    from myapi.users.cache import user_response_cache  # noqa: PLC0415
+
+    user_response_cache.clear()
+    # Janelas de coalescência de email (e contadores de rate limit) não vazam entre testes
+    cache.clear()
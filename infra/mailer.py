@@ -1,13 +1,116 @@
-from django.core.mail import send_mail
+import threading
+import time
 
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from loguru import logger
 
-def send_message(mailOptions):
+
+class ConnectionPool:
+    """
+    Pool de conexões de email já abertas (SMTP: conectado, STARTTLS e AUTH feitos).
+
+    Evita refazer handshake TLS e autenticação a cada email. No máximo
+    EMAIL_POOL_SIZE conexões em uso ao mesmo tempo; quem pede além disso espera.
+    Conexões ociosas há mais de EMAIL_POOL_IDLE_TIMEOUT segundos são fechadas
+    (servidores como o Gmail derrubam clientes parados) e as que ficaram paradas
+    mais de EMAIL_POOL_HEALTHCHECK_AFTER segundos passam por um NOOP antes de voltar
+    a ser usadas.
     """
-    Envia email usando Django mail backend
+
+    def __init__(self, size=None):
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle = []  # (conexão, backend, último uso)
+        self._slots = None
+
+    @staticmethod
+    def _setting(name, default):
+        return getattr(settings, name, default)
+
+    def _get_slots(self):
+        with self._lock:
+            if self._slots is None:
+                self._slots = threading.BoundedSemaphore(self.size or self._setting('EMAIL_POOL_SIZE', 4))
+            return self._slots
+
+    def checkout(self):
+        """Conexão aberta e saudável, reaproveitada do pool sempre que possível."""
+        self._get_slots().acquire()
+        try:
+            return self._reuse() or self._open()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, connection, broken=False):
+        """Devolve a conexão ao pool; `broken` a descarta (ex.: erro no meio de um envio)."""
+        try:
+            if broken:
+                self._close(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, settings.EMAIL_BACKEND, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def _reuse(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, backend, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if backend != settings.EMAIL_BACKEND or idle_for > self._setting('EMAIL_POOL_IDLE_TIMEOUT', 60):
+                self._close(connection)
+            elif idle_for <= self._setting('EMAIL_POOL_HEALTHCHECK_AFTER', 10) or self._is_alive(connection):
+                return connection
+            else:
+                self._close(connection)
+
+    @staticmethod
+    def _open():
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        return connection
+
+    @staticmethod
+    def _is_alive(connection):
+        # Só o backend SMTP tem socket; os demais (locmem, console) estão sempre "vivos"
+        smtp = getattr(connection, 'connection', None)
+        if smtp is None:
+            return not hasattr(connection, 'connection')
+        try:
+            return smtp.noop()[0] == 250  # noqa: PLR2004
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            # Conexão já derrubada pelo servidor; não há o que fechar
+            pass
+
+
+pool = ConnectionPool()
+
+
+def build_message(mailOptions, connection=None):
+    """
+    Monta o EmailMultiAlternatives de um mailOptions
 
     mailOptions deve conter:
     - subject: str
-    - body: str (HTML ou plain text)
+    - body: str (plain text; sem `html`, é enviado também como HTML)
+    - html: str (opcional, alternativa HTML)
     - from: str (seu-email@gmail.com)
     - to: list ou str (destinatários)
     """
@@ -15,17 +118,68 @@ def send_message(mailOptions):
     # Garantir que 'to' seja uma lista
     to_list = mailOptions['to'] if isinstance(mailOptions['to'], list) else [mailOptions['to']]
 
+    message = EmailMultiAlternatives(
+        subject=mailOptions['subject'],
+        body=mailOptions['body'],
+        from_email=mailOptions['from'],
+        to=to_list,
+        connection=connection,
+    )
+    message.attach_alternative(mailOptions.get('html') or mailOptions['body'], 'text/html')  # Para HTML
+    return message
+
+
+def send_message(mailOptions, connection=None):
+    """
+    Envia email usando Django mail backend, por uma conexão do pool (ou pela
+    `connection` informada).
+    """
+    if connection is None:
+        return send_batch([mailOptions], raise_errors=True)[0] is None
+
+    message = build_message(mailOptions, connection)
     try:
-        send_mail(
-            subject=mailOptions['subject'],
-            message=mailOptions['body'],
-            from_email=mailOptions['from'],
-            recipient_list=to_list,
-            fail_silently=False,
-            html_message=mailOptions['body'],  # Para HTML
-        )
-        print(f'Email enviado com sucesso para {", ".join(to_list)}')
+        message.send(fail_silently=False)
+        # Caminho quente (lotes de campanha): debug e sem o endereço do destinatário
+        logger.debug('Email sent')
         return True
     except Exception as e:
-        print(f'Erro ao enviar email: {e}')
+        # Quem chamou decide o que fazer com a falha (send_batch/outbox registram o erro)
+        logger.debug(f'Failed to send email: {e}')
         raise
+
+
+def send_batch(messages, raise_errors=False):
+    """
+    Envia vários mailOptions pela mesma conexão do pool.
+
+    Devolve uma lista alinhada com `messages`: None para enviado ou a exceção
+    da falha. Depois de um erro a conexão é descartada e as mensagens seguintes
+    usam outra; se nem abrir uma conexão for possível, as restantes falham com
+    esse erro. Com `raise_errors`, a primeira falha é relançada.
+    """
+    results = []
+    connection = None
+    try:
+        for mailOptions in messages:
+            if connection is None:
+                try:
+                    connection = pool.checkout()
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    results.extend([e] * (len(messages) - len(results)))
+                    break
+            try:
+                send_message(mailOptions, connection=connection)
+                results.append(None)
+            except Exception as e:
+                pool.checkin(connection, broken=True)
+                connection = None
+                if raise_errors:
+                    raise
+                results.append(e)
+    finally:
+        if connection is not None:
+            pool.checkin(connection)
+    return results
@@ -0,0 +1,117 @@
+"""
+Servidor SMTP local que aceita e descarta tudo (asyncio), para testes e benchmarks do mailer.
+
+Fala o mínimo do protocolo que o backend SMTP do Django usa sem TLS/AUTH
+(EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) e conta conexões e mensagens.
+`latency` simula o tempo de ida e volta de um servidor remoto em cada comando.
+
+Uso avulso: python infra/smtp_sink.py --port 1025 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import threading
+
+
+class SMTPSink:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.connections = 0
+        self.messages = 0
+        self._writers = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    async def _reply(self, writer, line):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(f'{line}\r\n'.encode())
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            await self._reply(writer, '220 sink ESMTP')
+            while line := await reader.readline():
+                command = line.decode(errors='replace').strip().upper()
+                if command.startswith('EHLO'):
+                    await self._reply(writer, '250 sink')
+                elif command == 'DATA':
+                    await self._reply(writer, '354 End data with <CR><LF>.<CR><LF>')
+                    while (await reader.readline()) not in {b'.\r\n', b''}:
+                        pass
+                    self.messages += 1
+                    await self._reply(writer, '250 OK queued')
+                elif command == 'QUIT':
+                    await self._reply(writer, '221 Bye')
+                    break
+                else:
+                    # HELO, MAIL, RCPT, RSET, NOOP
+                    await self._reply(writer, '250 OK')
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _serve(self, ready):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    def _call(self, function):
+        """Executa `function` no loop do servidor e espera terminar."""
+        done = threading.Event()
+
+        def run():
+            function()
+            done.set()
+
+        self._loop.call_soon_threadsafe(run)
+        done.wait()
+
+    def start(self):
+        """Sobe o servidor numa thread própria; devolve a porta."""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete, args=(self._serve(ready),), daemon=True, name='smtp-sink'
+        )
+        self._thread.start()
+        ready.wait()
+        return self.port
+
+    def drop_connections(self):
+        """Derruba as conexões abertas, como um servidor que expira clientes ociosos."""
+        self._call(lambda: [writer.close() for writer in list(self._writers)])
+
+    def stop(self):
+        if self._server is not None:
+            self.drop_connections()
+            self._call(self._server.close)
+            self._thread.join(timeout=5)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.latency)
+    sink.start()
+    print(f'SMTP sink em {args.host}:{sink.port} (Ctrl+C para sair)')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f'{sink.connections} conexões, {sink.messages} mensagens')
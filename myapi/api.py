@@ -1,8 +1,8 @@
-from ninja import NinjaAPI
-
 from myapi.core.exceptions import APIException
+from myapi.core.renderers import NegotiatingNinjaAPI
 
-api = NinjaAPI()
+# Responde em JSON ou MessagePack conforme o header Accept
+api = NegotiatingNinjaAPI()
 
 
 @api.exception_handler(APIException)
@@ -0,0 +1,123 @@
+"""
+Registro de atividade dos usuários (last_login e last_seen) com write-behind.
+
+Login, refresh e /me só anotam o horário num dicionário em memória do
+processo (um por usuário: acessos repetidos entre dois flushes viram uma
+escrita só). Uma thread de fundo grava o acumulado a cada
+ACTIVITY_FLUSH_INTERVAL segundos com um único
+UPDATE ... FROM (VALUES ...) por lote, e o que sobrar é gravado no
+encerramento do processo (atexit). Com intervalo 0 a gravação é imediata.
+
+Os horários só avançam (GREATEST), então workers diferentes gravando fora de
+ordem não voltam o relógio de ninguém. A escrita não mexe em updated_at nem em
+version: atividade não invalida ETag nem cache de resposta. Se o processo
+morrer sem encerrar, os últimos segundos de atividade se perdem.
+"""
+
+import atexit
+import threading
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from loguru import logger
+
+# Linhas por UPDATE (3 parâmetros por linha, bem abaixo do limite do Postgres)
+FLUSH_BATCH_SIZE = 1000
+
+
+class ActivityBuffer:
+    def __init__(self, interval=None):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}  # user_id -> (last_login ou None, last_seen)
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def _get_interval(self):
+        return settings.ACTIVITY_FLUSH_INTERVAL if self.interval is None else self.interval
+
+    def touch(self, user_id, login=False):
+        """Anota acesso do usuário agora; `login` também atualiza last_login."""
+        now = timezone.now()
+        with self._lock:
+            last_login = self._pending.get(user_id, (None, None))[0]
+            self._pending[user_id] = (now if login else last_login, now)
+        if not self._get_interval():
+            self.flush()
+        elif self._thread is None:
+            self._start()
+
+    def flush(self):
+        """Grava o acumulado; devolve quantos usuários foram gravados."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = iter(pending.items())
+        try:
+            while batch := list(islice(rows, FLUSH_BATCH_SIZE)):
+                self._write(batch)
+        except Exception as e:
+            logger.error(f'Failed to write activity of {len(pending)} users: {e}')
+            self._requeue(pending)
+            return 0
+        return len(pending)
+
+    def stop(self):
+        """Para a thread de fundo e grava o que restou."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.flush()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='activity-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self._get_interval()):
+            # Como num request: descarta a conexão da thread se caiu ou passou do CONN_MAX_AGE
+            close_old_connections()
+            self.flush()
+        close_old_connections()
+
+    def _requeue(self, pending):
+        # Falhou a escrita: devolve ao buffer sem sobrescrever acessos mais novos
+        with self._lock:
+            for user_id, (last_login, last_seen) in pending.items():
+                newer_login, newer_seen = self._pending.get(user_id, (None, None))
+                self._pending[user_id] = (newer_login or last_login, newer_seen or last_seen)
+
+    @staticmethod
+    def _write(batch):
+        opts = get_user_model()._meta
+        qn = connection.ops.quote_name
+        pk, last_login, last_seen = (qn(opts.get_field(name).column) for name in ('id', 'last_login', 'last_seen'))
+        values = ', '.join(['(%s::uuid, %s::timestamptz, %s::timestamptz)'] * len(batch))
+        params = [value for user_id, times in batch for value in (user_id, *times)]
+        with connection.cursor() as cursor:
+            # GREATEST ignora NULL: sem login no buffer, last_login fica como está
+            cursor.execute(
+                f'UPDATE {qn(opts.db_table)} AS u '
+                f'SET {last_login} = GREATEST(u.{last_login}, v.last_login), '
+                f'{last_seen} = GREATEST(u.{last_seen}, v.last_seen) '
+                f'FROM (VALUES {values}) AS v (id, last_login, last_seen) '
+                f'WHERE u.{pk} = v.id',
+                params,
+            )
+
+
+buffer = ActivityBuffer()
+atexit.register(buffer.stop)
+
+
+def touch(user, login=False):
+    buffer.touch(user.id, login=login)
@@ -14,7 +14,7 @@ class SocialAccountAdapter(DefaultSocialAccountAdapter):
         user = sociallogin.user
         if picture and user and user.pk and user.avatar_url != picture:
             user.avatar_url = picture
-            user.save(update_fields=['avatar_url'])
+            user.save(update_fields=['avatar_url', 'updated_at'])
 
     def populate_user(self, request, sociallogin, data):
         """
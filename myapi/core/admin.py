@@ -1,2 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
 
-# Register your models here.
+from .models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'to', 'status', 'attempts', 'available_at', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('attempts', 'last_error', 'created_at')
+    actions = ['requeue']
+
+    @admin.action(description='Reenfileirar mensagens selecionadas')
+    def requeue(self, request, queryset):
+        # Mensagens mortas (dead letter) voltam para a fila com as tentativas zeradas
+        count = queryset.update(
+            status=OutboxMessage.Status.PENDING, attempts=0, available_at=timezone.now(), last_error=''
+        )
+        self.message_user(request, f'{count} mensagens reenfileiradas')
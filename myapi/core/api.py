@@ -7,10 +7,12 @@ from django.http import HttpResponse
 from loguru import logger
 from ninja import Router
 
-from .auth import clear_auth_cookies, create_token, set_auth_cookies, verify_refresh_token
+from . import activity
+from .auth import AdminAuth, clear_auth_cookies, create_token, set_auth_cookies, verify_refresh_token
+from .compression import compression_stats
 from .exceptions import ServiceError, UnauthorizedError
 from .ratelimit import check_rate_limit
-from .schemas import LoginRequest, MessageSchema, StatusSchema
+from .schemas import LoginRequest, MessageSchema, RouteCompressionSchema, StatusSchema
 
 router = Router(tags=['Admin'])
 
@@ -47,6 +49,17 @@ def status(request):
         raise ServiceError(message='Ocorreu um erro ao acessar o banco de dados ou executar uma query.')
 
 
+@router.get(
+    'compression-stats',
+    response=dict[str, RouteCompressionSchema],
+    summary='Compression stats',
+    description='Compression ratio and CPU time per route and encoding, for the worker that answers the request',
+    auth=AdminAuth(),
+)
+def get_compression_stats(request):
+    return compression_stats.snapshot()
+
+
 ##############
 # AUTH
 ##############
@@ -58,6 +71,7 @@ def login(request, response: HttpResponse, credentials: LoginRequest):
         logger.warning(f'Failed login attempt for username: {credentials.username}')
         raise UnauthorizedError()
     logger.info(f'User {user.username} (id={user.id}) logged in')
+    activity.touch(user, login=True)
     tokens = create_token(user)
     set_auth_cookies(response, tokens)
     return 200, {'message': 'Login realizado com sucesso'}
@@ -73,6 +87,7 @@ def refresh(request, response: HttpResponse):
         logger.warning('Failed refresh attempt with invalid refresh token')
         raise UnauthorizedError(message='Invalid or expired refresh token')
     logger.info(f'User {user.username} (id={user.id}) refreshed token')
+    activity.touch(user)
     tokens = create_token(user)
     set_auth_cookies(response, tokens)
     return 200, {'message': 'Token renovado com sucesso'}
@@ -93,6 +108,7 @@ def social_token(request, response: HttpResponse):
         raise UnauthorizedError(message='User is not authenticated')
     user = request.user
     logger.info(f'User {user.username} (id={user.id}) requested social token')
+    activity.touch(user, login=True)
     tokens = create_token(user)
     set_auth_cookies(response, tokens)
     return 200, {'message': 'Token gerado com sucesso'}
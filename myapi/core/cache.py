@@ -0,0 +1,110 @@
+"""
+Cache em memória (por processo) de respostas já serializadas.
+
+Cada entrada guarda os bytes prontos da resposta, com TTL próprio. O cache tem
+limite de memória (soma dos bytes armazenados) e de quantidade de entradas, com
+despejo LRU. O primeiro elemento da chave é o "dono" da entrada (ex.: id do
+usuário), o que permite invalidar todas as variantes de um recurso de uma vez.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+
+class CachedResponse(NamedTuple):
+    content: bytes
+    content_type: str
+    etag: str | None = None
+
+    def to_response(self) -> HttpResponse:
+        response = HttpResponse(self.content, content_type=self.content_type)
+        if self.etag:
+            response['ETag'] = self.etag
+        # O conteúdo foi negociado (JSON/MessagePack) na hora de ser cacheado
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+
+class ResponseCache:
+    def __init__(self, ttl=60, max_bytes=8 * 1024 * 1024, max_entries=10_000):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (CachedResponse, expires_at)
+        self._owners = {}  # owner -> set(keys)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self._metrics['misses'] += 1
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._metrics['expirations'] += 1
+                self._metrics['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics['hits'] += 1
+            return value
+
+    def set(self, key, value: CachedResponse, ttl=None):
+        size = len(value.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + (ttl or self.ttl))
+            self._owners.setdefault(key[0], set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._metrics['evictions'] += 1
+
+    def invalidate(self, owner):
+        with self._lock:
+            for key in self._owners.pop(owner, ()):
+                if key in self._entries:
+                    self._remove(key, drop_owner=False)
+                    self._metrics['invalidations'] += 1
+
+    def invalidate_many(self, owners):
+        for owner in owners:
+            self.invalidate(owner)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._owners.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._metrics['hits'] + self._metrics['misses']
+            return {
+                **self._metrics,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hit_rate': round(self._metrics['hits'] / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key, drop_owner=True):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value.content)
+        if drop_owner:
+            keys = self._owners.get(key[0])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._owners[key[0]]
@@ -0,0 +1,223 @@
+"""
+Codificadores de compressão de resposta (gzip, brotli, zstd) e métricas por rota.
+
+gzip usa apenas a stdlib e é o único que vem com as dependências do projeto.
+brotli e zstd são opcionais: só passam a ser negociados se os pacotes
+`brotli` / `zstandard` forem instalados à parte no ambiente.
+"""
+
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def compressor(self):
+        return GzipStream(self.level)
+
+
+class GzipStream:
+    """Compressão incremental: cada chunk é enviado com sync flush."""
+
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.compress(chunk) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality=4):
+        self.quality = quality
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.quality)
+
+    def compressor(self):
+        return BrotliStream(self.quality)
+
+
+class BrotliStream:
+    def __init__(self, quality):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.process(chunk) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ZstdEncoder:
+    name = 'zstd'
+
+    def __init__(self, level=3):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        return ZstdStream(self.level)
+
+
+class ZstdStream:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.compress(chunk) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_encoders():
+    """Encoders disponíveis, em ordem de preferência do servidor."""
+    encoders = []
+    if zstandard is not None:
+        encoders.append(ZstdEncoder())
+    if brotli is not None:
+        encoders.append(BrotliEncoder())
+    encoders.append(GzipEncoder())
+    return encoders
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Converte `gzip, br;q=0.8, *;q=0` em {'gzip': 1.0, 'br': 0.8, '*': 0.0}."""
+    accepted = {}
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def select_encoder(header: str, encoders):
+    """Escolhe o encoder com maior q-value; empates seguem a ordem do servidor."""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for encoder in encoders:
+        q = accepted.get(encoder.name, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoder, q
+    return best
+
+
+class CompressedBodyCache:
+    """
+    Cache LRU de corpos já comprimidos para payloads imutáveis (ex.: OpenAPI JSON).
+
+    A chave inclui o hash do corpo original, então uma mudança no schema gera
+    uma nova entrada em vez de servir bytes antigos.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path, encoding, content):
+        return path, encoding, hashlib.blake2b(content, digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CompressionStats:
+    """Acumula taxa de compressão e custo de CPU por rota (por processo)."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, raw_bytes, compressed_bytes, cpu_seconds, cached=False):
+        """key é a tupla (rota, encoding)."""
+        with self._lock:
+            stats = self._routes.setdefault(
+                key,
+                {'responses': 0, 'cached': 0, 'raw_bytes': 0, 'compressed_bytes': 0, 'cpu_seconds': 0.0},
+            )
+            stats['responses'] += 1
+            stats['cached'] += int(cached)
+            stats['raw_bytes'] += raw_bytes
+            stats['compressed_bytes'] += compressed_bytes
+            stats['cpu_seconds'] += cpu_seconds
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for (route, encoding), stats in self._routes.items():
+                ratio = stats['raw_bytes'] / stats['compressed_bytes'] if stats['compressed_bytes'] else 0.0
+                result[f'{route} [{encoding}]'] = {
+                    **stats,
+                    'ratio': round(ratio, 2),
+                    'cpu_ms_per_response': round(stats['cpu_seconds'] * 1000 / stats['responses'], 3),
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+compression_stats = CompressionStats()
+
+
+def timed_compress(encoder, content):
+    """Comprime e devolve (bytes, segundos de CPU da thread)."""
+    start = time.thread_time()
+    compressed = encoder.compress(content)
+    return compressed, time.thread_time() - start
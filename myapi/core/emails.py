@@ -0,0 +1,44 @@
+"""
+Emails a partir de templates Django.
+
+Cada email é um diretório `emails/<nome>/` com `subject.txt`, `body.txt` (texto
+puro) e `body.html`, procurado nos templates dos apps. Os três são compilados
+uma vez por processo (lru_cache), inclusive com DEBUG, em que o Django não usa o
+loader com cache; renderizar é só aplicar o contexto às árvores já compiladas.
+`render_many` renderiza um lote de destinatários sem reprocessar nada.
+
+O HTML passa pelo autoescape (nome do usuário, por exemplo, não injeta HTML);
+o texto é renderizado sem escape.
+"""
+
+from functools import lru_cache
+
+from django.template.loader import get_template
+
+PARTS = ('subject.txt', 'body.txt', 'body.html')
+
+
+@lru_cache(maxsize=None)
+def compiled(name):
+    """(assunto, texto, html) compilados do email `name`."""
+    return tuple(get_template(f'emails/{name}/{part}') for part in PARTS)
+
+
+def render_many(name, contexts, from_email, recipients):
+    """mailOptions (com texto e alternativa HTML) para cada par contexto/destinatário."""
+    subject, text, html = compiled(name)
+    return [
+        {
+            # Assunto em uma linha só: quebra de linha em cabeçalho é rejeitada pelo Django
+            'subject': ' '.join(subject.render(context).split()),
+            'body': text.render(context).strip() + '\n',
+            'html': html.render(context),
+            'from': from_email,
+            'to': recipient if isinstance(recipient, list) else [recipient],
+        }
+        for context, recipient in zip(contexts, recipients, strict=True)
+    ]
+
+
+def render(name, context, from_email, recipient):
+    return render_many(name, [context], from_email, [recipient])[0]
@@ -0,0 +1,88 @@
+"""Helpers de requests condicionais (ETag / If-None-Match / If-Match)."""
+
+import hashlib
+
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+from .renderers import wants_msgpack
+
+
+def make_etag(*parts) -> str:
+    """
+    ETag forte a partir das partes que identificam a versão do recurso.
+
+    O formato negociado (JSON ou MessagePack) entra no hash, já que cada
+    representação tem bytes diferentes.
+    """
+    digest = hashlib.blake2b('|'.join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def representation_etag(request, *parts) -> str:
+    return make_etag(*parts, 'msgpack' if wants_msgpack(request) else 'json')
+
+
+def _owner_tag(owner, media):
+    return hashlib.blake2b(f'{owner}|{media}'.encode(), digest_size=8).hexdigest()
+
+
+def version_etag(request, owner, version: int) -> str:
+    """
+    ETag de um recurso com coluna `version`.
+
+    A versão vai em claro (em vez de hash) para que o If-Match possa virar
+    direto um `UPDATE ... WHERE version = n`, sem ler a linha antes. O resto é
+    um hash do dono (ex.: id do usuário) e do formato: versões começam todas em
+    1, então sem o dono o ETag de um usuário valeria para outro.
+    """
+    return f'"{version}-{_owner_tag(owner, "msgpack" if wants_msgpack(request) else "json")}"'
+
+
+def if_match_versions(request, owner):
+    """
+    Versões aceitas pelo If-Match: None sem header ou com `*` (qualquer versão
+    do recurso existente), senão o conjunto de versões (vazio se nenhum ETag é
+    deste recurso).
+    """
+    header = request.headers.get('If-Match')
+    if not header:
+        return None
+    candidates = parse_etags(header)
+    if candidates == ['*']:
+        return None
+    tags = {_owner_tag(owner, media) for media in ('json', 'msgpack')}
+    versions = set()
+    for candidate in candidates:
+        # O CompressionMiddleware enfraquece o ETag das respostas comprimidas; a versão
+        # identifica os dados de qualquer forma, então W/ também é aceito aqui
+        version, _, tag = candidate.removeprefix('W/').removeprefix('"').removesuffix('"').partition('-')
+        if version.isdigit() and tag in tags:
+            versions.add(int(version))
+    return versions
+
+
+def etag_matches(request, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110, seção 13.1.2)."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if candidates == ['*']:
+        return True
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def not_modified(etag: str) -> HttpResponse:
+    response = HttpResponse(status=304)
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def private(response: HttpResponse) -> HttpResponse:
+    """Resposta que depende de quem está logado (cookie): nada de cache compartilhado."""
+    patch_cache_control(response, private=True)
+    patch_vary_headers(response, ['Cookie'])
+    return response
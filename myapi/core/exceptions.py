@@ -47,3 +47,15 @@ class UnauthorizedError(APIException):
 
     def __init__(self, message: str = 'Invalid credentials.', name: str = 'UnauthorizedError', status_code: int = 401):
         super().__init__(message, name, status_code)
+
+
+class PreconditionFailedError(APIException):
+    """Raised when a conditional request (If-Match) does not match the current resource version."""
+
+    def __init__(
+        self,
+        message: str = 'Resource was modified by another request.',
+        name: str = 'PreconditionFailedError',
+        status_code: int = 412,
+    ):
+        super().__init__(message, name, status_code)
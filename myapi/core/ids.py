@@ -0,0 +1,34 @@
+"""
+Geração de UUIDv7 (RFC 9562) para chaves primárias.
+
+Os 48 bits iniciais são o timestamp Unix em milissegundos, então ids novos
+caem sempre no fim do índice B-tree (sem page splits espalhados pela árvore
+como no uuid4). O restante (74 bits) é aleatório. Não há contador
+sub-milissegundo: alguns ids (tokens de ativação/reset) também circulam em
+links e não devem ser previsíveis. Os valores continuam sendo UUIDs comuns e
+convivem com os uuid4 já gravados.
+"""
+
+import os
+import time
+import uuid
+
+
+def uuid7(timestamp_ms=None):
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10))
+    rand_a = rand >> 68  # 12 bits
+    rand_b = rand & ((1 << 62) - 1)  # 62 bits
+
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76  # versão
+    value |= rand_a << 64
+    value |= 0b10 << 62  # variante RFC 9562
+    value |= rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7_timestamp_ms(value: uuid.UUID) -> int:
+    """Milissegundos Unix gravados em um UUIDv7."""
+    return value.int >> 80
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from infra import mailer
+from infra.smtp_sink import SMTPSink
+
+
+def mail_options(index):
+    return {
+        'subject': f'Bench {index}',
+        'body': '<p>Olá</p>',
+        'from': 'bench@myapi.com',
+        'to': [f'u{index}@bench.com'],
+    }
+
+
+def per_message(messages):
+    # Como o antigo send_mail: uma conexão (e handshake) por email
+    for options in messages:
+        mailer.build_message(options).send(fail_silently=False)
+
+
+def pooled_batch(messages):
+    mailer.send_batch(messages, raise_errors=True)
+
+
+STRATEGIES = {
+    'por email': per_message,
+    'pool/lote': pooled_batch,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara envio com uma conexão SMTP por email vs pool de conexões com envio em lote, '
+        'contra um servidor SMTP local (infra/smtp_sink.py) com latência simulada por comando.'
+    )
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument('--messages', type=int, default=500, help='Emails por estratégia (default: 500)')
+        parser.add_argument(
+            '--latency', type=float, default=0.005, help='Segundos por resposta do servidor (default: 0.005)'
+        )
+
+    def handle(self, *args, **options):
+        messages = [mail_options(index) for index in range(options['messages'])]
+        self.stdout.write(f'{len(messages)} emails, latência {options["latency"] * 1000:.1f}ms por comando\n')
+        self.stdout.write(f'{"estratégia":<12}{"emails/s":>12}{"conexões":>10}')
+        for name, send in STRATEGIES.items():
+            sink = SMTPSink(latency=options['latency'])
+            port = sink.start()
+            try:
+                with override_settings(
+                    EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                    EMAIL_HOST=sink.host,
+                    EMAIL_PORT=port,
+                    EMAIL_USE_TLS=False,
+                    EMAIL_HOST_USER='',
+                    EMAIL_HOST_PASSWORD='',
+                ):
+                    mailer.pool.close_all()
+                    started = time.perf_counter()
+                    send(messages)
+                    elapsed = time.perf_counter() - started
+                    mailer.pool.close_all()
+            finally:
+                sink.stop()
+            self.stdout.write(f'{name:<12}{len(messages) / elapsed:>12.0f}{sink.connections:>10}')
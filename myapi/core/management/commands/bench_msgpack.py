@@ -0,0 +1,64 @@
+import json
+import time
+import uuid
+
+import msgpack
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ninja.responses import NinjaJSONEncoder
+
+from myapi.core.renderers import MsgPackRenderer
+
+
+def fake_user(index):
+    return {
+        'id': uuid.uuid4(),
+        'username': f'user_{index}',
+        'first_name': 'First',
+        'last_name': f'Last {index}',
+        'email': f'user_{index}@example.com',
+        'is_active': index % 3 != 0,
+        'groups': [{'id': 1, 'name': 'customers', 'permissions': [1, 2, 3]}],
+        'avatar_url': None,
+        'get_full_name': f'First Last {index}',
+        'date_joined': timezone.now(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compara tamanho do payload e tempo de encode/decode entre JSON e MessagePack.'
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument('--users', type=int, default=100, help='Usuários por página (default: 100)')
+        parser.add_argument('--rounds', type=int, default=500, help='Repetições por formato (default: 500)')
+
+    def handle(self, *args, **options):
+        page = {'items': [fake_user(i) for i in range(options['users'])], 'count': options['users']}
+        rounds = options['rounds']
+        renderer = MsgPackRenderer()
+
+        formats = {
+            'json': (
+                lambda: json.dumps(page, cls=NinjaJSONEncoder).encode(),
+                json.loads,
+            ),
+            'msgpack': (
+                lambda: renderer.render(None, page, response_status=200),
+                msgpack.unpackb,
+            ),
+        }
+
+        self.stdout.write(f'{options["users"]} usuários por payload, {rounds} rodadas\n')
+        self.stdout.write(f'{"formato":<10}{"bytes":>10}{"encode (µs)":>15}{"decode (µs)":>15}')
+        for name, (encode, decode) in formats.items():
+            start = time.perf_counter()
+            for _ in range(rounds):
+                payload = encode()
+            encode_us = (time.perf_counter() - start) / rounds * 1e6
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                decode(payload)
+            decode_us = (time.perf_counter() - start) / rounds * 1e6
+
+            self.stdout.write(f'{name:<10}{len(payload):>10}{encode_us:>15.1f}{decode_us:>15.1f}')
@@ -0,0 +1,69 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from myapi.core.ids import uuid7
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara inserts com chave primária uuid4 vs UUIDv7: throughput, tamanho do índice e WAL gerado. '
+        'Usa tabelas temporárias de benchmark (bench_uuid_*), removidas no final.'
+    )
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Linhas por tabela (default: 1000000)')
+        parser.add_argument('--batch', type=int, default=10_000, help='Linhas por COPY/commit (default: 10000)')
+
+    def handle(self, *args, **options):
+        rows, batch = options['rows'], options['batch']
+        self.stdout.write(f'{rows} linhas por tabela, {batch} por commit\n')
+        self.stdout.write(f'{"chave":<8}{"linhas/s":>12}{"índice (MB)":>14}{"tabela (MB)":>14}{"WAL (MB)":>12}')
+        for name, generate in GENERATORS.items():
+            table = f'bench_uuid_{name}'
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+                cursor.execute(f'CREATE TABLE {table} (id uuid PRIMARY KEY, payload text NOT NULL)')
+            try:
+                result = self.run_inserts(table, generate, rows, batch)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE IF EXISTS {table}')
+            self.stdout.write(
+                f'{name:<8}{result["rate"]:>12.0f}{result["index_mb"]:>14.1f}'
+                f'{result["table_mb"]:>14.1f}{result["wal_mb"]:>12.1f}'
+            )
+
+    @staticmethod
+    def run_inserts(table, generate, rows, batch):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_current_wal_lsn()')
+            wal_start = cursor.fetchone()[0]
+
+            started = time.perf_counter()
+            for start in range(0, rows, batch):
+                # COPY do psycopg: mede o custo do índice, não o de montar INSERTs
+                with cursor.cursor.copy(f'COPY {table} (id, payload) FROM STDIN') as copy:
+                    for index in range(start, min(start + batch, rows)):
+                        copy.write_row((generate(), f'user_{index}@example.com'))
+            elapsed = time.perf_counter() - started
+
+            cursor.execute(
+                'SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s), pg_relation_size(%s), pg_relation_size(%s)',
+                [wal_start, f'{table}_pkey', table],
+            )
+            wal_bytes, index_bytes, table_bytes = cursor.fetchone()
+
+        return {
+            'rate': rows / elapsed,
+            'index_mb': index_bytes / 1024 / 1024,
+            'table_mb': table_bytes / 1024 / 1024,
+            'wal_mb': float(wal_bytes) / 1024 / 1024,
+        }
@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from loguru import logger
+
+from myapi.core.outbox import outbox_stats, send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker do outbox de emails: envia lotes pendentes (SELECT ... FOR UPDATE SKIP LOCKED) '
+        'com retentativas e backoff. Pode rodar em várias instâncias.'
+    )
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0, help='Segundos de espera com a fila vazia (default: 2)'
+        )
+        parser.add_argument('--once', action='store_true', help='Esvazia o que estiver disponível e sai')
+        parser.add_argument('--stats', action='store_true', help='Mostra o tamanho da fila e sai')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            stats = outbox_stats()
+            self.stdout.write(
+                f'pendentes: {stats["pending"]}, mortas: {stats["dead"]}, '
+                f'mais antiga: {stats["oldest_pending_age"]:.0f}s'
+            )
+            return
+
+        totals = {'sent': 0, 'retried': 0, 'dead': 0}
+        started = time.monotonic()
+        try:
+            while True:
+                result = send_batch(options['batch_size'])
+                if not result.claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                for key in totals:
+                    totals[key] += getattr(result, key)
+                logger.info(
+                    f'Outbox batch: {result.sent} sent, {result.retried} retried, {result.dead} dead '
+                    f'in {result.elapsed:.2f}s ({result.sent / max(result.elapsed, 1e-6):.1f} msg/s)'
+                )
+        except KeyboardInterrupt:
+            pass
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{totals["sent"]} enviados, {totals["retried"]} para retentativa, {totals["dead"]} mortos '
+            f'em {elapsed:.1f}s ({totals["sent"] / max(elapsed, 1e-6):.1f} msg/s)'
+        )
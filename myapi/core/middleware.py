@@ -1,3 +1,19 @@
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from loguru import logger
+
+from .compression import (
+    CompressedBodyCache,
+    available_encoders,
+    compression_stats,
+    select_encoder,
+    timed_compress,
+)
+from .renderers import MSGPACK_MEDIA_TYPES
+
+
 class SecurityHeadersMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -7,3 +23,147 @@ class SecurityHeadersMiddleware:
         response['Permissions-Policy'] = 'camera=(), microphone=(), geolocation=()'
         response['Cross-Origin-Opener-Policy'] = 'same-origin'
         return response
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas (zstd/br/gzip) conforme o Accept-Encoding do cliente.
+
+    - Só comprime corpos a partir de COMPRESSION_MIN_SIZE bytes.
+    - Respostas streaming são comprimidas de forma incremental (sync e async).
+    - Rotas em COMPRESSION_CACHED_PATHS (ex.: OpenAPI JSON) reutilizam os bytes
+      já comprimidos enquanto o corpo original não mudar.
+    - Cada resposta comprimida recebe um header Server-Timing com o custo de CPU,
+      e compression_stats acumula taxa de compressão e CPU por rota.
+    - Só os formatos da API são comprimidos. Páginas HTML (admin, allauth) levam o
+      token CSRF e repetem o que veio na URL (ex.: ?q= da busca do admin); comprimi-las
+      abriria espaço para o BREACH.
+    """
+
+    compress_content_types = frozenset({
+        'application/json',
+        'application/vnd.oai.openapi+json',
+        *MSGPACK_MEDIA_TYPES,
+        'application/x-ndjson',
+        'text/csv',
+    })
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.cached_paths = set(getattr(settings, 'COMPRESSION_CACHED_PATHS', []))
+        self.encoders = available_encoders()
+        self.body_cache = CompressedBodyCache()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.should_compress(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoder = select_encoder(request.headers.get('Accept-Encoding', ''), self.encoders)
+        if encoder is None:
+            return response
+
+        route = self.route_name(request)
+        if response.streaming:
+            self.compress_stream(response, encoder, route)
+        elif not self.compress_content(request, response, encoder, route):
+            return response
+
+        # ETag forte vira fraco após a compressão (RFC 9110, seção 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoder.name
+        return response
+
+    def should_compress(self, response):
+        if response.has_header('Content-Encoding') or response.status_code in {204, 304}:
+            return False
+        media_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+        if media_type not in self.compress_content_types:
+            return False
+        return response.streaming or len(response.content) >= self.min_size
+
+    @staticmethod
+    def route_name(request):
+        match = getattr(request, 'resolver_match', None)
+        return match.route if match else request.path
+
+    def compress_content(self, request, response, encoder, route):
+        content = response.content
+        cached = request.path in self.cached_paths
+        compressed = None
+        cpu_seconds = 0.0
+
+        if cached:
+            key = self.body_cache.key(request.path, encoder.name, content)
+            compressed = self.body_cache.get(key)
+        hit = compressed is not None
+        if not hit:
+            compressed, cpu_seconds = timed_compress(encoder, content)
+            if cached:
+                self.body_cache.set(key, compressed)
+
+        if len(compressed) >= len(content):
+            return False
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        patch_server_timing(response, cpu_seconds, hit)
+        compression_stats.record((route, encoder.name), len(content), len(compressed), cpu_seconds, cached=hit)
+        logger.debug(
+            f'Compressed {route} with {encoder.name}: {len(content)} -> {len(compressed)} bytes '
+            f'({cpu_seconds * 1000:.2f} ms CPU{", cached" if hit else ""})'
+        )
+        return True
+
+    @staticmethod
+    def compress_stream(response, encoder, route):
+        key = (route, encoder.name)
+        totals = {'raw': 0, 'compressed': 0, 'cpu': 0.0}
+
+        def compress_chunk(compressor, chunk):
+            start = time.thread_time()
+            data = compressor.compress(chunk) if chunk is not None else compressor.finish()
+            totals['cpu'] += time.thread_time() - start
+            totals['raw'] += len(chunk or b'')
+            totals['compressed'] += len(data)
+            return data
+
+        def stream(chunks):
+            compressor = encoder.compressor()
+            try:
+                for chunk in chunks:
+                    data = compress_chunk(compressor, chunk)
+                    if data:
+                        yield data
+                yield compress_chunk(compressor, None)
+            finally:
+                compression_stats.record(key, totals['raw'], totals['compressed'], totals['cpu'])
+
+        async def astream(chunks):
+            compressor = encoder.compressor()
+            try:
+                async for chunk in chunks:
+                    data = compress_chunk(compressor, chunk)
+                    if data:
+                        yield data
+                yield compress_chunk(compressor, None)
+            finally:
+                compression_stats.record(key, totals['raw'], totals['compressed'], totals['cpu'])
+
+        # Captura o iterador atual antes de substituí-lo
+        original = response.streaming_content
+        response.streaming_content = astream(original) if response.is_async else stream(original)
+        # O tamanho final só é conhecido ao fim do stream
+        del response.headers['Content-Length']
+
+
+def patch_server_timing(response, cpu_seconds, cached):
+    entry = f'compress;dur={cpu_seconds * 1000:.3f}'
+    if cached:
+        entry += ';desc="cached"'
+    existing = response.get('Server-Timing')
+    response.headers['Server-Timing'] = f'{existing}, {entry}' if existing else entry
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:59
+
+import django.contrib.postgres.fields
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('from_email', models.CharField(max_length=254)),
+                (
+                    'to',
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=254), size=None),
+                ),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[('pending', 'Pending'), ('dead', 'Dead')], default='pending', max_length=10
+                    ),
+                ),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(('status', 'pending')),
+                        fields=['available_at', 'id'],
+                        name='core_outbox_pending_idx',
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0002_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='html_body',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
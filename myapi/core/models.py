@@ -1,6 +1,9 @@
 from datetime import datetime, timezone
 
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone as django_timezone
 
 
 class RefreshTokenDenylist(models.Model):
@@ -13,3 +16,51 @@ class RefreshTokenDenylist(models.Model):
     @classmethod
     def cleanup_expired(cls):
         cls.objects.filter(expires_at__lt=datetime.now(tz=timezone.utc)).delete()
+
+
+class OutboxMessage(models.Model):
+    """
+    Email pendente de envio (transactional outbox).
+
+    Gravado na mesma transação do usuário/token que o originou e entregue pelo
+    worker `manage.py send_outbox`. Enviados são apagados; os que esgotam as
+    tentativas ficam como `dead` para inspeção e reenvio pelo admin.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        DEAD = 'dead'
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    from_email = models.CharField(max_length=254)
+    to = ArrayField(models.CharField(max_length=254))
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=django_timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # O worker só varre pendentes já liberados para (re)tentativa
+            models.Index(fields=['available_at', 'id'], name='core_outbox_pending_idx', condition=Q(status='pending')),
+        ]
+
+    @classmethod
+    def from_mail_options(cls, mailOptions):
+        to = mailOptions['to'] if isinstance(mailOptions['to'], list) else [mailOptions['to']]
+        return cls(
+            subject=mailOptions['subject'],
+            body=mailOptions['body'],
+            html_body=mailOptions.get('html', ''),
+            from_email=mailOptions['from'],
+            to=to,
+        )
+
+    def as_mail_options(self):
+        options = {'subject': self.subject, 'body': self.body, 'from': self.from_email, 'to': list(self.to)}
+        if self.html_body:
+            options['html'] = self.html_body
+        return options
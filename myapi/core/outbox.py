@@ -0,0 +1,121 @@
+"""
+Outbox transacional de emails.
+
+`enqueue` grava os emails na tabela OutboxMessage dentro da transação corrente:
+se o usuário/token não for gravado, o email também não é, e a requisição não
+espera pelo SMTP. O worker (`manage.py send_outbox`) reivindica lotes com
+SELECT ... FOR UPDATE SKIP LOCKED, então vários workers podem rodar em paralelo
+sem enviar o mesmo email duas vezes. Cada lote usa uma única conexão SMTP do
+pool de infra.mailer.
+
+Falhas voltam para a fila com backoff exponencial (OUTBOX_RETRY_BASE_SECONDS *
+2^(tentativas-1)); depois de OUTBOX_MAX_ATTEMPTS a mensagem vira `dead`.
+A entrega é "pelo menos uma vez": se o worker morrer depois do envio e antes
+do commit, o lote volta para a fila.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from loguru import logger
+
+from infra import mailer
+
+from .models import OutboxMessage
+
+
+def enqueue(messages):
+    """Grava uma lista de mailOptions no outbox, num único INSERT."""
+    return OutboxMessage.objects.bulk_create([OutboxMessage.from_mail_options(options) for options in messages])
+
+
+@dataclass
+class BatchResult:
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+    elapsed: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def claimed(self):
+        return self.sent + self.retried + self.dead
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def send_batch(batch_size=None):
+    """Reivindica e envia um lote de mensagens pendentes. Devolve um BatchResult."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    result = BatchResult()
+    started = time.monotonic()
+
+    with transaction.atomic():
+        now = timezone.now()
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxMessage.Status.PENDING, available_at__lte=now)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        if not messages:
+            return result
+
+        sent_ids, failed = deliver(messages, now)
+        OutboxMessage.objects.filter(id__in=sent_ids).delete()
+        OutboxMessage.objects.bulk_update(failed, ['status', 'attempts', 'available_at', 'last_error'])
+
+    result.sent = len(sent_ids)
+    result.dead = sum(1 for message in failed if message.status == OutboxMessage.Status.DEAD)
+    result.retried = len(failed) - result.dead
+    result.errors = [message.last_error for message in failed]
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def deliver(messages, now):
+    """Envia as mensagens por uma conexão do pool. Devolve (ids enviados, mensagens com falha)."""
+    results = mailer.send_batch([message.as_mail_options() for message in messages])
+    sent_ids, failed = [], []
+    for message, error in zip(messages, results, strict=True):
+        if error is None:
+            sent_ids.append(message.id)
+        else:
+            failed.append(mark_failed(message, error, now))
+    return sent_ids, failed
+
+
+def mark_failed(message, error, now):
+    message.attempts += 1
+    message.last_error = str(error)[:1000]
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboxMessage.Status.DEAD
+        logger.error(f'Outbox message {message.id} to {message.to} dead after {message.attempts} attempts: {error}')
+    else:
+        message.available_at = now + retry_delay(message.attempts)
+        logger.warning(f'Outbox message {message.id} failed (attempt {message.attempts}), retrying: {error}')
+    return message
+
+
+def send_pending(batch_size=None):
+    """Envia lotes até não sobrar nada disponível agora. Devolve o total enviado."""
+    sent = 0
+    while (result := send_batch(batch_size)).claimed:
+        sent += result.sent
+    return sent
+
+
+def outbox_stats():
+    """Tamanho da fila: pendentes, mortas e idade (s) da pendente mais antiga."""
+    pending = OutboxMessage.objects.filter(status=OutboxMessage.Status.PENDING)
+    oldest = pending.order_by('created_at').values_list('created_at', flat=True).first()
+    return {
+        'pending': pending.count(),
+        'dead': OutboxMessage.objects.filter(status=OutboxMessage.Status.DEAD).count(),
+        'oldest_pending_age': (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+    }
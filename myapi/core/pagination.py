@@ -0,0 +1,78 @@
+"""
+Contagem estimada para paginação de tabelas grandes.
+
+`COUNT(*)` no Postgres precisa varrer a tabela (ou o índice) inteira, e em
+listas com milhões de linhas isso domina o tempo da página. Aqui a contagem é
+exata enquanto o resultado é pequeno e, acima de `PAGINATION_EXACT_COUNT_THRESHOLD`,
+vem das estatísticas do planner:
+
+- queryset sem filtros: `pg_class.reltuples` da tabela (atualizado pelo ANALYZE/autovacuum);
+- queryset filtrado: o número de linhas estimado pelo EXPLAIN.
+"""
+
+import json
+from typing import Any
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from ninja import Schema
+from ninja.pagination import LimitOffsetPagination
+
+
+def planner_estimate(queryset):
+    """Estimativa de linhas do planner, ou None quando ela não existe (tabela nunca analisada)."""
+    query = queryset.query
+    if query.is_empty():
+        return 0
+    if not query.where and not query.distinct and not query.combinator:
+        table = queryset.model._meta.db_table
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+        # reltuples = -1 até o primeiro ANALYZE/VACUUM
+        return int(row[0]) if row and row[0] >= 0 else None
+
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimated_count(queryset, threshold=None):
+    """Devolve (contagem, é_estimada): exata abaixo do threshold, estimada acima."""
+    if threshold is None:
+        threshold = settings.PAGINATION_EXACT_COUNT_THRESHOLD
+    if not hasattr(queryset, 'query'):
+        return len(queryset), False
+    estimate = planner_estimate(queryset)
+    if estimate is None or estimate < threshold:
+        return queryset.count(), False
+    return estimate, True
+
+
+class EstimatedCountPagination(LimitOffsetPagination):
+    """LimitOffsetPagination com `count` estimado para listas grandes."""
+
+    class Output(Schema):
+        items: list[Any]
+        count: int
+        count_is_estimated: bool = False
+
+    def paginate_queryset(self, queryset, pagination, request, **params):
+        offset = pagination.offset
+        limit = min(pagination.limit, self.max_limit)
+        count, count_is_estimated = estimated_count(queryset)
+        return {
+            'items': queryset[offset : offset + limit],
+            'count': count,
+            'count_is_estimated': count_is_estimated,
+        }
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator do admin que usa a mesma contagem estimada da API."""
+
+    @cached_property
+    def count(self):
+        count, self.count_is_estimated = estimated_count(self.object_list)
+        return count
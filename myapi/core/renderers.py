@@ -0,0 +1,86 @@
+"""
+Negociação de conteúdo JSON / MessagePack para a API.
+
+Clientes internos podem enviar `Accept: application/msgpack` (e corpos com
+`Content-Type: application/msgpack`) para evitar o custo de encode/decode de JSON.
+Navegadores e clientes sem preferência continuam recebendo JSON.
+"""
+
+import msgpack
+from django.utils.cache import patch_vary_headers
+from ninja import NinjaAPI
+from ninja.parser import Parser
+from ninja.renderers import BaseRenderer, JSONRenderer
+from ninja.responses import NinjaJSONEncoder
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+
+
+def wants_msgpack(request) -> bool:
+    """True quando o header Accept prefere MessagePack a JSON."""
+    if 'msgpack' not in request.headers.get('Accept', ''):
+        return False
+    preferred = request.get_preferred_type([JSONRenderer.media_type, *MSGPACK_MEDIA_TYPES])
+    return preferred in MSGPACK_MEDIA_TYPES
+
+
+def is_msgpack_body(request) -> bool:
+    content_type = request.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in MSGPACK_MEDIA_TYPES
+
+
+class MsgPackRenderer(BaseRenderer):
+    media_type = MSGPACK_MEDIA_TYPE
+    # Reutiliza o encoder do Ninja para UUID, datetime, pydantic models etc.
+    encoder = NinjaJSONEncoder()
+
+    def render(self, request, data, *, response_status):
+        return msgpack.packb(data, default=self.encoder.default, use_bin_type=True)
+
+
+class NegotiatingRenderer(BaseRenderer):
+    """Escolhe o renderer (JSON ou MessagePack) a partir do header Accept."""
+
+    media_type = JSONRenderer.media_type
+
+    def __init__(self):
+        self.json = JSONRenderer()
+        self.msgpack = MsgPackRenderer()
+
+    def select(self, request) -> BaseRenderer:
+        return self.msgpack if wants_msgpack(request) else self.json
+
+    def content_type(self, request) -> str:
+        renderer = self.select(request)
+        if renderer is self.msgpack:
+            return renderer.media_type
+        return f'{renderer.media_type}; charset={renderer.charset}'
+
+    def render(self, request, data, *, response_status):
+        return self.select(request).render(request, data, response_status=response_status)
+
+
+class NegotiatingParser(Parser):
+    """Aceita corpos JSON ou MessagePack conforme o Content-Type."""
+
+    def parse_body(self, request):
+        if is_msgpack_body(request):
+            return msgpack.unpackb(request.body, raw=False)
+        return super().parse_body(request)
+
+
+class NegotiatingNinjaAPI(NinjaAPI):
+    """NinjaAPI que responde em JSON ou MessagePack conforme o cliente pedir."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('renderer', NegotiatingRenderer())
+        kwargs.setdefault('parser', NegotiatingParser())
+        super().__init__(*args, **kwargs)
+
+    def create_response(self, request, data, *, status=None, temporal_response=None):
+        response = super().create_response(request, data, status=status, temporal_response=temporal_response)
+        if isinstance(self.renderer, NegotiatingRenderer):
+            response['Content-Type'] = self.renderer.content_type(request)
+            patch_vary_headers(response, ['Accept'])
+        return response
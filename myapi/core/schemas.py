@@ -8,6 +8,16 @@ class StatusSchema(Schema):
     active_connections: int
 
 
+class RouteCompressionSchema(Schema):
+    responses: int
+    cached: int
+    raw_bytes: int
+    compressed_bytes: int
+    cpu_seconds: float
+    ratio: float
+    cpu_ms_per_response: float
+
+
 class LoginRequest(Schema):
     username: str
     password: str
@@ -15,3 +25,14 @@ class LoginRequest(Schema):
 
 class MessageSchema(Schema):
     message: str
+
+
+class ResponseCacheStatsSchema(Schema):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    entries: int
+    bytes: int
+    hit_rate: float
@@ -0,0 +1,89 @@
+import json
+from datetime import timedelta
+
+import pytest
+from decouple import config
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from freezegun import freeze_time
+
+from myapi.core.activity import ActivityBuffer
+
+User = get_user_model()
+
+
+@pytest.fixture
+def buffer():
+    buffer = ActivityBuffer(interval=3600)
+    yield buffer
+    buffer.stop()
+
+
+@pytest.mark.django_db
+def test_touch_is_buffered_and_flushed_in_one_update(buffer, django_assert_num_queries):
+    users = User.objects.bulk_create([User(username=f'active_{i}', email=f'active_{i}@test.com') for i in range(3)])
+    now = timezone.now()
+
+    with django_assert_num_queries(0), freeze_time(now):
+        buffer.touch(users[0].id, login=True)
+        buffer.touch(users[1].id)
+    with django_assert_num_queries(0), freeze_time(now + timedelta(seconds=5)):
+        buffer.touch(users[0].id)
+
+    with django_assert_num_queries(1) as queries:
+        assert buffer.flush() == 2  # noqa: PLR2004
+    assert 'FROM (VALUES' in queries.captured_queries[0]['sql']
+
+    activity = dict(User.objects.values_list('username', 'last_login'))
+    seen = dict(User.objects.values_list('username', 'last_seen'))
+    assert (activity['active_0'], seen['active_0']) == (now, now + timedelta(seconds=5))
+    assert (activity['active_1'], seen['active_1']) == (None, now)
+    assert (activity['active_2'], seen['active_2']) == (None, None)
+    assert buffer.flush() == 0
+
+
+@pytest.mark.django_db
+def test_flush_never_moves_activity_back(buffer):
+    now = timezone.now()
+    user = User.objects.create_user(username='recent', last_login=now, last_seen=now)
+    version = user.version
+
+    with freeze_time(now - timedelta(minutes=1)):
+        buffer.touch(user.id, login=True)
+    buffer.flush()
+
+    user.refresh_from_db()
+    assert (user.last_login, user.last_seen) == (now, now)
+    # Atividade não conta como alteração do usuário (ETag/cache continuam válidos)
+    assert user.version == version
+
+
+@pytest.mark.django_db
+def test_stop_flushes_pending_activity():
+    user = User.objects.create_user(username='leaving')
+    buffer = ActivityBuffer(interval=3600)
+
+    buffer.touch(user.id)
+    assert buffer.stop() == 1
+
+    user.refresh_from_db()
+    assert user.last_seen is not None
+
+
+@pytest.mark.django_db
+def test_login_and_me_record_activity(client):
+    username = config('DJANGO_ADMIN_USER')
+    client.post(
+        '/api/v1/login',
+        data=json.dumps({'username': username, 'password': config('DJANGO_ADMIN_PASSWORD')}),
+        content_type='application/json',
+    )
+    user = User.objects.get(username=username)
+    assert user.last_login is not None
+    assert user.last_seen == user.last_login
+
+    client.get('/api/v1/me')
+
+    seen = User.objects.values_list('last_seen', flat=True).get(username=username)
+    assert seen > user.last_seen
+    assert User.objects.values_list('last_login', flat=True).get(username=username) == user.last_login
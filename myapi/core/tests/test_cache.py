@@ -0,0 +1,52 @@
+import time
+
+from myapi.core.cache import CachedResponse, ResponseCache
+
+
+def entry(size=10, etag='"x"'):
+    return CachedResponse(content=b'a' * size, content_type='application/json', etag=etag)
+
+
+def test_cache_hit_and_miss_metrics():
+    cache = ResponseCache()
+    assert cache.get(('u1', 'detail')) is None
+    cache.set(('u1', 'detail'), entry())
+
+    assert cache.get(('u1', 'detail')).etag == '"x"'
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5  # noqa: PLR2004
+
+
+def test_cache_entry_expires_after_ttl():
+    cache = ResponseCache(ttl=0.01)
+    cache.set(('u1', 'detail'), entry())
+    time.sleep(0.02)
+
+    assert cache.get(('u1', 'detail')) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_cache_evicts_lru_when_over_memory_cap():
+    cache = ResponseCache(max_bytes=25)
+    cache.set(('u1', 'detail'), entry())
+    cache.set(('u2', 'detail'), entry())
+    cache.get(('u1', 'detail'))
+    cache.set(('u3', 'detail'), entry())
+
+    assert cache.get(('u2', 'detail')) is None
+    assert cache.get(('u1', 'detail')) is not None
+    assert cache.stats()['bytes'] <= 25  # noqa: PLR2004
+
+
+def test_cache_invalidate_drops_every_variant_of_owner():
+    cache = ResponseCache()
+    cache.set(('u1', 'detail', 'json'), entry())
+    cache.set(('u1', 'me', 'msgpack'), entry())
+    cache.set(('u2', 'detail', 'json'), entry())
+
+    cache.invalidate('u1')
+
+    assert cache.stats()['entries'] == 1
+    assert cache.get(('u2', 'detail', 'json')) is not None
@@ -0,0 +1,123 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from decouple import config
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from myapi.core.compression import GzipEncoder, compression_stats, parse_accept_encoding, select_encoder
+from myapi.core.middleware import CompressionMiddleware
+
+
+def make_middleware(response):
+    return CompressionMiddleware(lambda request: response)
+
+
+def test_parse_accept_encoding_with_q_values():
+    assert parse_accept_encoding('gzip, br;q=0.8, *;q=0') == {'gzip': 1.0, 'br': 0.8, '*': 0.0}
+
+
+def test_select_encoder_respects_q_zero():
+    assert select_encoder('gzip;q=0', [GzipEncoder()]) is None
+    assert select_encoder('*', [GzipEncoder()]).name == 'gzip'
+
+
+def test_small_response_is_not_compressed(settings):
+    settings.COMPRESSION_MIN_SIZE = 1024
+    request = RequestFactory().get('/api/v1/me', HTTP_ACCEPT_ENCODING='gzip')
+    response = make_middleware(HttpResponse(b'x' * 100, content_type='application/json'))(request)
+
+    assert not response.has_header('Content-Encoding')
+    assert response.content == b'x' * 100
+
+
+def test_large_response_is_compressed(settings):
+    settings.COMPRESSION_MIN_SIZE = 1024
+    body = json.dumps([{'username': f'user_{i}'} for i in range(200)]).encode()
+    request = RequestFactory().get('/api/v1/users', HTTP_ACCEPT_ENCODING='gzip')
+    response = make_middleware(HttpResponse(body, content_type='application/json'))(request)
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    assert response['Server-Timing'].startswith('compress;dur=')
+    assert int(response['Content-Length']) < len(body)
+    assert gzip.decompress(response.content) == body
+
+
+def test_streaming_response_is_compressed_incrementally():
+    chunks = [json.dumps({'row': i}).encode() + b'\n' for i in range(500)]
+    request = RequestFactory().get('/api/v1/users/export', HTTP_ACCEPT_ENCODING='gzip')
+    response = make_middleware(StreamingHttpResponse(iter(chunks), content_type='application/x-ndjson'))(request)
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(b''.join(response.streaming_content)) == b''.join(chunks)
+
+
+def test_strong_etag_becomes_weak_when_compressed():
+    request = RequestFactory().get('/api/v1/users', HTTP_ACCEPT_ENCODING='gzip')
+    original = HttpResponse(b'a' * 4096, content_type='application/json')
+    original['ETag'] = '"abc"'
+    response = make_middleware(original)(request)
+
+    assert response['ETag'] == 'W/"abc"'
+
+
+def test_html_is_not_compressed():
+    # Páginas com token CSRF e reflexo da URL (admin, allauth): sem compressão por causa do BREACH
+    request = RequestFactory().get('/admin/users/uuiduser/?q=abc', HTTP_ACCEPT_ENCODING='gzip')
+    response = make_middleware(HttpResponse(b'<p>csrfmiddlewaretoken</p>' * 200))(request)
+
+    assert not response.has_header('Content-Encoding')
+    assert not response.has_header('Vary')
+
+
+@pytest.mark.django_db
+def test_openapi_compressed_bytes_are_cached(client):
+    compression_stats.reset()
+    first = client.get('/api/v1/openapi.json', HTTP_ACCEPT_ENCODING='gzip')
+    second = client.get('/api/v1/openapi.json', HTTP_ACCEPT_ENCODING='gzip')
+
+    assert first.status_code == HTTPStatus.OK
+    assert first['Content-Encoding'] == 'gzip'
+    assert first.content == second.content
+    assert 'cached' in second['Server-Timing']
+    assert json.loads(gzip.decompress(second.content))['openapi']
+    stats = next(iter(compression_stats.snapshot().values()))
+    assert stats['cached'] == 1
+    assert stats['responses'] == stats['cached'] + 1
+    assert stats['ratio'] > 1
+
+
+@pytest.mark.django_db
+def test_compression_stats_endpoint(client):
+    compression_stats.reset()
+    client.get('/api/v1/openapi.json', HTTP_ACCEPT_ENCODING='gzip')
+    assert client.get('/api/v1/compression-stats').status_code == HTTPStatus.UNAUTHORIZED
+
+    client.post(
+        '/api/v1/login',
+        data=json.dumps({'username': config('DJANGO_ADMIN_USER'), 'password': config('DJANGO_ADMIN_PASSWORD')}),
+        content_type='application/json',
+    )
+    response = client.get('/api/v1/compression-stats')
+
+    assert response.status_code == HTTPStatus.OK
+    [(route, stats)] = [item for item in response.json().items() if 'openapi' in item[0]]
+    assert route.endswith('[gzip]')
+    assert stats['responses'] == 1
+    assert stats['ratio'] > 1
+
+
+@pytest.mark.django_db
+def test_api_response_without_accept_encoding_is_identity(client):
+    client.post(
+        '/api/v1/login',
+        data=json.dumps({'username': config('DJANGO_ADMIN_USER'), 'password': config('DJANGO_ADMIN_PASSWORD')}),
+        content_type='application/json',
+    )
+    response = client.get('/api/v1/me')
+
+    assert response.status_code == HTTPStatus.OK
+    assert not response.has_header('Content-Encoding')
@@ -0,0 +1,39 @@
+from infra.mailer import build_message
+from myapi.core.emails import compiled, render, render_many
+
+CONTEXT = {'name': 'Ana <b>', 'url': 'https://example.com/activate/abc', 'expiry_minutes': 15}
+
+
+def test_render_email_text_and_html_parts():
+    options = render('activation', CONTEXT, 'contato@myapi.com', 'ana@test.com')
+
+    assert options['subject'] == 'Ative sua conta'
+    assert options['to'] == ['ana@test.com']
+    # Texto puro sem escape e sem marcação; HTML com o nome escapado
+    assert 'Olá Ana <b>,' in options['body']
+    assert 'https://example.com/activate/abc' in options['body']
+    assert '<html>' not in options['body']
+    assert 'Ana &lt;b&gt;' in options['html']
+    assert 'Equipe Django Ninja API Boilerplate' in options['html']
+
+
+def test_render_many_compiles_templates_once():
+    compiled.cache_clear()
+    contexts = [{**CONTEXT, 'name': f'user{index}'} for index in range(50)]
+
+    messages = render_many('password_reset', contexts, 'contato@myapi.com', [f'u{i}@test.com' for i in range(50)])
+    render('password_reset', CONTEXT, 'contato@myapi.com', 'ana@test.com')
+
+    assert [message['to'] for message in messages[:2]] == [['u0@test.com'], ['u1@test.com']]
+    assert 'Olá user49,' in messages[-1]['body']
+    assert compiled.cache_info().misses == 1
+
+
+def test_build_message_sends_text_with_html_alternative():
+    options = render('activation', CONTEXT, 'contato@myapi.com', 'ana@test.com')
+
+    message = build_message(options)
+
+    assert message.body == options['body']
+    assert message.alternatives[0].content == options['html']
+    assert message.alternatives[0].mimetype == 'text/html'
@@ -0,0 +1,46 @@
+import time
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from myapi.core.ids import uuid7, uuid7_timestamp_ms
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+
+    assert value.version == 7  # noqa: PLR2004
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_embeds_current_timestamp():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert before <= uuid7_timestamp_ms(value) <= after
+
+
+def test_uuid7_sorts_by_creation_time():
+    values = [uuid7(timestamp_ms=ms) for ms in (1_700_000_000_000, 1_700_000_000_001, 1_800_000_000_000)]
+
+    assert sorted(values) == values
+    assert sorted(str(value) for value in values) == [str(value) for value in values]
+
+
+def test_uuid7_is_random_within_same_millisecond():
+    assert len({uuid7(timestamp_ms=1_700_000_000_000) for _ in range(1000)}) == 1000  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_new_users_get_uuid7_and_coexist_with_uuid4():
+    User = get_user_model()  # NOSONAR
+    legacy = User.objects.create_user(id=uuid.uuid4(), username='legacy_v4', email='legacy@test.com')
+    new = User.objects.create_user(username='new_v7', email='new@test.com')
+
+    assert new.id.version == 7  # noqa: PLR2004
+    assert set(User.objects.filter(id__in=[legacy.id, new.id]).values_list('username', flat=True)) == {
+        'legacy_v4',
+        'new_v7',
+    }
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from infra import mailer
+from infra.smtp_sink import SMTPSink
+
+
+def mail_options(index):
+    return {
+        'subject': f'Assunto {index}',
+        'body': '<p>Olá</p>',
+        'from': 'contato@myapi.com',
+        'to': [f'u{index}@t.com'],
+    }
+
+
+@pytest.fixture
+def smtp_sink(settings):
+    """Backend SMTP de verdade apontado para um servidor local que descarta as mensagens"""
+    sink = SMTPSink()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = sink.host
+    settings.EMAIL_PORT = sink.start()
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = ''
+    settings.EMAIL_HOST_PASSWORD = ''
+    mailer.pool.close_all()
+    yield sink
+    mailer.pool.close_all()
+    sink.stop()
+
+
+def test_send_batch_uses_one_connection(smtp_sink):
+    results = mailer.send_batch([mail_options(index) for index in range(20)])
+
+    assert results == [None] * 20
+    assert smtp_sink.messages == 20  # noqa: PLR2004
+    assert smtp_sink.connections == 1
+
+
+def test_send_message_reuses_pooled_connection(smtp_sink):
+    for index in range(5):
+        mailer.send_message(mail_options(index))
+
+    assert smtp_sink.messages == 5  # noqa: PLR2004
+    assert smtp_sink.connections == 1
+
+
+def test_pool_limits_concurrent_connections(smtp_sink):
+    pool = mailer.ConnectionPool(size=2)
+    smtp_sink.latency = 0.005
+
+    def send(index):
+        connection = pool.checkout()
+        try:
+            mailer.send_message(mail_options(index), connection=connection)
+        finally:
+            pool.checkin(connection)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(send, range(16)))
+    pool.close_all()
+
+    assert smtp_sink.messages == 16  # noqa: PLR2004
+    assert smtp_sink.connections == 2  # noqa: PLR2004
+
+
+def test_pool_replaces_dropped_connection_after_health_check(smtp_sink, settings):
+    settings.EMAIL_POOL_HEALTHCHECK_AFTER = 0
+    mailer.send_message(mail_options(0))
+
+    # O servidor derruba o cliente ocioso: o NOOP falha e o pool abre outra conexão
+    smtp_sink.drop_connections()
+    time.sleep(0.05)
+    mailer.send_message(mail_options(1))
+
+    assert smtp_sink.messages == 2  # noqa: PLR2004
+    assert smtp_sink.connections == 2  # noqa: PLR2004
+
+
+def test_pool_closes_idle_connections(smtp_sink, settings):
+    settings.EMAIL_POOL_IDLE_TIMEOUT = 0
+    mailer.send_message(mail_options(0))
+    time.sleep(0.01)
+    mailer.send_message(mail_options(1))
+
+    assert smtp_sink.connections == 2  # noqa: PLR2004
+
+
+def test_send_batch_reports_connection_failure(settings):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = '127.0.0.1'
+    settings.EMAIL_PORT = 9  # nada escutando
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_TIMEOUT = 1
+    mailer.pool.close_all()
+
+    results = mailer.send_batch([mail_options(0), mail_options(1)])
+
+    assert all(isinstance(error, OSError) for error in results)
+    assert len(results) == 2  # noqa: PLR2004
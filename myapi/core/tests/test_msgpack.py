@@ -0,0 +1,60 @@
+import json
+import uuid
+from http import HTTPStatus
+
+import msgpack
+import pytest
+from decouple import config
+
+MSGPACK = 'application/msgpack'
+
+
+@pytest.fixture
+def logged_client(client):
+    client.post(
+        '/api/v1/login',
+        data=json.dumps({'username': config('DJANGO_ADMIN_USER'), 'password': config('DJANGO_ADMIN_PASSWORD')}),
+        content_type='application/json',
+    )
+    return client
+
+
+@pytest.mark.django_db
+def test_msgpack_response_when_accepted(logged_client):
+    response = logged_client.get('/api/v1/me', HTTP_ACCEPT=MSGPACK)
+    data = msgpack.unpackb(response.content)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == MSGPACK
+    assert 'Accept' in response['Vary']
+    assert data['username'] == config('DJANGO_ADMIN_USER')
+
+
+@pytest.mark.django_db
+def test_json_response_by_default(logged_client):
+    response = logged_client.get('/api/v1/me', HTTP_ACCEPT='*/*')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('application/json')
+    assert response.json()['username'] == config('DJANGO_ADMIN_USER')
+
+
+@pytest.mark.django_db
+def test_msgpack_error_has_same_shape_as_json(logged_client):
+    url = f'/api/v1/users/{uuid.uuid4()}'
+    json_response = logged_client.get(url)
+    msgpack_response = logged_client.get(url, HTTP_ACCEPT=MSGPACK)
+
+    assert msgpack_response.status_code == HTTPStatus.NOT_FOUND
+    assert msgpack_response['Content-Type'] == MSGPACK
+    assert msgpack.unpackb(msgpack_response.content) == json_response.json()
+
+
+@pytest.mark.django_db
+def test_msgpack_request_body(client):
+    body = msgpack.packb({'username': config('DJANGO_ADMIN_USER'), 'password': config('DJANGO_ADMIN_PASSWORD')})
+    response = client.post('/api/v1/login', data=body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK)
+
+    assert response.status_code == HTTPStatus.OK
+    assert msgpack.unpackb(response.content) == {'message': 'Login realizado com sucesso'}
+    assert 'access_token' in response.cookies
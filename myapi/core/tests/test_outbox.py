@@ -0,0 +1,92 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from freezegun import freeze_time
+
+from infra import mailer
+from myapi.core import outbox
+from myapi.core.models import OutboxMessage
+
+
+def mail_options(to):
+    return {'subject': 'Assunto', 'body': '<p>Olá</p>', 'from': 'contato@myapi.com', 'to': [to]}
+
+
+@pytest.fixture
+def failing_recipient(monkeypatch):
+    """Envio falha para bad@test.com; os demais passam pelo backend de testes"""
+    send_message = mailer.send_message
+
+    def send(mailOptions, connection=None):
+        if 'bad@test.com' in mailOptions['to']:
+            raise ConnectionError('SMTP recusou')
+        return send_message(mailOptions, connection=connection)
+
+    monkeypatch.setattr(mailer, 'send_message', send)
+
+
+@pytest.mark.django_db
+def test_send_batch_delivers_and_deletes():
+    outbox.enqueue([mail_options('a@test.com'), mail_options('b@test.com')])
+
+    result = outbox.send_batch()
+
+    assert result.sent == 2  # noqa: PLR2004
+    assert sorted(email.to[0] for email in mail.outbox) == ['a@test.com', 'b@test.com']
+    assert mail.outbox[0].alternatives[0].mimetype == 'text/html'
+    assert not OutboxMessage.objects.exists()
+
+
+@pytest.mark.django_db
+def test_send_batch_claims_with_skip_locked():
+    outbox.enqueue([mail_options('a@test.com')])
+
+    with CaptureQueriesContext(connection) as queries:
+        outbox.send_batch()
+
+    assert any('FOR UPDATE SKIP LOCKED' in query['sql'] for query in queries)
+
+
+@pytest.mark.django_db
+def test_send_batch_retries_with_backoff_then_dead_letters(failing_recipient, settings):
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    settings.OUTBOX_RETRY_BASE_SECONDS = 30
+    outbox.enqueue([mail_options('bad@test.com'), mail_options('good@test.com')])
+    now = timezone.now()
+
+    with freeze_time(now):
+        result = outbox.send_batch()
+    assert (result.sent, result.retried, result.dead) == (1, 1, 0)
+    message = OutboxMessage.objects.get()
+    assert message.attempts == 1
+    assert message.available_at == now + timedelta(seconds=30)
+    assert message.last_error == 'SMTP recusou'
+
+    # Antes do backoff a mensagem não é reivindicada
+    with freeze_time(now + timedelta(seconds=29)):
+        assert outbox.send_batch().claimed == 0
+
+    with freeze_time(now + timedelta(seconds=30)):
+        result = outbox.send_batch()
+    assert result.dead == 1
+    assert OutboxMessage.objects.get().status == OutboxMessage.Status.DEAD
+    assert outbox.send_pending() == 0
+
+
+@pytest.mark.django_db
+def test_send_outbox_command(failing_recipient):
+    outbox.enqueue([mail_options('a@test.com'), mail_options('bad@test.com'), mail_options('c@test.com')])
+
+    out = StringIO()
+    call_command('send_outbox', '--once', '--batch-size', '2', stdout=out)
+    assert out.getvalue().startswith('2 enviados, 1 para retentativa, 0 mortos')
+
+    out = StringIO()
+    call_command('send_outbox', '--stats', stdout=out)
+    assert out.getvalue().startswith('pendentes: 1, mortas: 0')
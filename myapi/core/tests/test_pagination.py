@@ -0,0 +1,93 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from myapi.core.pagination import EstimatedCountPaginator, estimated_count, planner_estimate
+
+
+@pytest.fixture
+def analyzed_users():
+    User = get_user_model()  # NOSONAR
+    User.objects.bulk_create(User(username=f'user{i}', email=f'user{i}@test.com') for i in range(30))
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE users_uuiduser')
+    return User
+
+
+@pytest.mark.django_db
+def test_exact_count_below_threshold(analyzed_users):
+    count, estimated = estimated_count(analyzed_users.objects.all(), threshold=1000)
+
+    assert count == analyzed_users.objects.count()
+    assert estimated is False
+
+
+@pytest.mark.django_db
+def test_unfiltered_count_uses_reltuples_above_threshold(analyzed_users, django_assert_num_queries):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE relname = 'users_uuiduser'")
+        reltuples = int(cursor.fetchone()[0])
+
+    with django_assert_num_queries(1):
+        count, estimated = estimated_count(analyzed_users.objects.all(), threshold=10)
+
+    assert estimated is True
+    assert count == reltuples
+
+
+@pytest.mark.django_db
+def test_filtered_count_uses_explain_estimate(analyzed_users):
+    count, estimated = estimated_count(analyzed_users.objects.filter(username__startswith='user'), threshold=10)
+
+    assert estimated is True
+    assert count > 0
+
+
+@pytest.mark.django_db
+def test_never_analyzed_table_falls_back_to_exact_count(monkeypatch):
+    from myapi.core import pagination  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    # Tabela sem ANALYZE (reltuples = -1): o planner não tem estimativa
+    monkeypatch.setattr(pagination, 'planner_estimate', lambda queryset: None)
+
+    count, estimated = estimated_count(User.objects.all(), threshold=0)
+
+    assert count == User.objects.count()
+    assert estimated is False
+
+
+@pytest.mark.django_db
+def test_planner_estimate_is_none_while_reltuples_is_negative(monkeypatch):
+    class NeverAnalyzedCursor:
+        # pg_class de uma tabela que nunca passou por ANALYZE/VACUUM
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params):
+            self.sql = sql
+
+        def fetchone(self):
+            assert 'reltuples' in self.sql
+            return (-1,)
+
+    User = get_user_model()  # NOSONAR
+    monkeypatch.setattr(connection, 'cursor', NeverAnalyzedCursor)
+
+    assert planner_estimate(User.objects.all()) is None
+
+
+def test_lists_are_counted_with_len():
+    assert estimated_count([1, 2, 3], threshold=0) == (3, False)
+
+
+@pytest.mark.django_db
+def test_admin_paginator_flags_estimated_count(analyzed_users, settings):
+    settings.PAGINATION_EXACT_COUNT_THRESHOLD = 10
+    paginator = EstimatedCountPaginator(analyzed_users.objects.order_by('username'), 10)
+
+    assert paginator.count > 0
+    assert paginator.count_is_estimated is True
@@ -66,6 +66,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # django-allauth
     'django.contrib.sites',
     'allauth',
@@ -82,6 +83,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Compressão gzip/br/zstd das respostas (estáticos já são servidos pelo WhiteNoise)
+    'myapi.core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -95,6 +98,67 @@ MIDDLEWARE = [
     'myapi.core.middleware.SecurityHeadersMiddleware',
 ]
 
+# Compressão de respostas: só comprime corpos a partir desse tamanho (bytes)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+# Payloads imutáveis cujos bytes comprimidos ficam em cache no processo
+COMPRESSION_CACHED_PATHS = ['/api/v1/openapi.json']
+
+# Cache compartilhado (rate limit, coalescência de emails). Em produção com mais de um processo,
+# aponte para um backend compartilhado, ex.: CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+}
+
+# Cache de respostas de usuário (detalhe e /me), por processo
+USER_CACHE_TTL = config('USER_CACHE_TTL', default=60, cast=int)  # segundos
+USER_CACHE_MAX_BYTES = config('USER_CACHE_MAX_BYTES', default=8 * 1024 * 1024, cast=int)
+
+# Listas paginadas (API e admin): COUNT(*) exato até esse número de linhas, estimativa do planner acima
+PAGINATION_EXACT_COUNT_THRESHOLD = config('PAGINATION_EXACT_COUNT_THRESHOLD', default=10_000, cast=int)
+
+# Máximo de ids aceitos por GET /users/batch
+USERS_BATCH_MAX_IDS = config('USERS_BATCH_MAX_IDS', default=100, cast=int)
+
+# Linhas buscadas por vez do cursor server-side em GET /users/export
+USERS_EXPORT_CHUNK_SIZE = config('USERS_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Importação em massa de usuários (POST /users/import e manage.py import_users)
+USERS_IMPORT_BATCH_SIZE = config('USERS_IMPORT_BATCH_SIZE', default=500, cast=int)
+USERS_IMPORT_HASH_WORKERS = config('USERS_IMPORT_HASH_WORKERS', default=4, cast=int)
+
+# Tamanho de cada chunk de UPDATE/DELETE em PATCH/DELETE /users/bulk
+USERS_BULK_CHUNK_SIZE = config('USERS_BULK_CHUNK_SIZE', default=1000, cast=int)
+# Máximo de ids explícitos por PATCH/DELETE /users/bulk (alvos por filtro não têm limite)
+USERS_BULK_MAX_IDS = config('USERS_BULK_MAX_IDS', default=10000, cast=int)
+
+# Links de ativação/reset com token assinado (sem tabela de token). As rotas aceitam os dois formatos
+USERS_STATELESS_TOKENS = config('USERS_STATELESS_TOKENS', default=False, cast=bool)
+
+# Campanhas de email (manage.py run_campaigns): destinatários por lote/checkpoint, envios SMTP
+# simultâneos e taxa máxima (emails/s, 0 = sem limite)
+CAMPAIGN_BATCH_SIZE = config('CAMPAIGN_BATCH_SIZE', default=200, cast=int)
+CAMPAIGN_CONCURRENCY = config('CAMPAIGN_CONCURRENCY', default=2, cast=int)
+CAMPAIGN_MAX_RATE = config('CAMPAIGN_MAX_RATE', default=20, cast=float)
+
+# Janela (segundos) em que pedidos repetidos de reset/reenvio de ativação do mesmo usuário
+# reaproveitam o token já enviado, sem novo token nem novo email. 0 desliga
+USERS_EMAIL_COALESCE_SECONDS = config('USERS_EMAIL_COALESCE_SECONDS', default=300, cast=int)
+
+# Tokens de ativação/reset usados ou expirados há mais que isso são apagados (manage.py purge_tokens)
+TOKEN_RETENTION_DAYS = config('TOKEN_RETENTION_DAYS', default=7, cast=int)
+TOKEN_PURGE_BATCH_SIZE = config('TOKEN_PURGE_BATCH_SIZE', default=1000, cast=int)
+
+# Intervalo (segundos) entre as gravações em lote de last_login/last_seen. 0 grava a cada acesso
+ACTIVITY_FLUSH_INTERVAL = config('ACTIVITY_FLUSH_INTERVAL', default=10, cast=float)
+
+# Outbox de emails (manage.py send_outbox): mensagens por lote, tentativas e backoff base (segundos)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOX_RETRY_BASE_SECONDS = config('OUTBOX_RETRY_BASE_SECONDS', default=30, cast=int)
+
 ROOT_URLCONF = 'myapi.urls'
 
 TEMPLATES = [
@@ -210,6 +274,11 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('GMAIL_EMAIL', default='')
 EMAIL_HOST_PASSWORD = config('GMAIL_APP_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('GMAIL_EMAIL', default='')
+# Pool de conexões SMTP do infra.mailer: conexões simultâneas, descarte por ociosidade e NOOP
+# antes de reusar uma conexão parada há mais de EMAIL_POOL_HEALTHCHECK_AFTER (segundos)
+EMAIL_POOL_SIZE = config('EMAIL_POOL_SIZE', default=4, cast=int)
+EMAIL_POOL_IDLE_TIMEOUT = config('EMAIL_POOL_IDLE_TIMEOUT', default=60, cast=int)
+EMAIL_POOL_HEALTHCHECK_AFTER = config('EMAIL_POOL_HEALTHCHECK_AFTER', default=10, cast=int)
 
 # SITE_ID (required for allauth)
 SITE_ID = 1
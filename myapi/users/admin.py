@@ -1,7 +1,19 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 from django.contrib.auth.admin import UserAdmin
 
-from .models import ActivationToken, UUIDUser
+from ..core.pagination import EstimatedCountPaginator
+from .models import ActivationToken, Campaign, UUIDUser
+from .search import search_users
+
+
+class UserSearchChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        # Sem ordenação escolhida na tabela, a busca mostra os mais relevantes primeiro
+        if self.query and ORDER_VAR not in self.params:
+            queryset = queryset.order_by('-search_rank', '-pk')
+        return queryset
 
 
 # Register custom User with full Django Admin interface
@@ -10,7 +22,7 @@ class MyUserAdmin(UserAdmin):
     # Fields that will appear in the user list
     list_display = ('id', 'username', 'email', 'first_name', 'last_name', 'is_staff', 'date_joined')
 
-    # Fields for search
+    # Fields for search (a busca usa o índice full-text, ver get_search_results)
     search_fields = ('username', 'email', 'first_name', 'last_name')
 
     # Filters in the sidebar
@@ -19,10 +31,23 @@ class MyUserAdmin(UserAdmin):
     # Organization of fields in the edit form
     fieldsets = UserAdmin.fieldsets + (
         ('UUID Info', {'fields': ('id',)}),  # Shows UUID (read-only)
+        ('Activity', {'fields': ('last_seen',)}),
     )
 
     # Read-only fields
-    readonly_fields = ('id', 'date_joined', 'last_login')
+    readonly_fields = ('id', 'date_joined', 'last_login', 'last_seen')
+
+    # Contagem estimada em tabelas grandes e sem o COUNT(*) extra do total sem filtros
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):  # noqa: PLR6301
+        if not search_term:
+            return queryset, False
+        return search_users(queryset, search_term), False
+
+    def get_changelist(self, request, **kwargs):  # noqa: PLR6301
+        return UserSearchChangeList
 
 
 @admin.register(ActivationToken)
@@ -32,3 +57,25 @@ class ActivationTokenAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__email')
     readonly_fields = ('id', 'user', 'created_at', 'updated_at')
     ordering = ('-created_at',)
+
+
+@admin.register(Campaign)
+class CampaignAdmin(admin.ModelAdmin):
+    list_display = ('name', 'template', 'status', 'sent', 'failed', 'total', 'created_at', 'finished_at')
+    list_filter = ('status', 'template')
+    search_fields = ('name',)
+    readonly_fields = ('id', 'cursor', 'total', 'sent', 'failed', 'last_error', 'started_at', 'finished_at')
+    ordering = ('-created_at',)
+    actions = ['pause', 'resume']
+
+    @admin.action(description='Pausar campanhas selecionadas')
+    def pause(self, request, queryset):
+        paused = queryset.filter(status__in=[Campaign.Status.QUEUED, Campaign.Status.RUNNING]).update(
+            status=Campaign.Status.PAUSED
+        )
+        self.message_user(request, f'{paused} campanha(s) pausada(s)')
+
+    @admin.action(description='Retomar campanhas selecionadas')
+    def resume(self, request, queryset):
+        resumed = queryset.filter(status=Campaign.Status.PAUSED).update(status=Campaign.Status.QUEUED)
+        self.message_user(request, f'{resumed} campanha(s) de volta à fila')
@@ -1,26 +1,59 @@
 import uuid
+from typing import Literal
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_slug
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.template import TemplateDoesNotExist
 from loguru import logger
-from ninja import Router
+from ninja import Query, Router
 from ninja.pagination import paginate
-from ninja.responses import Response
 
+from ..core import activity
 from ..core.auth import AdminAuth, JWTAuth, OwnerOrAdminAuth
-from ..core.exceptions import ConflictError, NotFoundError, ServiceError, ValidationError
+from ..core.emails import compiled
+from ..core.etag import etag_matches, if_match_versions, not_modified, private, version_etag
+from ..core.exceptions import (
+    ConflictError,
+    NotFoundError,
+    PreconditionFailedError,
+    ServiceError,
+    ValidationError,
+)
+from ..core.pagination import EstimatedCountPagination
 from ..core.ratelimit import check_rate_limit
+from ..core.schemas import ResponseCacheStatsSchema
+from .bulk import BulkTargets, bulk_delete_users, bulk_update_users
+from .cache import cache_user_response, invalidate_users, user_cache_key, user_response_cache
+from .campaigns import template_name
+from .export import export_response
+from .importer import UserImporter, parse_rows, text_stream
+from .models import Campaign, unique_violation_message
 from .schemas import (
+    CampaignCreateSchema,
+    CampaignSchema,
     PasswordResetConfirmSchema,
     PasswordResetRequestSchema,
+    UserBatchSchema,
+    UserBulkDeleteSchema,
+    UserBulkPatchSchema,
+    UserBulkResultSchema,
     UserCreateSchema,
+    UserFilterSchema,
+    UserImportReportSchema,
     UserPatchPasswordSchema,
     UserPatchSchema,
     UserWithGroupsSchema,
 )
+from .search import search_users
 from .services import (
+    claim_email_slot,
     confirm_password_reset_token,
+    release_email_slot,
     send_activation_email,
     send_password_reset_email,
     validate_password_reset_token,
@@ -43,8 +76,17 @@ User = get_user_model()
     auth=JWTAuth(),
 )
 def get_current_user(request):
+    activity.touch(request.auth)
+    # O usuário já foi carregado pela autenticação, então o ETag não custa query extra
+    etag = version_etag(request, request.auth.id, request.auth.version)
+    if etag_matches(request, etag):
+        return private(not_modified(etag))
     logger.info(f'User {request.auth.username} retrieved their profile')
-    return request.auth
+    key = user_cache_key(request, request.auth.id, 'me')
+    cached = user_response_cache.get(key)
+    if cached is None or cached.etag != etag:
+        cached = cache_user_response(request, key, request.auth, etag)
+    return private(cached.to_response())
 
 
 ##############
@@ -54,12 +96,22 @@ def get_current_user(request):
     'users',
     response=list[UserWithGroupsSchema],
     summary='List users',
-    description='List users or filter by id/username',
+    description=(
+        'List users (newest first), filter by id/username, is_active, is_staff, joined_after/before and group, '
+        'or search by username, name and email (?search=)'
+    ),
     auth=AdminAuth(),
 )
-@paginate
-def list_users(request, id: uuid.UUID = None, username: str = None):
-    queryset = User.objects.all()
+@paginate(EstimatedCountPagination)
+def list_users(
+    request,
+    id: uuid.UUID = None,
+    username: str = None,
+    search: str = None,
+    filters: UserFilterSchema = Query(...),
+):
+    # date_joined tem índice (e índices parciais para inativos/staff), então a ordenação não custa um sort
+    queryset = filters.filter(User.objects.order_by('-date_joined', '-id'))
 
     if id:
         try:
@@ -79,10 +131,197 @@ def list_users(request, id: uuid.UUID = None, username: str = None):
             logger.warning(f'Attempt to retrieve non-existent user: username={username}')
             raise NotFoundError('User not found')
 
+    if search:
+        logger.info(f'Users searched for "{search}" by {request.auth}')
+        return search_users(queryset, search)
+
+    if filters.get_filter_expression():
+        logger.info(f'Users filtered by {filters.model_dump(exclude_none=True)} by {request.auth}')
+        return queryset
+
     logger.info(f'All users retrieved by {request.auth}')
     return queryset
 
 
+@router.get(
+    'users/batch',
+    response=UserBatchSchema,
+    summary='Get users in batch',
+    description='Retrieve several users by comma separated ids (?ids=a,b,c) in a single query',
+    auth=AdminAuth(),
+)
+def get_users_batch(request, ids: str):
+    requested = []
+    for raw_id in ids.split(','):
+        if not raw_id.strip():
+            continue
+        try:
+            requested.append(uuid.UUID(raw_id.strip()))
+        except ValueError:
+            raise ValidationError(f'Invalid user id: {raw_id.strip()}')
+
+    if not requested:
+        raise ValidationError('At least one id is required.')
+    if len(requested) > settings.USERS_BATCH_MAX_IDS:
+        raise ValidationError(f'At most {settings.USERS_BATCH_MAX_IDS} ids are allowed per request.')
+
+    users = {user.id: user for user in User.objects.filter(id__in=set(requested)).prefetch_related('groups')}
+    missing = [user_id for user_id in requested if user_id not in users]
+    logger.info(f'{len(users)} users retrieved in batch ({len(missing)} missing) by {request.auth}')
+    return {
+        'items': [{'id': user_id, 'found': user_id in users, 'user': users.get(user_id)} for user_id in requested],
+        'missing': missing,
+    }
+
+
+@router.get(
+    'users/export',
+    summary='Export users',
+    description='Stream every user as NDJSON or CSV using a server-side cursor',
+    auth=AdminAuth(),
+)
+def export_users(request, format: Literal['ndjson', 'csv'] = 'ndjson'):
+    logger.info(f'User export ({format}) started by {request.auth}')
+    return export_response(request, format, settings.USERS_EXPORT_CHUNK_SIZE)
+
+
+@router.post(
+    'users/import',
+    response=UserImportReportSchema,
+    summary='Import users in bulk',
+    description='Create users from a CSV or NDJSON request body, returning a per-row error report',
+    auth=AdminAuth(),
+)
+def import_users(request, format: Literal['csv', 'ndjson'] = 'csv', send_activation: bool = True):
+    # Lê o corpo como stream, sem carregar o arquivo inteiro em request.body
+    importer = UserImporter(
+        batch_size=settings.USERS_IMPORT_BATCH_SIZE,
+        hash_workers=settings.USERS_IMPORT_HASH_WORKERS,
+        send_activation=send_activation,
+    )
+    report = importer.run(parse_rows(text_stream(request), format))
+    logger.info(f'{report["created"]} users imported ({report["failed"]} failed) by {request.auth}')
+    return report
+
+
+@router.patch(
+    'users/bulk',
+    response=UserBulkResultSchema,
+    summary='Update users in bulk',
+    description='Apply the same changes to a list of ids or to every user matching a filter',
+    auth=AdminAuth(),
+)
+def bulk_patch_users(request, payload: UserBulkPatchSchema):
+    changes = payload.changes.dict(exclude_unset=True)
+    if not changes:
+        raise ValidationError('No changes provided.')
+    targets = BulkTargets(payload.ids, payload.filter)
+    logger.info(f'Bulk update ({targets}) requested by {request.auth} - fields: {list(changes)}')
+    return bulk_update_users(targets, changes, settings.USERS_BULK_CHUNK_SIZE)
+
+
+@router.delete(
+    'users/bulk',
+    response=UserBulkResultSchema,
+    summary='Delete users in bulk',
+    description='Delete a list of ids or every user matching a filter',
+    auth=AdminAuth(),
+)
+def bulk_delete(request, payload: UserBulkDeleteSchema):
+    targets = BulkTargets(payload.ids, payload.filter)
+    if targets.includes(request.auth.id):
+        raise ValidationError('You cannot delete your own account in bulk.')
+    logger.info(f'Bulk delete ({targets}) requested by {request.auth}')
+    return bulk_delete_users(targets, settings.USERS_BULK_CHUNK_SIZE)
+
+
+@router.get(
+    'users/cache-stats',
+    response=ResponseCacheStatsSchema,
+    summary='User response cache stats',
+    description='Hit rate, evictions and size of the user response cache of the worker that answers the request',
+    auth=AdminAuth(),
+)
+def get_user_cache_stats(request):
+    return user_response_cache.stats()
+
+
+def get_campaign(id):
+    try:
+        return Campaign.objects.get(id=id)
+    except Campaign.DoesNotExist:
+        raise NotFoundError('Campaign not found')
+
+
+def set_campaign_status(campaign, allowed, status):
+    # Update condicional: não sobrescreve uma mudança feita pelo worker no meio tempo
+    if not Campaign.objects.filter(id=campaign.id, status__in=allowed).update(status=status):
+        campaign.refresh_from_db()
+        raise ConflictError(f'Campaign is {campaign.status}')
+    campaign.refresh_from_db()
+    return campaign
+
+
+@router.post(
+    'users/campaigns',
+    response={201: CampaignSchema},
+    summary='Create email campaign',
+    description='Queue an email for every user matching a filter; sent by the run_campaigns worker',
+    auth=AdminAuth(),
+)
+def create_campaign(request, payload: CampaignCreateSchema):
+    try:
+        validate_slug(payload.template)
+        compiled(template_name(payload.template))
+    except (DjangoValidationError, TemplateDoesNotExist):
+        raise ValidationError(f'Unknown email template: {payload.template}')
+    filters = payload.filter.model_dump(mode='json', exclude_none=True) if payload.filter else {}
+    campaign = Campaign.objects.create(
+        name=payload.name, template=payload.template, filters=filters, context=payload.context
+    )
+    logger.info(f'Campaign {campaign.id} ({campaign.name}) queued by {request.auth} - filters: {filters}')
+    return 201, campaign
+
+
+@router.get(
+    'users/campaigns/{id}',
+    response=CampaignSchema,
+    summary='Get email campaign',
+    description='Progress of a campaign: sent, failed and throughput so far',
+    auth=AdminAuth(),
+)
+def get_campaign_detail(request, id: uuid.UUID):
+    return get_campaign(id)
+
+
+@router.post(
+    'users/campaigns/{id}/pause',
+    response=CampaignSchema,
+    summary='Pause email campaign',
+    description='The worker stops after the batch in progress; resume continues from there',
+    auth=AdminAuth(),
+)
+def pause_campaign(request, id: uuid.UUID):
+    campaign = set_campaign_status(
+        get_campaign(id), [Campaign.Status.QUEUED, Campaign.Status.RUNNING], Campaign.Status.PAUSED
+    )
+    logger.info(f'Campaign {id} paused by {request.auth}')
+    return campaign
+
+
+@router.post(
+    'users/campaigns/{id}/resume',
+    response=CampaignSchema,
+    summary='Resume email campaign',
+    description='Queue a paused campaign again; it continues from its last checkpoint',
+    auth=AdminAuth(),
+)
+def resume_campaign(request, id: uuid.UUID):
+    campaign = set_campaign_status(get_campaign(id), [Campaign.Status.PAUSED], Campaign.Status.QUEUED)
+    logger.info(f'Campaign {id} resumed by {request.auth}')
+    return campaign
+
+
 @router.get(
     'users/{id}',
     response=UserWithGroupsSchema,
@@ -91,52 +330,68 @@ def list_users(request, id: uuid.UUID = None, username: str = None):
     auth=OwnerOrAdminAuth(),
 )
 def get_user_detail_by_id(request, id: uuid.UUID):
+    # Lookup barato só da version: responde 304 e valida a entrada do cache sem carregar o usuário.
+    # O cache é por processo; conferir a versão evita servir dados que outro worker já alterou ou removeu
+    version = User.objects.filter(id=id).values_list('version', flat=True).first()
+    if version is None:
+        logger.warning(f'Attempt to retrieve non-existent user: {id}')
+        raise NotFoundError('User not found')
+    etag = version_etag(request, id, version)
+    if etag_matches(request, etag):
+        return private(not_modified(etag))
+
+    key = user_cache_key(request, id, 'detail')
+    cached = user_response_cache.get(key)
+    if cached is not None and cached.etag == etag:
+        logger.info(f'User id={id} retrieved from cache by {request.auth}')
+        return private(cached.to_response())
+
     try:
         user = User.objects.get(id=id)
     except User.DoesNotExist:
         logger.warning(f'Attempt to retrieve non-existent user: {id}')
         raise NotFoundError('User not found')
     logger.info(f'User {user.username} (id={id}) retrieved by {request.auth}')
-    return user
+    etag = version_etag(request, user.id, user.version)
+    return private(cache_user_response(request, key, user, etag).to_response())
 
 
-@router.post('users', response=UserWithGroupsSchema, summary='Create user', description='Create a new user', auth=None)
+@router.post(
+    'users', response={201: UserWithGroupsSchema}, summary='Create user', description='Create a new user', auth=None
+)
 def create_users(request, data: UserCreateSchema):
     check_rate_limit(request, group='register')
     try:
         validate_password(data.password)
     except DjangoValidationError as e:
         raise ValidationError(', '.join(e.messages))
-    # Pre-create validation: check username and email uniqueness
-    if User.objects.filter(username=data.username).exists():
-        logger.warning(f'Attempt to create user with existing username: {data.username}')
-        raise ConflictError('Username already exists')
-    if User.objects.filter(email=data.email).exists():
-        logger.warning(f'Attempt to create user with existing email: {data.email}')
-        raise ConflictError('Email already exists')
 
+    # Unicidade de username/email garantida pelos índices únicos, sem pre-check
     try:
-        user = User.objects.create_user(
-            username=data.username,
-            first_name=data.first_name,
-            last_name=data.last_name,
-            email=data.email,
-            password=data.password,
-            is_active=False,
-        )
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=data.username,
+                first_name=data.first_name,
+                last_name=data.last_name,
+                email=data.email,
+                password=data.password,
+                is_active=False,
+            )
+            # Token e email de ativação na mesma transação; o SMTP fica com o worker (send_outbox)
+            send_activation_email(user)
+    except IntegrityError as e:
+        message = unique_violation_message(e)
+        if message is None:
+            logger.error(f'Failed to create user: {e}')
+            raise ServiceError('An unknow Service error ocurred when creating an user.')
+        logger.warning(f'Attempt to create user with existing username/email: {data.username} / {data.email}')
+        raise ConflictError(message)
     except Exception as e:
         logger.error(f'Failed to create user: {e}')
         raise ServiceError('An unknow Service error ocurred when creating an user.')
 
-    # Send activation email
-    try:
-        send_activation_email(user)
-        logger.info(f'Activation email sent to {user.email}')
-    except Exception as e:
-        logger.error(f'Failed to send activation email to {user.email}: {e}')
-
     logger.info(f'User {user.username} (id={user.id}) created')
-    return Response(UserWithGroupsSchema.from_orm(user), status=201)
+    return 201, user
 
 
 @router.delete(
@@ -153,7 +408,7 @@ def delete_user(request, id: uuid.UUID):
     try:
         logger.info(f'User {user.username} (id={id}) deleted by {request.auth}')
         user.delete()
-        return Response(None, status=204)
+        return 204, None
     except Exception as e:
         logger.error(f'Failed to delete user: {e}')
         raise ServiceError('An unknow Service error ocurred when deleting an user.')
@@ -166,35 +421,38 @@ def delete_user(request, id: uuid.UUID):
     description='Update only specified user fields',
     auth=OwnerOrAdminAuth(),
 )
-def patch_user(request, id: uuid.UUID, payload: UserPatchSchema):
-    try:
-        user = User.objects.get(id=id)
-    except User.DoesNotExist:
-        logger.warning(f'Attempt to update non-existent user: {id}')
-        raise NotFoundError('User not found')
-
+def patch_user(request, response: HttpResponse, id: uuid.UUID, payload: UserPatchSchema):
     updated_fields = payload.dict(exclude_unset=True)
+    expected_versions = if_match_versions(request, id)
 
-    if 'username' in updated_fields:
-        if User.objects.filter(username=updated_fields['username']).exclude(id=id).exists():
-            raise ConflictError('Username already exists')
-    if 'email' in updated_fields:
-        if User.objects.filter(email=updated_fields['email']).exclude(id=id).exists():
-            raise ConflictError('Email already exists')
-
-    for field, value in updated_fields.items():
-        setattr(user, field, value)
-
+    # Um único UPDATE ... RETURNING: sem SELECT prévio nem reescrita das colunas não alteradas.
+    # Com If-Match, o UPDATE só acontece se a versão ainda for a que o cliente leu (sem lock de linha)
     try:
-        user.save()
-        logger.info(
-            f'User {user.username} (id={id}) updated by {request.auth} - fields: {list(updated_fields.keys())}'
-        )
-        return Response(UserWithGroupsSchema.from_orm(user), status=200)
+        with transaction.atomic():
+            user = User.objects.update_returning(id, expected_versions=expected_versions, **updated_fields)
+            if user is not None and updated_fields:
+                invalidate_users([id])
+    except IntegrityError as e:
+        message = unique_violation_message(e)
+        if message is None:
+            logger.error(f'Failed to update user: {e}')
+            raise ServiceError('An unknow Service error ocurred when updating an user.')
+        raise ConflictError(message)
     except Exception as e:
         logger.error(f'Failed to update user: {e}')
         raise ServiceError('An unknow Service error ocurred when updating an user.')
 
+    if user is None:
+        # Só no caminho de falha: diferencia usuário inexistente de versão desatualizada
+        if expected_versions is not None and User.objects.filter(id=id).exists():
+            logger.warning(f'Conflicting update on user {id} (If-Match: {request.headers["If-Match"]})')
+            raise PreconditionFailedError('User was modified by another request. Reload it and try again.')
+        logger.warning(f'Attempt to update non-existent user: {id}')
+        raise NotFoundError('User not found')
+    logger.info(f'User {user.username} (id={id}) updated by {request.auth} - fields: {list(updated_fields.keys())}')
+    response['ETag'] = version_etag(request, user.id, user.version)
+    return user
+
 
 @router.patch(
     'users/{id}/change-password',
@@ -225,7 +483,7 @@ def patch_user_password(request, id: uuid.UUID, payload: UserPatchPasswordSchema
     try:
         user.save()
         logger.info(f'User {user.username} (id={id}) changed password')
-        return Response(UserWithGroupsSchema.from_orm(user), status=200)
+        return user
     except Exception as e:
         logger.error(f'Failed to update password for user {user.username}: {e}')
         raise ServiceError('Failed to change password. Please try again later.')
@@ -238,15 +496,15 @@ def patch_user_password(request, id: uuid.UUID, payload: UserPatchPasswordSchema
     description='Activate user account using activation token',
     auth=None,
 )
-def activate_user(request, token_id: uuid.UUID):
-    user = verify_activation_token(str(token_id))
+def activate_user(request, token_id: str):
+    user = verify_activation_token(token_id)
 
     if user is None:
         logger.warning(f'Attempt to activate with invalid token: token_id={token_id}')
         raise ValidationError('Invalid activation token.')
 
     logger.info(f'User {user.username} activated')
-    return Response(UserWithGroupsSchema.from_orm(user), status=200)
+    return user
 
 
 @router.post(
@@ -256,20 +514,26 @@ def activate_user(request, token_id: uuid.UUID):
     description='Generate new activation token and send via e-mail',
     auth=None,
 )
-def resend_activation(request, token_id: uuid.UUID):
+def resend_activation(request, token_id: str):
     check_rate_limit(request, group='resend-activation', rate='3/m')
-    user = verify_activation_token(str(token_id), is_resend=True)
+    user = verify_activation_token(token_id, is_resend=True)
+
+    # Pedidos repetidos dentro da janela reaproveitam o token já enviado
+    if not claim_email_slot('activation', user.id):
+        logger.info(f'Activation resend for {user.username} coalesced with a recent request')
+        return user
 
     # Send new activation email (which creates a new token)
     try:
         send_activation_email(user)
-        logger.info(f'New activation email sent to {user.email} (old token: {token_id})')
+        logger.info(f'New activation email queued to {user.email} (old token: {token_id})')
     except Exception as e:
+        release_email_slot('activation', user.id)
         logger.error(f'Failed to send activation email to {user.email}: {e}')
         raise ServiceError('Failed to send activation email. Please try again later')
 
     logger.info(f'User {user.username} (id={user.id}) requested token resend')
-    return Response(UserWithGroupsSchema.from_orm(user), status=200)
+    return user
 
 
 ##############
@@ -285,21 +549,27 @@ def resend_activation(request, token_id: uuid.UUID):
 def request_password_reset(request, data: PasswordResetRequestSchema):
     check_rate_limit(request, group='password-reset', rate='3/m')
     try:
-        user = User.objects.get(email=data.email)
+        user = User.objects.with_email(data.email).get()
     except User.DoesNotExist:
         # For security, don't reveal if email exists
         logger.warning(f'Password reset requested for non-existent email: {data.email}')
-        return Response({'message': 'If email exists, a reset link will be sent'}, status=200)
+        return {'message': 'If email exists, a reset link will be sent'}
+
+    # Pedidos repetidos dentro da janela reaproveitam o token já enviado (mesma resposta)
+    if not claim_email_slot('password-reset', user.id):
+        logger.info(f'Password reset for {user.username} coalesced with a recent request')
+        return {'message': 'If email exists, a reset link will be sent'}
 
     # Send password reset email (which creates the token internally)
     try:
         send_password_reset_email(user)
-        logger.info(f'Password reset email sent to {user.email}')
+        logger.info(f'Password reset email queued to {user.email}')
     except Exception as e:
+        release_email_slot('password-reset', user.id)
         logger.error(f'Failed to send password reset email to {user.email}: {e}')
 
     logger.info(f'User {user.username} requested password reset')
-    return Response({'message': 'If email exists, a reset link will be sent'}, status=200)
+    return {'message': 'If email exists, a reset link will be sent'}
 
 
 @router.get(
@@ -309,9 +579,9 @@ def request_password_reset(request, data: PasswordResetRequestSchema):
     description='Check if password reset token is valid and not expired',
     auth=None,
 )
-def validate_password_reset(request, token_id: uuid.UUID):
-    result = validate_password_reset_token(str(token_id))
-    return Response(result, status=200)
+def validate_password_reset(request, token_id: str):
+    result = validate_password_reset_token(token_id)
+    return result
 
 
 @router.post(
@@ -321,8 +591,8 @@ def validate_password_reset(request, token_id: uuid.UUID):
     description='Confirm password reset and set new password',
     auth=None,
 )
-def confirm_password_reset(request, token_id: uuid.UUID, payload: PasswordResetConfirmSchema):
-    user = confirm_password_reset_token(str(token_id))
+def confirm_password_reset(request, token_id: str, payload: PasswordResetConfirmSchema):
+    user = confirm_password_reset_token(token_id)
 
     if user is None:
         logger.warning(f'Attempt to change password with invalid token: token_id={token_id}')
@@ -336,8 +606,10 @@ def confirm_password_reset(request, token_id: uuid.UUID, payload: PasswordResetC
     user.set_password(payload.new_password)
     try:
         user.save()
+        # O token foi consumido: um novo pedido de reset não deve cair na janela do anterior
+        release_email_slot('password-reset', user.id)
         logger.info(f'User {user.username} (id={user.id}) changed password')
-        return Response({'message': 'Password changed successfully'}, status=200)
+        return {'message': 'Password changed successfully'}
     except Exception as e:
         logger.error(f'Failed to update password for user {user.username}: {e}')
         raise ServiceError('Failed to change password. Please try again later.')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapi.users'
+
+    def ready(self):  # noqa: PLR6301
+        from . import signals  # noqa: F401, PLC0415
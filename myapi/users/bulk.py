@@ -0,0 +1,178 @@
+"""
+Atualização e remoção em massa de usuários.
+
+Os alvos são resolvidos só como ids (nunca linhas completas), um chunk por
+vez, cada um com um UPDATE/DELETE set-based na sua própria transação,
+para não segurar locks de milhares de linhas de uma vez. A invalidação de
+cache/ETag é feita por id, sem carregar os usuários.
+
+O DELETE não passa pelo collector do Django (que carregaria cada usuário e
+dispararia os signals por instância): as linhas que dependem do usuário com
+CASCADE só no Django (grupos, permissões, admin log, allauth) são apagadas
+antes com DELETEs por subconsulta, as com SET_NULL são zeradas com UPDATE; os
+tokens já têm cascade no banco.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import F
+from django.utils import timezone
+from loguru import logger
+
+from ..core.exceptions import ConflictError, ServiceError, ValidationError
+from .cache import invalidate_users
+from .models import unique_violation_message
+
+User = get_user_model()
+
+UNIQUE_FIELDS = ('username', 'email')
+
+
+class BulkTargets:
+    """
+    Alvos de uma operação em massa: lista explícita de ids (limitada por
+    USERS_BULK_MAX_IDS) ou filtro. Os ids de um filtro nunca são carregados de
+    uma vez: cada chunk é buscado por keyset (id > último id visto), então a
+    memória fica limitada ao tamanho do chunk qualquer que seja o filtro.
+    """
+
+    def __init__(self, ids=None, filters=None):
+        self.ids = None
+        self.queryset = None
+        if ids:
+            if len(ids) > settings.USERS_BULK_MAX_IDS:
+                raise ValidationError(f'At most {settings.USERS_BULK_MAX_IDS} ids are allowed per request.')
+            self.ids = list(dict.fromkeys(ids))
+        elif filters is not None and filters.get_filter_expression():
+            self.queryset = filters.filter(User.objects.all())
+        else:
+            raise ValidationError('Provide ids or at least one filter.')
+
+    def __str__(self):
+        return f'{len(self.ids)} ids' if self.ids is not None else 'filter'
+
+    def includes(self, user_id):
+        if self.ids is not None:
+            return user_id in self.ids
+        return self.queryset.filter(id=user_id).exists()
+
+    def first(self, limit):
+        if self.ids is not None:
+            return self.ids[:limit]
+        return list(self.queryset.order_by('id').values_list('id', flat=True)[:limit])
+
+    def chunks(self, chunk_size):
+        if self.ids is not None:
+            for start in range(0, len(self.ids), chunk_size):
+                yield self.ids[start : start + chunk_size]
+            return
+        last = None
+        while True:
+            queryset = self.queryset if last is None else self.queryset.filter(id__gt=last)
+            chunk = list(queryset.order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1]
+
+
+def check_unique_conflicts(targets, changes):
+    """Detecta conflitos de username/email pelos índices únicos (email sem diferenciar maiúsculas)."""
+    unique_changes = {field: changes[field] for field in UNIQUE_FIELDS if field in changes}
+    if not unique_changes:
+        return
+    ids = targets.first(2)
+    if len(ids) > 1:
+        raise ConflictError(f'{", ".join(unique_changes)} can only be changed for a single user')
+
+    if 'username' in unique_changes:
+        if User.objects.filter(username=unique_changes['username']).exclude(id__in=ids).exists():
+            raise ConflictError('Username already exists')
+    if unique_changes.get('email'):
+        if User.objects.with_email(unique_changes['email']).exclude(id__in=ids).exists():
+            raise ConflictError('Email already exists')
+
+
+def bulk_update_users(targets, changes, chunk_size):
+    check_unique_conflicts(targets, changes)
+    matched = affected = 0
+    for chunk in targets.chunks(chunk_size):
+        matched += len(chunk)
+        try:
+            with transaction.atomic():
+                affected += User.objects.filter(id__in=chunk).update(
+                    **changes, updated_at=timezone.now(), version=F('version') + 1
+                )
+                invalidate_users(chunk)
+        except IntegrityError as e:
+            message = unique_violation_message(e)
+            if message is None:
+                logger.error(f'Bulk update failed: {e}')
+                raise ServiceError('An unknow Service error ocurred when updating users.')
+            # Corrida com outra escrita entre o check e o UPDATE
+            raise ConflictError(message)
+    logger.info(f'Bulk update: {affected}/{matched} users updated - fields: {list(changes)}')
+    return {'matched': matched, 'affected': affected}
+
+
+def raw_delete(queryset):
+    # DELETE ... WHERE (subconsulta), sem buscar as linhas: o mesmo que o collector faz no fast delete
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_dependents(model, path, ids):
+    """
+    Reproduz em SQL, filhos antes dos pais, o on_delete das linhas que referenciam `model`.
+
+    CASCADE vira DELETE e SET_NULL vira UPDATE, ambos por subconsulta. Qualquer
+    outro on_delete (PROTECT, RESTRICT, SET_DEFAULT, SET) exigiria o collector,
+    então é recusado em vez de ser ignorado.
+    """
+    for relation in model._meta.related_objects:
+        related_model = relation.related_model
+        related_path = f'{relation.field.name}__{path}'
+        if relation.many_to_many:
+            through_path = f'{relation.field.m2m_reverse_field_name()}__{path}'
+            raw_delete(relation.through._base_manager.filter(**{f'{through_path}__in': ids}))
+        elif relation.on_delete is models.DO_NOTHING:
+            # A FK tem ON DELETE CASCADE no próprio banco (ver migration 0010)
+            continue
+        elif relation.on_delete is models.CASCADE:
+            delete_dependents(related_model, related_path, ids)
+            raw_delete(related_model._base_manager.filter(**{f'{related_path}__in': ids}))
+        elif relation.on_delete is models.SET_NULL:
+            related_model._base_manager.filter(**{f'{related_path}__in': ids}).update(**{relation.field.name: None})
+        else:
+            raise ImproperlyConfigured(
+                f'Bulk delete does not support on_delete={relation.on_delete.__name__} '
+                f'on {related_model._meta.label}.{relation.field.name}'
+            )
+
+
+def delete_users(ids):
+    """DELETE dos usuários e dependentes; devolve os ids efetivamente apagados."""
+    for field in User._meta.many_to_many:
+        raw_delete(field.remote_field.through._base_manager.filter(**{f'{field.m2m_field_name()}_id__in': ids}))
+    delete_dependents(User, 'id', ids)
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {qn(User._meta.db_table)} WHERE {qn(User._meta.pk.column)} = ANY(%s) '
+            f'RETURNING {qn(User._meta.pk.column)}',
+            [list(ids)],
+        )
+        return [user_id for (user_id,) in cursor.fetchall()]
+
+
+def bulk_delete_users(targets, chunk_size):
+    matched = affected = 0
+    for chunk in targets.chunks(chunk_size):
+        matched += len(chunk)
+        with transaction.atomic():
+            deleted = delete_users(chunk)
+            affected += len(deleted)
+            invalidate_users(deleted)
+    logger.info(f'Bulk delete: {affected}/{matched} users deleted')
+    return {'matched': matched, 'affected': affected}
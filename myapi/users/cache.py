@@ -0,0 +1,54 @@
+"""
+Cache read-through das respostas de detalhe de usuário e /me.
+
+A chave é (id do usuário, variante do schema, papel de quem lê, formato), e a
+consulta ao cache só acontece depois da autenticação/autorização do endpoint.
+As entradas são invalidadas pelos signals em `signals.py`.
+
+O cache é por processo e os signals só limpam o worker que fez a escrita, então
+cada entrada guarda o ETag (com a `version` do usuário) e só é servida se a
+versão atual no banco ainda for a mesma: um lookup barato por PK em vez de
+carregar o usuário, os grupos e serializar. As métricas ficam em
+GET users/cache-stats.
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from ..core.cache import CachedResponse, ResponseCache
+from ..core.renderers import NegotiatingRenderer, wants_msgpack
+from .schemas import UserWithGroupsSchema
+
+user_response_cache = ResponseCache(
+    ttl=getattr(settings, 'USER_CACHE_TTL', 60),
+    max_bytes=getattr(settings, 'USER_CACHE_MAX_BYTES', 8 * 1024 * 1024),
+)
+renderer = NegotiatingRenderer()
+
+
+def user_cache_key(request, user_id, variant):
+    role = 'staff' if getattr(request.auth, 'is_staff', False) else 'owner'
+    media = 'msgpack' if wants_msgpack(request) else 'json'
+    return str(user_id), variant, role, media
+
+
+def cache_user_response(request, key, user, etag) -> CachedResponse:
+    """Serializa o usuário uma vez e guarda os bytes prontos no cache."""
+    data = UserWithGroupsSchema.from_orm(user).model_dump()
+    cached = CachedResponse(
+        content=renderer.render(request, data, response_status=200),
+        content_type=renderer.content_type(request),
+        etag=etag,
+    )
+    user_response_cache.set(key, cached)
+    return cached
+
+
+def invalidate_users(user_ids):
+    """
+    Invalida já e de novo no commit, para não reter dados lidos por outra
+    requisição antes da transação de escrita terminar.
+    """
+    owners = [str(user_id) for user_id in user_ids]
+    user_response_cache.invalidate_many(owners)
+    transaction.on_commit(lambda: user_response_cache.invalidate_many(owners))
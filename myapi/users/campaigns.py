@@ -0,0 +1,170 @@
+"""
+Campanhas de email para a base de usuários.
+
+Os destinatários vêm de um cursor server-side (`.iterator(chunk_size=...)`) em
+ordem de id, a partir do checkpoint da campanha. Cada lote é renderizado de uma
+vez (templates já compilados, core/emails.py) e enviado pelo pool de conexões
+SMTP (infra/mailer.py) em até CAMPAIGN_CONCURRENCY envios simultâneos, com a
+taxa média limitada a CAMPAIGN_MAX_RATE emails/s.
+
+Depois de cada lote o checkpoint (último id processado) e os contadores são
+gravados: se o worker cair, a campanha recomeça no lote seguinte ao último
+gravado. O lote em andamento na queda é reenviado (entrega "pelo menos uma
+vez"). Um advisory lock do Postgres garante um único worker por campanha, e
+é liberado sozinho se a conexão do worker morrer. Pausar é mudar o status: o
+worker para depois do lote corrente.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from loguru import logger
+
+from infra import mailer
+
+from ..core.emails import render_many
+from .models import Campaign
+from .schemas import UserFilterSchema
+
+User = get_user_model()
+
+MAIL_FROM = 'contato@myapi.com'
+RECIPIENT_FIELDS = ('id', 'username', 'first_name', 'email')
+
+
+def template_name(template):
+    """Templates de campanha ficam em emails/campaigns/<slug>/, separados dos transacionais (ativação, reset)."""
+    return f'campaigns/{template}'
+
+
+def recipients(campaign):
+    """Destinatários ainda não processados, em ordem de id (a ordem do checkpoint)."""
+    # Só contas ativas, salvo filtro explícito: o email de um cadastro não ativado nunca foi confirmado
+    filters = UserFilterSchema(**{'is_active': True, **campaign.filters})
+    queryset = filters.filter(User.objects.exclude(email=''))
+    if campaign.cursor is not None:
+        queryset = queryset.filter(id__gt=campaign.cursor)
+    return queryset.order_by('id').values_list(*RECIPIENT_FIELDS)
+
+
+@contextmanager
+def campaign_lock(campaign):
+    """Advisory lock de sessão por campanha; devolve False se outro worker já a tem."""
+    key = campaign.id.int % 2**63
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+        locked = cursor.fetchone()[0]
+    try:
+        yield locked
+    finally:
+        if locked:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+
+
+class RateCap:
+    """Limita a taxa média: antes de cada lote espera até o total já enviado caber na taxa."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0.0
+        self.started = time.monotonic()
+        self.count = 0
+
+    def wait(self, count):
+        if self.interval:
+            delay = self.started + self.count * self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.count += count
+
+
+def send_concurrently(executor, messages, concurrency):
+    """Divide o lote entre `concurrency` envios, cada um por uma conexão do pool. Resultados em ordem."""
+    size = -(-len(messages) // concurrency)
+    results = []
+    for chunk_results in executor.map(
+        mailer.send_batch, [messages[i : i + size] for i in range(0, len(messages), size)]
+    ):
+        results.extend(chunk_results)
+    return results
+
+
+def start(campaign):
+    if campaign.started_at is None:
+        campaign.started_at = timezone.now()
+        campaign.total = recipients(campaign).count()
+    campaign.status = Campaign.Status.RUNNING
+    campaign.save(update_fields=['status', 'started_at', 'total', 'updated_at'])
+
+
+def checkpoint(campaign, last_id, results):
+    """Grava o progresso do lote e devolve o status atual (para perceber uma pausa)."""
+    errors = [error for error in results if error is not None]
+    changes = {
+        'cursor': last_id,
+        'sent': F('sent') + len(results) - len(errors),
+        'failed': F('failed') + len(errors),
+        'updated_at': timezone.now(),
+    }
+    if errors:
+        changes['last_error'] = str(errors[-1])[:1000]
+    Campaign.objects.filter(pk=campaign.pk).update(**changes)
+    return Campaign.objects.values_list('status', flat=True).get(pk=campaign.pk)
+
+
+def run_campaign(campaign, batch_size=None, concurrency=None, rate=None):
+    """
+    Envia (ou retoma) a campanha até o fim ou até ser pausada.
+
+    Devolve a campanha atualizada, ou None se ela já estiver com outro worker.
+    """
+    batch_size = batch_size or settings.CAMPAIGN_BATCH_SIZE
+    concurrency = concurrency or settings.CAMPAIGN_CONCURRENCY
+    rate = settings.CAMPAIGN_MAX_RATE if rate is None else rate
+
+    with campaign_lock(campaign) as locked:
+        if not locked:
+            logger.info(f'Campaign {campaign.id} is already being sent by another worker')
+            return None
+        campaign.refresh_from_db()
+        if campaign.status not in {Campaign.Status.QUEUED, Campaign.Status.RUNNING}:
+            return campaign
+
+        start(campaign)
+        logger.info(f'Campaign {campaign.id} ({campaign.name}) sending to {campaign.total} users')
+        rate_cap = RateCap(rate)
+        status = Campaign.Status.RUNNING
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='campaign') as executor:
+            rows = recipients(campaign).iterator(chunk_size=batch_size)
+            while batch := list(islice(rows, batch_size)):
+                contexts = [
+                    {**campaign.context, 'name': first_name or username, 'username': username, 'email': email}
+                    for _, username, first_name, email in batch
+                ]
+                recipients_batch = [row[3] for row in batch]
+                messages = render_many(template_name(campaign.template), contexts, MAIL_FROM, recipients_batch)
+                rate_cap.wait(len(messages))
+                status = checkpoint(campaign, batch[-1][0], send_concurrently(executor, messages, concurrency))
+                if status != Campaign.Status.RUNNING:
+                    break
+
+        if status == Campaign.Status.RUNNING:
+            Campaign.objects.filter(pk=campaign.pk).update(status=Campaign.Status.DONE, finished_at=timezone.now())
+        campaign.refresh_from_db()
+
+    logger.info(
+        f'Campaign {campaign.id} {campaign.status}: {campaign.sent} sent, {campaign.failed} failed '
+        f'of {campaign.total} ({campaign.throughput:.1f} emails/s)'
+    )
+    return campaign
+
+
+def pending_campaigns():
+    return Campaign.objects.filter(status__in=[Campaign.Status.QUEUED, Campaign.Status.RUNNING]).order_by('created_at')
@@ -0,0 +1,211 @@
+"""
+Importação em massa de usuários a partir de CSV ou NDJSON.
+
+As linhas são processadas em lotes. Para cada lote:
+1. validação de schema/senha linha a linha (erros vão para o relatório);
+2. uma única query set-based para checar username/email já existentes;
+3. hash das senhas em paralelo (PBKDF2 libera o GIL, então threads escalam);
+4. insert com bulk_create e tokens de ativação em bulk, com os emails
+   enfileirados para depois do commit, sem envio inline.
+"""
+
+import codecs
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from loguru import logger
+from pydantic import ValidationError as PydanticValidationError
+
+from .schemas import UserCreateSchema
+from .services import enqueue_activation_emails
+
+User = get_user_model()
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def parse_rows(stream, import_format):
+    """
+    Lê um stream de texto e gera (número da linha, dict) sem carregar tudo na memória.
+
+    Linhas NDJSON inválidas geram (número da linha, None) para entrar no relatório.
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def text_stream(binary_stream):
+    """Decodifica incrementalmente qualquer objeto com read() (arquivo ou HttpRequest)."""
+    return codecs.getreader('utf-8')(binary_stream)
+
+
+class ImportReport:
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.errors = []
+
+    def fail(self, row_number, username, messages):
+        self.errors.append({'row': row_number, 'username': username, 'errors': messages})
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+        }
+
+
+class UserImporter:
+    def __init__(self, batch_size=500, hash_workers=4, send_activation=True):
+        self.batch_size = batch_size
+        self.hash_workers = hash_workers
+        self.send_activation = send_activation
+        self.report = ImportReport()
+        # Usernames/emails já vistos neste import, para duplicatas entre lotes
+        self.seen_usernames = set()
+        self.seen_emails = set()
+
+    def run(self, rows):
+        self.last_row = 0
+        rows = self.until_decode_error(rows)
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+            while batch := list(islice(rows, self.batch_size)):
+                self.import_batch(batch, executor)
+        logger.info(
+            f'User import finished: {self.report.created}/{self.report.total} created, '
+            f'{len(self.report.errors)} failed'
+        )
+        return self.report.as_dict()
+
+    def until_decode_error(self, rows):
+        """
+        Repassa as linhas até o corpo deixar de ser UTF-8 válido. O que veio antes
+        é importado normalmente; o erro entra no relatório no lugar de virar um 500.
+        """
+        try:
+            for number, row in rows:
+                self.last_row = number
+                yield number, row
+        except UnicodeDecodeError as e:
+            self.report.fail(
+                self.last_row + 1,
+                None,
+                [f'Invalid UTF-8 ({e.reason}) after row {self.last_row}; the remaining rows were not imported'],
+            )
+
+    def import_batch(self, batch, executor):
+        self.report.total += len(batch)
+        valid = [item for item in (self.validate_row(number, row) for number, row in batch) if item]
+        valid = self.drop_existing(valid)
+        if not valid:
+            return
+
+        hashes = executor.map(make_password, [data.password for _, data in valid])
+        users = [
+            User(
+                username=data.username,
+                first_name=data.first_name,
+                last_name=data.last_name,
+                email=data.email,
+                password=password,
+                is_active=not self.send_activation,
+            )
+            for (_, data), password in zip(valid, hashes)
+        ]
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                if self.send_activation:
+                    enqueue_activation_emails(users)
+            self.report.created += len(users)
+        except IntegrityError:
+            # Conflito com um cadastro concorrente: refaz linha a linha para apontar o culpado
+            self.insert_one_by_one(valid, users)
+
+    def validate_row(self, row_number, row):
+        if row is None:
+            self.report.fail(row_number, None, ['Invalid row format.'])
+            return None
+        try:
+            data = UserCreateSchema.model_validate(row)
+        except PydanticValidationError as e:
+            messages = [f'{".".join(str(loc) for loc in err["loc"])}: {err["msg"]}' for err in e.errors()]
+            self.report.fail(row_number, row.get('username'), messages)
+            return None
+
+        messages = []
+        try:
+            validate_password(data.password)
+        except DjangoValidationError as e:
+            messages.extend(e.messages)
+        if data.username in self.seen_usernames:
+            messages.append('Username is duplicated in the import file')
+        if data.email.lower() in self.seen_emails:
+            messages.append('Email is duplicated in the import file')
+        if messages:
+            self.report.fail(row_number, data.username, messages)
+            return None
+
+        self.seen_usernames.add(data.username)
+        self.seen_emails.add(data.email.lower())
+        return row_number, data
+
+    def drop_existing(self, valid):
+        """Uma única query por lote para os usernames/emails que já existem."""
+        usernames = {data.username for _, data in valid}
+        emails = {data.email.lower() for _, data in valid}
+        existing = list(
+            User.objects.alias(email_lower=Lower('email'))
+            .filter(Q(username__in=usernames) | (Q(email_lower__in=emails) & ~Q(email='')))
+            .values_list('username', 'email')
+        )
+        taken_usernames = {username for username, _ in existing}
+        taken_emails = {email.lower() for _, email in existing}
+
+        remaining = []
+        for row_number, data in valid:
+            messages = []
+            if data.username in taken_usernames:
+                messages.append('Username already exists')
+            if data.email.lower() in taken_emails:
+                messages.append('Email already exists')
+            if messages:
+                self.report.fail(row_number, data.username, messages)
+            else:
+                remaining.append((row_number, data))
+        return remaining
+
+    def insert_one_by_one(self, valid, users):
+        for (row_number, data), user in zip(valid, users):
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                    if self.send_activation:
+                        enqueue_activation_emails([user])
+                self.report.created += 1
+            except IntegrityError:
+                self.report.fail(row_number, data.username, ['Username or email already exists'])
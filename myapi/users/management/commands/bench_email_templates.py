@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import render_to_string
+
+from myapi.core.emails import PARTS, compiled, render_many
+
+CONTEXT = {'name': 'Maria', 'url': 'https://example.com/activate/abc', 'expiry_minutes': 15}
+
+
+def parse_every_time(name, contexts):
+    # Sem cache nenhum: lê e compila os templates a cada destinatário
+    engine = engines['django']
+    for context in contexts:
+        for part in PARTS:
+            source = engine.engine.find_template(f'emails/{name}/{part}')[0].source
+            engine.from_string(source).render(context)
+
+
+def render_to_string_each(name, contexts):
+    # Busca o template no loader a cada destinatário (loader com cache do Django)
+    for context in contexts:
+        for part in PARTS:
+            render_to_string(f'emails/{name}/{part}', context)
+
+
+def compiled_batch(name, contexts):
+    render_many(name, contexts, 'bench@myapi.com', ['bench@example.com'] * len(contexts))
+
+
+STRATEGIES = {
+    'parse sempre': parse_every_time,
+    'render_to_string': render_to_string_each,
+    'compilado/lote': compiled_batch,
+}
+
+
+class Command(BaseCommand):
+    help = 'Mede a renderização dos templates de email: parse a cada envio vs templates compilados em lote.'
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument(
+            '--recipients', type=int, default=2000, help='Destinatários por estratégia (default: 2000)'
+        )
+        parser.add_argument('--template', default='activation', help='Email em emails/<nome>/ (default: activation)')
+
+    def handle(self, *args, **options):
+        name = options['template']
+        contexts = [{**CONTEXT, 'name': f'Usuário {index}'} for index in range(options['recipients'])]
+        compiled(name)  # a primeira compilação não entra na medida
+
+        self.stdout.write(f'{len(contexts)} destinatários, template {name}\n')
+        self.stdout.write(f'{"estratégia":<18}{"emails/s":>12}')
+        for label, strategy in STRATEGIES.items():
+            started = time.perf_counter()
+            strategy(name, contexts)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{label:<18}{len(contexts) / elapsed:>12.0f}')
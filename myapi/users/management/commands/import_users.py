@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myapi.users.importer import IMPORT_FORMATS, UserImporter, parse_rows, text_stream
+
+
+class Command(BaseCommand):
+    help = 'Importa usuários em massa a partir de um arquivo CSV ou NDJSON.'
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument('path', help='Arquivo CSV (com cabeçalho) ou NDJSON')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Formato do arquivo (default: pela extensão)')
+        parser.add_argument('--batch-size', type=int, default=settings.USERS_IMPORT_BATCH_SIZE)
+        parser.add_argument('--hash-workers', type=int, default=settings.USERS_IMPORT_HASH_WORKERS)
+        parser.add_argument(
+            '--no-activation', action='store_true', help='Cria os usuários já ativos, sem email de ativação'
+        )
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or ('ndjson' if options['path'].endswith(('.ndjson', '.jsonl')) else 'csv')
+        importer = UserImporter(
+            batch_size=options['batch_size'],
+            hash_workers=options['hash_workers'],
+            send_activation=not options['no_activation'],
+        )
+        try:
+            with open(options['path'], 'rb') as file:
+                report = importer.run(parse_rows(text_stream(file), import_format))
+        except OSError as e:
+            raise CommandError(f'Não foi possível ler {options["path"]}: {e}')
+
+        for error in report['errors']:
+            self.stderr.write(f'linha {error["row"]} ({error["username"]}): {"; ".join(error["errors"])}')
+        self.stdout.write(
+            self.style.SUCCESS(f'{report["created"]}/{report["total"]} usuários criados, {report["failed"]} com erro')
+        )
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myapi.users.retention import purge_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove tokens de ativação/redefinição de senha usados ou expirados há mais de TOKEN_RETENTION_DAYS, '
+        'em lotes. Com --interval roda continuamente como worker.'
+    )
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument('--retention-days', type=int, default=settings.TOKEN_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.TOKEN_PURGE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, help='Limite de lotes por tabela e motivo em cada execução')
+        parser.add_argument('--pause', type=float, default=0.0, help='Segundos de pausa entre lotes (default: 0)')
+        parser.add_argument('--interval', type=int, help='Repete a limpeza a cada N segundos (modo worker)')
+
+    def handle(self, *args, **options):
+        while True:
+            result = purge_tokens(
+                retention_days=options['retention_days'],
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+                pause=options['pause'],
+            )
+            for table, counts in result.items():
+                self.stdout.write(f'{table}: {counts["used"]} usados, {counts["expired"]} expirados removidos')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
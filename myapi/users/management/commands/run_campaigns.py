@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapi.users.campaigns import pending_campaigns, run_campaign
+from myapi.users.models import Campaign
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker de campanhas de email: envia (ou retoma do último checkpoint) as campanhas na fila. '
+        'Com --campaign envia só uma.'
+    )
+
+    def add_arguments(self, parser):  # noqa: PLR6301
+        parser.add_argument('--campaign', help='Id de uma campanha específica')
+        parser.add_argument('--batch-size', type=int, help='Destinatários por lote/checkpoint')
+        parser.add_argument('--concurrency', type=int, help='Envios SMTP simultâneos')
+        parser.add_argument('--rate', type=float, help='Máximo de emails por segundo (0 = sem limite)')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Espera com a fila vazia (default: 5)')
+        parser.add_argument('--once', action='store_true', help='Processa a fila atual e sai')
+
+    def handle(self, *args, **options):
+        settings = {key: options[key] for key in ('batch_size', 'concurrency', 'rate')}
+        if options['campaign']:
+            try:
+                campaign = Campaign.objects.get(pk=options['campaign'])
+            except (Campaign.DoesNotExist, ValueError):
+                raise CommandError(f'Campaign {options["campaign"]} not found')
+            self.report(run_campaign(campaign, **settings))
+            return
+
+        while True:
+            campaigns = list(pending_campaigns())
+            for campaign in campaigns:
+                self.report(run_campaign(campaign, **settings))
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
+
+    def report(self, campaign):
+        if campaign is None:
+            return
+        self.stdout.write(
+            f'{campaign.name}: {campaign.status}, {campaign.sent} enviados, {campaign.failed} falhas '
+            f'de {campaign.total} ({campaign.throughput:.1f} emails/s)'
+        )
@@ -0,0 +1,56 @@
+"""
+Índice único em lower(email), criado com CREATE INDEX CONCURRENTLY para não
+bloquear escritas na tabela de usuários durante o deploy.
+
+Se já existirem emails duplicados (ignorando maiúsculas), o CREATE falha e o
+Postgres deixa um índice INVALID para trás: resolva as duplicatas e rode a
+migração de novo (o DROP ... IF EXISTS inicial limpa a tentativa anterior).
+"""
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import myapi.users.models
+
+DROP_INDEX = 'DROP INDEX CONCURRENTLY IF EXISTS users_uuiduser_email_lower_uniq'
+
+# Um statement por execute: CONCURRENTLY não aceita o bloco implícito de múltiplos statements
+CREATE_INDEX = [
+    DROP_INDEX,
+    "CREATE UNIQUE INDEX CONCURRENTLY users_uuiduser_email_lower_uniq "
+    "ON users_uuiduser (LOWER(email)) WHERE NOT (email = '')",
+]
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY não pode rodar dentro de uma transação
+    atomic = False
+
+    dependencies = [
+        ('users', '0005_uuiduser_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='uuiduser',
+            managers=[
+                ('objects', myapi.users.models.UUIDUserManager()),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_INDEX, reverse_sql=[DROP_INDEX]),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='uuiduser',
+                    constraint=models.UniqueConstraint(
+                        django.db.models.functions.text.Lower('email'),
+                        condition=models.Q(('email', ''), _negated=True),
+                        name='users_uuiduser_email_lower_uniq',
+                        violation_error_message='Email already exists',
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,53 @@
+"""
+Coluna gerada search_vector (STORED).
+
+O ADD COLUMN de uma coluna gerada armazenada reescreve users_uuiduser
+inteira e segura ACCESS EXCLUSIVE (bloqueia leituras e escritas) até o fim:
+em tabelas grandes, rode numa janela de manutenção. Por isso fica numa
+migration atômica só sua; o índice GIN é criado depois, com CONCURRENTLY,
+na 0017.
+"""
+
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0006_uuiduser_email_lower_uniq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uuiduser',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector('username', config='simple', weight='A'),
+                        '||',
+                        django.contrib.postgres.search.SearchVector(
+                            'first_name', 'last_name', config='simple', weight='B'
+                        ),
+                        django.contrib.postgres.search.SearchConfig('simple'),
+                    ),
+                    '||',
+                    django.contrib.postgres.search.SearchVector(
+                        'email',
+                        django.db.models.functions.text.Replace(
+                            django.db.models.functions.text.Replace('email', models.Value('@'), models.Value(' ')),
+                            models.Value('.'),
+                            models.Value(' '),
+                        ),
+                        config='simple',
+                        weight='C',
+                    ),
+                    django.contrib.postgres.search.SearchConfig('simple'),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+    ]
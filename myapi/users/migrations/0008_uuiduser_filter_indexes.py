@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:33
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices criados com CONCURRENTLY, fora de transação
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0007_uuiduser_search_vector'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='uuiduser',
+            index=models.Index(fields=['date_joined', 'id'], name='users_uuiduser_joined_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='uuiduser',
+            index=models.Index(
+                condition=models.Q(('is_active', False)),
+                fields=['date_joined', 'id'],
+                name='users_uuiduser_inactive_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='uuiduser',
+            index=models.Index(
+                condition=models.Q(('is_staff', True)), fields=['date_joined', 'id'], name='users_uuiduser_staff_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:37
+
+import myapi.core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('users', '0008_uuiduser_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activationtoken',
+            name='id',
+            field=models.UUIDField(default=myapi.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='id',
+            field=models.UUIDField(default=myapi.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='uuiduser',
+            name='id',
+            field=models.UUIDField(default=myapi.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
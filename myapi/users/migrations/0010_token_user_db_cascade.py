@@ -0,0 +1,101 @@
+"""
+Troca as FKs dos tokens para ON DELETE CASCADE no próprio Postgres.
+
+No Django as FKs ficam como DO_NOTHING, então o collector não busca nem apaga
+os tokens: o DELETE do usuário remove tudo em um único statement. A nova FK é
+criada NOT VALID (troca rápida, sem varrer as tabelas) e validada na migration
+0015, em outra transação: o VALIDATE só pega SHARE UPDATE EXCLUSIVE, que não
+bloqueia escritas, em vez de manter os locks do ADD CONSTRAINT durante a varredura.
+
+A FK antiga é encontrada pela coluna (o nome gerado pelo Django pode variar);
+se não houver nenhuma, a migration falha em vez de seguir sem trocar nada.
+"""
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# (tabela, constraint criada pelo Django, constraint com cascade)
+FOREIGN_KEYS = [
+    (
+        'users_activationtoken',
+        'users_activationtoken_user_id_312a8d51_fk_users_uuiduser_id',
+        'users_activationtoken_user_id_fk_cascade',
+    ),
+    (
+        'users_passwordresettoken',
+        'users_passwordresettoken_user_id_2355945a_fk_users_uuiduser_id',
+        'users_passwordresettoken_user_id_fk_cascade',
+    ),
+]
+
+
+def user_fk_names(schema_editor, table):
+    """FKs de `table`.user_id para users_uuiduser, qualquer que seja o nome."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.conname FROM pg_constraint c '
+            'JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] '
+            "WHERE c.contype = 'f' AND c.conrelid = %s::regclass "
+            "AND c.confrelid = 'users_uuiduser'::regclass "
+            "AND cardinality(c.conkey) = 1 AND a.attname = 'user_id'",
+            [table],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def replace_fks(on_delete, validate):
+    def run(apps, schema_editor):
+        qn = schema_editor.quote_name
+        for table, django_name, cascade_name in FOREIGN_KEYS:
+            new_name = cascade_name if on_delete else django_name
+            old_names = user_fk_names(schema_editor, table)
+            if not old_names:
+                raise RuntimeError(f'No foreign key from {table}.user_id to users_uuiduser found')
+            for name in old_names:
+                schema_editor.execute(f'ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(name)}')
+            schema_editor.execute(
+                f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(new_name)} FOREIGN KEY (user_id) '
+                f'REFERENCES users_uuiduser (id) {on_delete} DEFERRABLE INITIALLY DEFERRED'
+                + ('' if validate else ' NOT VALID')
+            )
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('users', '0009_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    replace_fks('ON DELETE CASCADE', validate=False),
+                    # Desfazer é raro: a FK original volta já validada
+                    reverse_code=replace_fks('', validate=True),
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='activationtoken',
+                    name='user',
+                    field=models.ForeignKey(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name='activation_tokens',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name='passwordresettoken',
+                    name='user',
+                    field=models.ForeignKey(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name='password_reset_tokens',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('users', '0010_token_user_db_cascade'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uuiduser',
+            name='version',
+            field=models.IntegerField(db_default=1, default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:51
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices criados com CONCURRENTLY, fora de transação
+    atomic = False
+
+    dependencies = [
+        ('users', '0011_uuiduser_version'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='activationtoken',
+            index=models.Index(
+                condition=models.Q(('used_at__isnull', True)), fields=['expires_at'], name='users_activation_live_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='activationtoken',
+            index=models.Index(
+                condition=models.Q(('used_at__isnull', False)), fields=['used_at'], name='users_activation_used_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='passwordresettoken',
+            index=models.Index(
+                condition=models.Q(('used_at__isnull', True)), fields=['expires_at'], name='users_reset_live_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='passwordresettoken',
+            index=models.Index(
+                condition=models.Q(('used_at__isnull', False)), fields=['used_at'], name='users_reset_used_idx'
+            ),
+        ),
+    ]
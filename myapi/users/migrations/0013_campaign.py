@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:13
+
+import myapi.core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('users', '0012_token_lifecycle_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                (
+                    'id',
+                    models.UUIDField(default=myapi.core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                ('name', models.CharField(max_length=200)),
+                ('template', models.CharField(default='announcement', max_length=100)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('context', models.JSONField(blank=True, default=dict)),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[('queued', 'Queued'), ('running', 'Running'), ('paused', 'Paused'), ('done', 'Done')],
+                        default='queued',
+                        max_length=10,
+                    ),
+                ),
+                ('cursor', models.UUIDField(blank=True, editable=False, null=True)),
+                ('total', models.PositiveIntegerField(default=0, editable=False)),
+                ('sent', models.PositiveIntegerField(default=0, editable=False)),
+                ('failed', models.PositiveIntegerField(default=0, editable=False)),
+                ('last_error', models.TextField(blank=True, default='', editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(('status__in', ['queued', 'running'])),
+                        fields=['created_at'],
+                        name='users_campaign_pending_idx',
+                    )
+                ],
+            },
+        ),
+    ]
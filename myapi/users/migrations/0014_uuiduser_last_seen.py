@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('users', '0013_campaign'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uuiduser',
+            name='last_seen',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+"""
+Valida as FKs com cascade criadas NOT VALID na 0010.
+
+Fora de transação (atomic = False): cada VALIDATE pega só SHARE UPDATE
+EXCLUSIVE na tabela de tokens e ROW SHARE em users_uuiduser durante a
+varredura, sem bloquear leituras nem escritas. Em bancos onde a 0010 antiga
+já validou as FKs, o VALIDATE não faz nada.
+"""
+
+from django.db import migrations
+
+CONSTRAINTS = [
+    ('users_activationtoken', 'users_activationtoken_user_id_fk_cascade'),
+    ('users_passwordresettoken', 'users_passwordresettoken_user_id_fk_cascade'),
+]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('users', '0014_uuiduser_last_seen'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}',
+            reverse_sql=migrations.RunSQL.noop,
+        )
+        for table, name in CONSTRAINTS
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:37
+
+import django.core.validators
+import re
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('users', '0015_validate_token_user_fks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='campaign',
+            name='template',
+            field=models.CharField(
+                default='announcement',
+                max_length=100,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        re.compile('^[-a-zA-Z0-9_]+\\Z'),
+                        'Enter a valid “slug” consisting of letters, numbers, underscores or hyphens.',
+                        'invalid',
+                    )
+                ],
+            ),
+        ),
+    ]
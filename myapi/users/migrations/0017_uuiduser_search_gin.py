@@ -0,0 +1,38 @@
+"""
+Índice GIN de search_vector, separado da 0007.
+
+Fora de transação (atomic = False): CREATE INDEX CONCURRENTLY só pega SHARE
+UPDATE EXCLUSIVE, sem bloquear leituras nem escritas. Em bancos onde a 0007
+antiga já criou o índice, o IF NOT EXISTS não faz nada.
+"""
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('users', '0016_campaign_template_slug'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE INDEX CONCURRENTLY IF NOT EXISTS users_uuiduser_search_gin '
+                    'ON users_uuiduser USING gin (search_vector)',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS users_uuiduser_search_gin',
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='uuiduser',
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        fields=['search_vector'], name='users_uuiduser_search_gin'
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,26 +1,218 @@
-import uuid
-
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.auth.models import AbstractUser, Group, UserManager
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.validators import validate_slug
+from django.db import connections, models
+from django.db.models import F, Q, Value, prefetch_related_objects
+from django.db.models.functions import Lower, Replace
 from django.utils import timezone
 
+from ..core.ids import uuid7
+
+EMAIL_UNIQUE_CONSTRAINT = 'users_uuiduser_email_lower_uniq'
+
+
+class UUIDUserManager(UserManager):
+    def with_email(self, email):
+        """
+        Busca case-insensitive por email usando o índice único em lower(email).
+
+        O índice é parcial (ignora emails vazios), então a query repete o mesmo
+        predicado para o planner poder usá-lo.
+        """
+        return self.alias(email_lower=Lower('email')).filter(email_lower=email.lower()).exclude(email='')
+
+    def update_returning(self, pk, expected_versions=None, only_if=None, **changes):
+        """
+        Atualização parcial em um único statement: UPDATE ... SET <campos alterados> RETURNING.
+
+        Só as colunas alteradas (mais updated_at e version) são escritas; sem
+        alterações, nada é escrito e a linha atual é devolvida como está. Com
+        `expected_versions`, o UPDATE só acontece se a versão atual estiver entre
+        elas (controle otimista, sem SELECT FOR UPDATE); `only_if` adiciona
+        condições de igualdade por campo. Devolve a instância
+        montada a partir da linha retornada, com os grupos já pré-carregados,
+        ou None se nenhuma linha foi atualizada. Não dispara post_save.
+        """
+        opts = self.model._meta
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+
+        assignments, params = [], []
+        if changes:
+            changes = {**changes, 'updated_at': timezone.now()}
+        for name, value in changes.items():
+            field = opts.get_field(name)
+            assignments.append(f'{qn(field.column)} = %s')
+            params.append(field.get_db_prep_save(value, connection))
+
+        version = qn(opts.get_field('version').column)
+        if assignments:
+            assignments.append(f'{version} = {version} + 1')
+        where, where_params = f'{qn(opts.pk.column)} = %s', [opts.pk.get_db_prep_value(pk, connection)]
+        if expected_versions is not None:
+            where += f' AND {version} = ANY(%s)'
+            where_params.append(list(expected_versions))
+        for name, value in (only_if or {}).items():
+            field = opts.get_field(name)
+            where += f' AND {qn(field.column)} = %s'
+            where_params.append(field.get_db_prep_value(value, connection))
+
+        fields, returning = self._returning_clause(qn)
+        if assignments:
+            sql = f'UPDATE {qn(opts.db_table)} SET {", ".join(assignments)} WHERE {where} {returning}'
+        else:
+            # Nada a escrever: não mexe em updated_at nem em version (ETag e caches continuam válidos)
+            sql = f'SELECT {returning.removeprefix("RETURNING ")} FROM {qn(opts.db_table)} WHERE {where}'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, *where_params])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return self._from_returning(fields, row)
+
+    def _returning_clause(self, qn):
+        """RETURNING com as colunas do usuário e, na mesma ida ao banco, os ids dos grupos."""
+        opts = self.model._meta
+        table = qn(opts.db_table)
+        groups = opts.get_field('groups')
+        fields = [field for field in opts.concrete_fields if not field.generated]
+        columns = ', '.join(f'{table}.{qn(field.column)}' for field in fields)
+        group_ids = (
+            f'ARRAY(SELECT {qn(groups.m2m_reverse_name())} FROM {qn(groups.m2m_db_table())} '
+            f'WHERE {qn(groups.m2m_column_name())} = {table}.{qn(opts.pk.column)})'
+        )
+        return fields, f'RETURNING {columns}, {group_ids}'
+
+    def _from_returning(self, fields, row):
+        """Instância a partir da linha do RETURNING; sem grupos, não há query extra para serializar."""
+        *values, group_ids = row
+        instance = self.model.from_db(self.db, [field.attname for field in fields], values)
+        if group_ids:
+            prefetch_related_objects([instance], 'groups__permissions')
+        else:
+            instance._prefetched_objects_cache = {'groups': Group.objects.none()}
+        return instance
+
 
 class UUIDUser(AbstractUser):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     avatar_url = models.URLField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Incrementada a cada escrita: gera o ETag e permite updates condicionais (If-Match)
+    version = models.IntegerField(default=1, db_default=1, editable=False)
+    # Último acesso (login, refresh ou /me), gravado em lote por core/activity.py
+    last_seen = models.DateTimeField(null=True, blank=True, editable=False)
+    # Mantido pelo próprio Postgres; o email entra quebrado em @ e . para buscar por partes
+    search_vector = models.GeneratedField(
+        expression=SearchVector('username', weight='A', config='simple')
+        + SearchVector('first_name', 'last_name', weight='B', config='simple')
+        + SearchVector(
+            'email',
+            Replace(Replace('email', Value('@'), Value(' ')), Value('.'), Value(' ')),
+            weight='C',
+            config='simple',
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = UUIDUserManager()
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                Lower('email'),
+                condition=~Q(email=''),
+                name=EMAIL_UNIQUE_CONSTRAINT,
+                violation_error_message='Email already exists',
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='users_uuiduser_search_gin'),
+            # Listagem paginada (mais novos primeiro) e filtros joined_after/before
+            models.Index(fields=['date_joined', 'id'], name='users_uuiduser_joined_idx'),
+            # Inativos (cadastros aguardando ativação) e staff são minoria: índices parciais pequenos
+            models.Index(
+                fields=['date_joined', 'id'], name='users_uuiduser_inactive_idx', condition=Q(is_active=False)
+            ),
+            models.Index(fields=['date_joined', 'id'], name='users_uuiduser_staff_idx', condition=Q(is_staff=True)),
+        ]
 
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # O login só grava last_login, que não faz parte da resposta: não invalida o If-Match do cliente
+        if self._state.adding or (update_fields is not None and set(update_fields) == {'last_login'}):
+            super().save(*args, **kwargs)
+            return
+        # Incremento no banco (version = version + 1), não a partir do valor em memória: dois saves
+        # concorrentes da mesma linha geram versões diferentes e o ETag continua identificando o conteúdo
+        version, self.version = self.version, F('version') + 1
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            self.version = version
+            raise
+        self.refresh_from_db(fields=['version'])
+
+
+def unique_violation_message(error):
+    """Mensagem de conflito para um IntegrityError de username/email duplicado."""
+    diag = getattr(error.__cause__, 'diag', None)
+    constraint = getattr(diag, 'constraint_name', None) or str(error)
+    if EMAIL_UNIQUE_CONSTRAINT in constraint:
+        return 'Email already exists'
+    if 'username' in constraint:
+        return 'Username already exists'
+    return None
+
+
+class ActivationTokenManager(models.Manager):
+    def claim(self, token_id):
+        """
+        Marca o token como usado, se ainda não foi usado nem expirou, e devolve o user_id.
+
+        É um único UPDATE ... RETURNING: com pedidos concorrentes para o mesmo
+        token, o segundo espera o lock da linha, reavalia o WHERE e não recebe nada.
+        """
+        opts = self.model._meta
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {qn(opts.db_table)} SET used_at = %s, updated_at = %s '
+                f'WHERE {qn(opts.pk.column)} = %s AND used_at IS NULL AND expires_at > %s '
+                'RETURNING user_id',
+                [now, now, opts.pk.get_db_prep_value(token_id, connection), now],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
 
 class ActivationToken(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(UUIDUser, on_delete=models.CASCADE, related_name='activation_tokens')
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # ON DELETE CASCADE no banco (migração 0010): apagar o usuário não carrega os tokens no Python
+    user = models.ForeignKey(UUIDUser, on_delete=models.DO_NOTHING, related_name='activation_tokens')
     used_at = models.DateTimeField(null=True, blank=True)
     expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ActivationTokenManager()
+
+    class Meta:
+        indexes = [
+            # Conjunto vivo (não usados) e histórico de usados, para a limpeza em lotes (purge_tokens)
+            models.Index(fields=['expires_at'], name='users_activation_live_idx', condition=Q(used_at__isnull=True)),
+            models.Index(fields=['used_at'], name='users_activation_used_idx', condition=Q(used_at__isnull=False)),
+        ]
+
     def __str__(self):
         return f'ActivationToken for {self.user.username}'
 
@@ -32,13 +224,20 @@ class ActivationToken(models.Model):
 
 
 class PasswordResetToken(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(UUIDUser, on_delete=models.CASCADE, related_name='password_reset_tokens')
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # ON DELETE CASCADE no banco (migração 0010)
+    user = models.ForeignKey(UUIDUser, on_delete=models.DO_NOTHING, related_name='password_reset_tokens')
     used_at = models.DateTimeField(null=True, blank=True)
     expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='users_reset_live_idx', condition=Q(used_at__isnull=True)),
+            models.Index(fields=['used_at'], name='users_reset_used_idx', condition=Q(used_at__isnull=False)),
+        ]
+
     def __str__(self):
         return f'PasswordResetToken for {self.user.username}'
 
@@ -47,3 +246,62 @@ class PasswordResetToken(models.Model):
 
     def is_used(self):
         return self.used_at is not None
+
+
+class Campaign(models.Model):
+    """
+    Envio de um email (template em emails/campaigns/<template>/) para todos os usuários que batem com `filters`.
+
+    O progresso é salvo a cada lote: `cursor` é o último id de usuário
+    processado e os destinatários são percorridos em ordem de id, então um
+    worker que cai retoma do lote seguinte (ver users/campaigns.py).
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued'
+        RUNNING = 'running'
+        PAUSED = 'paused'
+        DONE = 'done'
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    name = models.CharField(max_length=200)
+    # Diretório em emails/campaigns/: só slug, para não virar caminho (../) no loader de templates
+    template = models.CharField(max_length=100, default='announcement', validators=[validate_slug])
+    # Campos de UserFilterSchema (is_active, is_staff, group, joined_after, joined_before). Sem
+    # is_active explícito vale is_active=True: cadastros não ativados não confirmaram o email
+    filters = models.JSONField(default=dict, blank=True)
+    # Contexto extra dos templates (ex.: subject e message do template announcement)
+    context = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    cursor = models.UUIDField(null=True, blank=True, editable=False)
+    total = models.PositiveIntegerField(default=0, editable=False)
+    sent = models.PositiveIntegerField(default=0, editable=False)
+    failed = models.PositiveIntegerField(default=0, editable=False)
+    last_error = models.TextField(blank=True, default='', editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # O worker só procura campanhas ainda por enviar
+            models.Index(
+                fields=['created_at'], name='users_campaign_pending_idx', condition=Q(status__in=['queued', 'running'])
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def processed(self):
+        return self.sent + self.failed
+
+    @property
+    def throughput(self):
+        """Emails processados por segundo desde o início (ou até o fim) do envio."""
+        if self.started_at is None:
+            return 0.0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return self.processed / elapsed if elapsed > 0 else 0.0
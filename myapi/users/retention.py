@@ -0,0 +1,70 @@
+"""
+Limpeza dos tokens de ativação e de redefinição de senha.
+
+Cada envio de email cria um token novo, então sem limpeza as tabelas crescem
+para sempre. São removidos, em lotes de tamanho fixo (cada lote é um DELETE
+curto na sua própria transação, sem segurar locks de milhares de linhas):
+
+- tokens usados há mais de `TOKEN_RETENTION_DAYS`;
+- tokens nunca usados que expiraram há mais de `TOKEN_RETENTION_DAYS`. A
+  carência existe porque o reenvio de ativação parte justamente de um token
+  expirado.
+
+Cada passada usa um índice parcial (usados por used_at, vivos por expires_at).
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from loguru import logger
+
+from .models import ActivationToken, PasswordResetToken
+
+TOKEN_MODELS = (ActivationToken, PasswordResetToken)
+
+
+def purge_conditions(now, retention_days):
+    cutoff = now - timedelta(days=retention_days)
+    return {
+        'used': Q(used_at__isnull=False, used_at__lt=cutoff),
+        'expired': Q(used_at__isnull=True, expires_at__lt=cutoff),
+    }
+
+
+def purge_batches(model, condition, batch_size, max_batches=None, pause=0.0):
+    """Apaga as linhas que batem com a condição, um lote por vez. Devolve o total apagado."""
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        # DELETE ... WHERE id IN (SELECT id ... LIMIT n): um statement por lote, sem carregar linhas no Python
+        batch = model.objects.filter(condition).values('id')[:batch_size]
+        count, _ = model.objects.filter(id__in=batch).delete()
+        deleted += count
+        batches += 1
+        if count < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def purge_tokens(retention_days=None, batch_size=None, max_batches=None, pause=0.0):
+    """Executa a limpeza em todas as tabelas de token. Devolve {tabela: {motivo: apagados}}."""
+    retention_days = settings.TOKEN_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = batch_size or settings.TOKEN_PURGE_BATCH_SIZE
+    conditions = purge_conditions(timezone.now(), retention_days)
+
+    result = {}
+    for model in TOKEN_MODELS:
+        started = time.monotonic()
+        result[model._meta.db_table] = counts = {
+            reason: purge_batches(model, condition, batch_size, max_batches, pause)
+            for reason, condition in conditions.items()
+        }
+        logger.info(
+            f'Token purge on {model._meta.db_table}: {counts["used"]} used and {counts["expired"]} expired '
+            f'removed in {time.monotonic() - started:.2f}s'
+        )
+    return result
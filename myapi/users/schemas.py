@@ -1,6 +1,11 @@
+import uuid
+from datetime import datetime
+from typing import Annotated, Any
+
 from django.contrib.auth import get_user_model
-from ninja import Field, ModelSchema, Schema
+from ninja import Field, FilterLookup, FilterSchema, ModelSchema, Schema
 from ninja.orm import create_schema
+from pydantic import field_validator
 
 # Para criar um novo Schema de User baseado no Model User
 User = get_user_model()
@@ -9,7 +14,7 @@ User = get_user_model()
 class UserSchema(ModelSchema):  # <= Não está sendo usado, é apenas para referência
     class Meta:
         model = User
-        exclude = ['password', 'last_login', 'date_joined', 'user_permissions', 'groups']
+        exclude = ['password', 'last_login', 'date_joined', 'user_permissions', 'groups', 'search_vector']
 
 
 UserWithGroupsSchema = create_schema(
@@ -20,6 +25,17 @@ UserWithGroupsSchema = create_schema(
 )
 
 
+class UserBatchItemSchema(Schema):
+    id: uuid.UUID
+    found: bool
+    user: UserWithGroupsSchema | None = None
+
+
+class UserBatchSchema(Schema):
+    items: list[UserBatchItemSchema]
+    missing: list[uuid.UUID]
+
+
 class UserCreateSchema(Schema):
     username: str = Field(..., example='newuser')
     first_name: str = Field(..., example='Firstname')
@@ -35,6 +51,47 @@ class UserPatchSchema(Schema):
     email: str | None = None
 
 
+class UserFilterSchema(FilterSchema):
+    is_active: bool | None = None
+    is_staff: bool | None = None
+    joined_after: Annotated[datetime | None, FilterLookup('date_joined__gte')] = None
+    joined_before: Annotated[datetime | None, FilterLookup('date_joined__lt')] = None
+    group: Annotated[str | None, FilterLookup('groups__name')] = None
+
+
+class UserBulkChangesSchema(Schema):
+    username: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    email: str | None = None
+    is_active: bool | None = None
+    is_staff: bool | None = None
+
+    @field_validator('*')
+    @classmethod
+    def reject_null(cls, value):
+        # Campo omitido = não alterar; null explícito violaria o NOT NULL das colunas
+        if value is None:
+            raise ValueError('null is not allowed; omit the field to keep its current value')
+        return value
+
+
+class UserBulkPatchSchema(Schema):
+    ids: list[uuid.UUID] | None = None
+    filter: UserFilterSchema | None = None
+    changes: UserBulkChangesSchema
+
+
+class UserBulkDeleteSchema(Schema):
+    ids: list[uuid.UUID] | None = None
+    filter: UserFilterSchema | None = None
+
+
+class UserBulkResultSchema(Schema):
+    matched: int
+    affected: int
+
+
 class UserPatchPasswordSchema(Schema):
     current_password: str = Field(..., example='strongpassword')
     new_password: str = Field(..., example='strongpassword')
@@ -46,3 +103,39 @@ class PasswordResetRequestSchema(Schema):
 
 class PasswordResetConfirmSchema(Schema):
     new_password: str = Field(..., example='strongpassword')
+
+
+class UserImportErrorSchema(Schema):
+    row: int
+    username: str | None = None
+    errors: list[str]
+
+
+class UserImportReportSchema(Schema):
+    total: int
+    created: int
+    failed: int
+    errors: list[UserImportErrorSchema]
+
+
+class CampaignCreateSchema(Schema):
+    name: str = Field(..., example='Novidades de outubro')
+    template: str = Field('announcement', example='announcement')
+    filter: UserFilterSchema | None = None
+    context: dict[str, Any] = Field(default_factory=dict, example={'subject': 'Novidades', 'message': 'Olá!'})
+
+
+class CampaignSchema(Schema):
+    id: uuid.UUID
+    name: str
+    template: str
+    status: str
+    total: int
+    sent: int
+    failed: int
+    processed: int
+    throughput: float
+    last_error: str
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -0,0 +1,37 @@
+"""
+Busca de usuários por username, nome e email.
+
+Usa a coluna `search_vector` (tsvector gerado pelo Postgres, com índice GIN),
+então o custo não cresce com o tamanho da tabela como os `ILIKE '%x%'`. Cada
+termo digitado vira um prefixo (`joh` encontra `john`), e os resultados são
+ordenados por relevância: username pesa mais que nome, que pesa mais que email.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Value
+
+# Mesma quebra do parser do Postgres: letras/dígitos, separados por qualquer outra coisa (inclusive _)
+TERM_PATTERN = re.compile(r'[^\W_]+')
+
+
+def search_query(text):
+    """Converte o texto digitado em um tsquery de prefixos, ou None se não houver termos."""
+    terms = TERM_PATTERN.findall(text.lower())
+    if not terms:
+        return None
+    # Os termos só têm letras/dígitos, então o tsquery 'raw' não precisa de escape
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='simple')
+
+
+def search_users(queryset, text):
+    query = search_query(text)
+    if query is None:
+        # Mantém a anotação para quem ordena por search_rank (admin)
+        return queryset.annotate(search_rank=Value(0.0)).none()
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F('search_vector'), query))
+        .order_by('-search_rank', 'username')
+    )
@@ -1,94 +1,126 @@
 from datetime import timedelta
 
 from decouple import config
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 from loguru import logger
 
-from infra.mailer import send_message
-
+from ..core import outbox
+from ..core.emails import render, render_many
 from ..core.exceptions import ServiceError, ValidationError
+from .cache import invalidate_users
 from .models import ActivationToken, PasswordResetToken
+from .tokens import activation_tokens, is_signed_token, password_reset_tokens
 
 User = get_user_model()
 
+MAIL_FROM = 'contato@myapi.com'
+
+
+def claim_email_slot(kind, user_id):
+    """
+    Reserva o envio de um email `kind` para o usuário na janela USERS_EMAIL_COALESCE_SECONDS.
+
+    cache.add é atômico no backend compartilhado: entre pedidos concorrentes,
+    vindos de qualquer IP ou processo, só um recebe True. Os demais devem
+    suprimir o envio; o token já enviado continua valendo (a janela é menor que
+    a validade do token).
+    """
+    window = settings.USERS_EMAIL_COALESCE_SECONDS
+    if window <= 0:
+        return True
+    return cache.add(f'users:email:{kind}:{user_id}', 1, timeout=window)
+
+
+def release_email_slot(kind, user_id):
+    """Libera a janela quando o envio falhou, para o usuário poder tentar de novo."""
+    cache.delete(f'users:email:{kind}:{user_id}')
+
 
 def send_activation_email(user, token_expiry_minutes=15):
     """
-    Send activation email to user with link to activate account.
+    Queue activation email to user with link to activate account.
+
+    The token and the email are written to the outbox in one transaction (the
+    caller's, when there is one); the SMTP delivery is done by `send_outbox`.
 
     Args:
         user: User instance
         token_expiry_minutes: Number of minutes until token expires (default: 15)
     """
+    try:
+        with transaction.atomic():
+            [token] = issue_activation_tokens([user], token_expiry_minutes)
+            outbox.enqueue([activation_mail_options(user, token, token_expiry_minutes)])
+        logger.info(f'Activation email queued to {user.email}')
+    except Exception as e:
+        logger.error(f'Error queueing activation email to {user.email}: {e}')
+        raise ServiceError('An error ocurred when sending the e-mail')
+
+
+def enqueue_activation_emails(users, token_expiry_minutes=15):
+    """
+    Create activation tokens for many users at once and queue their emails.
+
+    Tokens are inserted with a single bulk_create (or signed, without touching the
+    database), and the emails go to the outbox in the surrounding transaction.
+
+    Args:
+        users: Iterable of saved User instances
+        token_expiry_minutes: Number of minutes until token expires (default: 15)
+    """
+    users = list(users)
+    tokens = issue_activation_tokens(users, token_expiry_minutes)
+    messages = activation_mail_batch(users, tokens, token_expiry_minutes)
+    outbox.enqueue(messages)
+    logger.info(f'{len(messages)} activation emails queued')
+    return tokens
+
+
+def issue_activation_tokens(users, token_expiry_minutes=15):
+    """
+    Activation token (string used in the link) for each user, in order.
+
+    With USERS_STATELESS_TOKENS the tokens are signed and nothing is written;
+    otherwise one ActivationToken row per user is created in a single INSERT.
+    """
+    if settings.USERS_STATELESS_TOKENS:
+        return [activation_tokens.make_token(user, token_expiry_minutes) for user in users]
+    expires_at = timezone.now() + timedelta(minutes=token_expiry_minutes)
+    tokens = ActivationToken.objects.bulk_create([ActivationToken(user=user, expires_at=expires_at) for user in users])
+    return [str(token.id) for token in tokens]
+
+
+def activation_mail_options(user, token, token_expiry_minutes=15):
+    """Build the activation email (mailOptions) for an already issued token."""
+    return activation_mail_batch([user], [token], token_expiry_minutes)[0]
+
+
+def activation_mail_batch(users, tokens, token_expiry_minutes=15):
+    """Render the activation emails for many users at once (templates compiled only once)."""
+    contexts = [
+        {
+            'name': user.first_name or user.username,
+            'url': frontend_url(f'activate/{token}'),
+            'expiry_minutes': token_expiry_minutes,
+        }
+        for user, token in zip(users, tokens, strict=True)
+    ]
+    return render_many('activation', contexts, MAIL_FROM, [user.email for user in users])
+
+
+def frontend_url(path):
+    """Absolute frontend URL; https unless the frontend runs on localhost."""
     # Get frontend domain from env
     frontend_fqdn = config('FRONTEND_FQDN', default='localhost:3000')
 
     # Determine protocol based on domain
     use_https = 'localhost' not in frontend_fqdn
     protocol = 'https' if use_https else 'http'
-
-    # Create activation token record (id is the token)
-    expires_at = timezone.now() + timedelta(minutes=token_expiry_minutes)
-    activation_token = ActivationToken.objects.create(
-        user=user,
-        expires_at=expires_at,
-    )
-
-    # Build activation URL using the token id
-    activation_url = f'{protocol}://{frontend_fqdn}/activate/{activation_token.id}'
-
-    # Prepare email with HTML formatting
-    html_body = f"""
-    <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto;">
-                <h2>Bem-vindo!</h2>
-                <p>Olá <strong>{user.first_name or user.username}</strong>,</p>
-                <p>Clique no link abaixo para ativar sua conta:</p>
-                <p style="text-align: center; margin: 30px 0;">
-                    <a href="{activation_url}" style="background-color: #007bff; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; display: inline-block;">
-                        Ativar Conta
-                    </a>
-                </p>
-                <p style="font-size: 14px; color: #666;">
-                    Ou copie este link no seu navegador:<br>
-                    <code style="background-color: #f4f4f4; padding: 5px; border-radius: 3px; word-break: break-all;">
-                        {activation_url}
-                    </code>
-                </p>
-                <p style="font-size: 12px; color: #999;">
-                    Este link expira em <strong>{token_expiry_minutes} minutos</strong>.
-                </p>
-                <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
-                <p style="font-size: 12px; color: #999;">
-                    Se você não criou essa conta, ignore este email.
-                </p>
-                <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; text-align: center;">
-                    <p style="font-size: 12px; color: #666; margin: 5px 0;">
-                        <strong>Equipe Django Ninja API Boilerplate</strong><br>
-                        Email: <a href="mailto:djangoninja.api@gmail.com" style="color: #007bff; text-decoration: none;">djangoninja.api@gmail.com</a>
-                    </p>
-                </div>
-            </div>
-        </body>
-    </html>
-    """
-
-    # Prepare email
-    mail_options = {
-        'subject': 'Ative sua conta',
-        'body': html_body,
-        'from': 'contato@myapi.com',
-        'to': [user.email],
-    }
-
-    try:
-        send_message(mail_options)
-        logger.info(f'Activation email sent to {user.email}')
-    except Exception as e:
-        logger.error(f'Error sending activation email to {user.email}: {e}')
-        raise ServiceError('An error ocurred when sending the e-mail')
+    return f'{protocol}://{frontend_fqdn}/{path}'
 
 
 def verify_activation_token(token_id: str, is_resend: bool = False):
@@ -96,136 +128,149 @@ def verify_activation_token(token_id: str, is_resend: bool = False):
     Verify activation token.
 
     Args:
-        token_id: Activation token ID (UUID)
+        token_id: Activation token ID (UUID) or signed token
         is_resend: Check if this is a request for a new token or resend an expired one
 
     Returns:
         User instance if token is valid and not expired
-        None if token is invalid, expired, or already used
+
+    Raises:
+        ValidationError if token is invalid, expired, or already used
     """
-    try:
-        # Find activation token by id
-        activation_token = ActivationToken.objects.get(
-            id=token_id,
-        )
-    except ActivationToken.DoesNotExist:
-        logger.warning(f'Attempt to activate user with invalid token: token_id={token_id}')
-        raise ValidationError('Activation token not found')
+    if is_signed_token(token_id):
+        return verify_signed_activation_token(token_id, is_resend)
+    if is_resend:
+        return user_for_activation_resend(token_id)
+
+    # Tudo numa transação: o token é "consumido" por um UPDATE condicional e só então o
+    # usuário é ativado. Se o usuário já estava ativo, o rollback devolve o token
+    with transaction.atomic():
+        user_id = ActivationToken.objects.claim(token_id)
+        user = None
+        if user_id is not None:
+            user = User.objects.update_returning(user_id, only_if={'is_active': False}, is_active=True)
+        if user is None:
+            raise activation_error(token_id)
+        invalidate_users([user.id])
 
-    # Get the associated user
-    user = activation_token.user
+    logger.info(f'User {user.username} activated')
+    return user
 
-    # Check if user is already active
-    if user.is_active:
-        logger.warning(f'Attempt to resend activation for already active user: {user.username}')
-        raise ValidationError('User account is already activated')
 
-    # If requesting a new token, we don't need to check if it is expired or used, just return the user
+def activation_error(token_id):
+    """Só no caminho de falha: descobre por que o token não pôde ser usado."""
+    activation_token = ActivationToken.objects.select_related('user').filter(id=token_id).first()
+    if activation_token is None:
+        logger.warning(f'Attempt to activate user with invalid token: token_id={token_id}')
+        return ValidationError('Activation token not found')
+    if activation_token.user.is_active:
+        logger.warning(f'Attempt to activate already active user: {activation_token.user.username}')
+        return ValidationError('User account is already activated')
+    if activation_token.is_expired():
+        logger.warning(f'Activation token is expired: token_id={token_id}')
+        return ValidationError('This link is expired, please request a new one')
+    logger.warning(f'Activation token already used for user {activation_token.user_id}')
+    return ValidationError('Activation token already used')
+
+
+def verify_signed_activation_token(token, is_resend=False):
+    """
+    Token assinado: nenhuma tabela de token é lida ou escrita.
+
+    O uso único vem do estado do usuário: a ativação é um UPDATE condicional a
+    is_active = false, e depois dela a assinatura deixa de conferir.
+    """
+    user, expired = signed_activation_user(token)
     if is_resend:
-        # Check if token is expired
-        if timezone.now() < activation_token.expires_at:
-            logger.warning(f'Attempt to resend activation with valid token: token_id={token_id}')
+        if not expired:
+            logger.warning(f'Attempt to resend activation with valid signed token for user {user.id}')
             raise ValidationError('Token is still valid. Use the existing link to activate your account')
         return user
+    if expired:
+        logger.warning(f'Signed activation token is expired for user {user.id}')
+        raise ValidationError('This link is expired, please request a new one')
 
-    else:
-        # Check if token is expired
-        if timezone.now() > activation_token.expires_at:
-            logger.warning(f'Activation token is expired: token_id={token_id}')
-            raise ValidationError('This link is expired, please request a new one')
+    with transaction.atomic():
+        user = User.objects.update_returning(user.id, only_if={'is_active': False}, is_active=True)
+        if user is None:
+            # Outra requisição ativou a conta entre a leitura e o UPDATE
+            raise ValidationError('User account is already activated')
+        invalidate_users([user.id])
 
-        # Check if token is already used
-        if activation_token.used_at is not None:
-            logger.warning(f'Activation token already used for user {activation_token.user_id}')
-            return activation_token.user
+    logger.info(f'User {user.username} activated')
+    return user
 
-    # Activate user
-    user.is_active = True
-    user.save()
 
-    # Mark token as used
-    activation_token.used_at = timezone.now()
-    activation_token.save()
+def signed_activation_user(token):
+    """(usuário, expirado?) de um token de ativação assinado; ValidationError se não serve."""
+    parsed = activation_tokens.parse(token)
+    user = User.objects.filter(pk=parsed[0]).first() if parsed else None
+    if user is None:
+        logger.warning('Attempt to activate user with malformed or unknown signed token')
+        raise ValidationError('Activation token not found')
+    if user.is_active:
+        logger.warning(f'Attempt to activate already active user: {user.username}')
+        raise ValidationError('User account is already activated')
+    if not activation_tokens.check_signature(user, token):
+        logger.warning(f'Invalid signed activation token for user {user.id}')
+        raise ValidationError('Activation token not found')
+    return user, parsed[1] <= timezone.now()
 
-    logger.info(f'User {user.username} activated')
+
+def user_for_activation_resend(token_id):
+    """Usuário de um token expirado, para gerar um novo token de ativação."""
+    try:
+        activation_token = ActivationToken.objects.select_related('user').get(id=token_id)
+    except ActivationToken.DoesNotExist:
+        logger.warning(f'Attempt to resend activation with invalid token: token_id={token_id}')
+        raise ValidationError('Activation token not found')
+
+    user = activation_token.user
+    if user.is_active:
+        logger.warning(f'Attempt to resend activation for already active user: {user.username}')
+        raise ValidationError('User account is already activated')
+    if not activation_token.is_expired():
+        logger.warning(f'Attempt to resend activation with valid token: token_id={token_id}')
+        raise ValidationError('Token is still valid. Use the existing link to activate your account')
     return user
 
 
 def send_password_reset_email(user, token_expiry_minutes=15):
     """
-    Send password reset email to user with link to reset password.
+    Queue password reset email to user with link to reset password.
+
+    The token and the email are written to the outbox in one transaction; the
+    SMTP delivery is done by `send_outbox`.
 
     Args:
         user: User instance
         token_expiry_minutes: Number of minutes until token expires (default: 15)
     """
-    # Get frontend domain from env
-    frontend_fqdn = config('FRONTEND_FQDN', default='localhost:3000')
-
-    # Determine protocol based on domain
-    use_https = 'localhost' not in frontend_fqdn
-    protocol = 'https' if use_https else 'http'
-
-    # Create password reset token record (id is the token)
-    expires_at = timezone.now() + timedelta(minutes=token_expiry_minutes)
-    reset_token = PasswordResetToken.objects.create(
-        user=user,
-        expires_at=expires_at,
-    )
-
-    # Build password reset URL using the token id
-    reset_url = f'{protocol}://{frontend_fqdn}/reset-password/{reset_token.id}'
-
-    # Prepare email with HTML formatting
-    html_body = f"""
-    <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto;">
-                <h2>Redefinir Senha</h2>
-                <p>Olá <strong>{user.first_name or user.username}</strong>,</p>
-                <p>Recebemos uma solicitação para redefinir sua senha. Clique no link abaixo:</p>
-                <p style="text-align: center; margin: 30px 0;">
-                    <a href="{reset_url}" style="background-color: #28a745; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; display: inline-block;">
-                        Redefinir Senha
-                    </a>
-                </p>
-                <p style="font-size: 14px; color: #666;">
-                    Ou copie este link no seu navegador:<br>
-                    <code style="background-color: #f4f4f4; padding: 5px; border-radius: 3px; word-break: break-all;">
-                        {reset_url}
-                    </code>
-                </p>
-                <p style="font-size: 12px; color: #999;">
-                    Este link expira em <strong>{token_expiry_minutes} minutos</strong>.
-                </p>
-                <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
-                <p style="font-size: 12px; color: #999;">
-                    Se você não solicitou esta redefinição, ignore este email.
-                </p>
-                <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; text-align: center;">
-                    <p style="font-size: 12px; color: #666; margin: 5px 0;">
-                        <strong>Equipe Django Ninja API Boilerplate</strong><br>
-                        Email: <a href="mailto:djangoninja.api@gmail.com" style="color: #28a745; text-decoration: none;">djangoninja.api@gmail.com</a>
-                    </p>
-                </div>
-            </div>
-        </body>
-    </html>
-    """
-
-    # Prepare email
-    mail_options = {
-        'subject': 'Redefinir sua senha',
-        'body': html_body,
-        'from': 'contato@myapi.com',
-        'to': [user.email],
+    # Signed token (no database write) or a password reset token record (id is the token,
+    # generated in Python, so the row is only saved together with the outbox message)
+    reset_token = None
+    if settings.USERS_STATELESS_TOKENS:
+        token = password_reset_tokens.make_token(user, token_expiry_minutes)
+    else:
+        expires_at = timezone.now() + timedelta(minutes=token_expiry_minutes)
+        reset_token = PasswordResetToken(user=user, expires_at=expires_at)
+        token = reset_token.id
+
+    context = {
+        'name': user.first_name or user.username,
+        'url': frontend_url(f'reset-password/{token}'),
+        'expiry_minutes': token_expiry_minutes,
     }
+    mail_options = render('password_reset', context, MAIL_FROM, user.email)
 
     try:
-        send_message(mail_options)
-        logger.info(f'Password reset email sent to {user.email}')
+        with transaction.atomic():
+            if reset_token is not None:
+                reset_token.save(force_insert=True)
+            outbox.enqueue([mail_options])
+        logger.info(f'Password reset email queued to {user.email}')
     except Exception as e:
-        logger.error(f'Error sending password reset email to {user.email}: {e}')
+        logger.error(f'Error queueing password reset email to {user.email}: {e}')
         raise ServiceError('An error ocurred when sending the e-mail')
 
 
@@ -234,7 +279,14 @@ def confirm_password_reset_token(token_id: str):
     Verify password reset token, mark it as used, and return the associated user.
 
     Raises ValidationError if token is not found, expired, or already used.
+    Signed tokens are not marked: changing the password invalidates them.
     """
+    if is_signed_token(token_id):
+        user, problem = signed_password_reset_user(token_id)
+        if problem is not None:
+            raise ValidationError(SIGNED_RESET_ERRORS[problem])
+        return user
+
     try:
         password_reset_token = PasswordResetToken.objects.get(id=token_id)
     except PasswordResetToken.DoesNotExist:
@@ -262,11 +314,17 @@ def validate_password_reset_token(token_id: str):
     Validate password reset token without marking it as used.
 
     Args:
-        token_id: Password reset token ID (UUID)
+        token_id: Password reset token ID (UUID) or signed token
 
     Returns:
         Dictionary with validation result: {valid: bool, message: str}
     """
+    if is_signed_token(token_id):
+        _, problem = signed_password_reset_user(token_id)
+        if problem is not None:
+            return {'valid': False, 'message': SIGNED_RESET_VALIDATION_MESSAGES[problem]}
+        return {'valid': True, 'message': 'Token is valid'}
+
     try:
         reset_token = PasswordResetToken.objects.get(id=token_id)
     except PasswordResetToken.DoesNotExist:
@@ -285,3 +343,36 @@ def validate_password_reset_token(token_id: str):
 
     logger.info(f'Token validation successful: token_id={token_id}')
     return {'valid': True, 'message': 'Token is valid'}
+
+
+SIGNED_RESET_ERRORS = {
+    'not_found': 'Password reset token not found',
+    'used': 'This link was already used, please request a new one',
+    'expired': 'This link is expired, please request a new one',
+}
+SIGNED_RESET_VALIDATION_MESSAGES = {
+    'not_found': 'Token not found',
+    'used': 'Token has already been used',
+    'expired': 'Token has expired',
+}
+
+
+def signed_password_reset_user(token):
+    """
+    (usuário, problema) de um token de redefinição assinado; problema é None se o token vale.
+
+    Assinatura que não confere é tratada como link já usado: a troca de senha
+    muda o hash que entra na assinatura.
+    """
+    parsed = password_reset_tokens.parse(token)
+    user = User.objects.filter(pk=parsed[0]).first() if parsed else None
+    if user is None:
+        logger.warning('Password reset attempt with malformed or unknown signed token')
+        return None, 'not_found'
+    if not password_reset_tokens.check_signature(user, token):
+        logger.warning(f'Signed password reset token no longer valid for user {user.id}')
+        return user, 'used'
+    if parsed[1] <= timezone.now():
+        logger.warning(f'Signed password reset token is expired for user {user.id}')
+        return user, 'expired'
+    return user, None
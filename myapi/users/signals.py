@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalidate_users
+
+User = get_user_model()
+
+
+def touch_users(user_ids):
+    """Atualiza updated_at/version sem carregar os usuários, invalidando ETags e cache de resposta."""
+    if user_ids:
+        User.objects.filter(pk__in=user_ids).update(updated_at=timezone.now(), version=F('version') + 1)
+        invalidate_users(user_ids)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Grupos fazem parte da resposta de usuário, então mudanças de grupo mudam o ETag."""
+    if action not in {'post_add', 'post_remove', 'pre_clear'}:
+        return
+    if not reverse:
+        touch_users([instance.pk])
+    elif action == 'pre_clear':
+        touch_users(list(instance.user_set.values_list('pk', flat=True)))
+    else:
+        touch_users(pk_set)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch_users(list(instance.user_set.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # O DELETE do grupo remove as associações sem m2m_changed; os membros são lidos antes disso
+    touch_users(list(instance.user_set.values_list('pk', flat=True)))
@@ -8,9 +8,12 @@ import pytest
 from decouple import config
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.db.models import F
 from django.utils import timezone
 from freezegun import freeze_time
 
+from myapi.core.models import OutboxMessage
+from myapi.users.cache import user_response_cache
 from myapi.users.models import ActivationToken, PasswordResetToken
 
 
@@ -58,6 +61,13 @@ def non_admin_client():
     return c
 
 
+def deliver_outbox():
+    """Faz o papel do worker send_outbox: entrega os emails pendentes no mail.outbox"""
+    from myapi.core.outbox import send_pending  # noqa: PLC0415
+
+    send_pending()
+
+
 @pytest.mark.django_db
 def test_list_users(admin_client):
     response = admin_client.get('/api/v1/users')
@@ -65,9 +75,24 @@ def test_list_users(admin_client):
 
     assert response.status_code == HTTPStatus.OK
     assert data['count'] == 1
+    assert data['count_is_estimated'] is False
     assert data['items'][0]['username'] == 'admin'
 
 
+@pytest.mark.django_db
+def test_list_users_estimated_count(admin_client, settings):
+    from django.db import connection  # noqa: PLC0415
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE users_uuiduser')
+    settings.PAGINATION_EXACT_COUNT_THRESHOLD = 0
+
+    data = admin_client.get('/api/v1/users').json()
+
+    assert data['count_is_estimated'] is True
+    assert [item['username'] for item in data['items']] == ['admin']
+
+
 @pytest.mark.django_db
 def test_list_users_unauthorized(non_admin_client):
     response = non_admin_client.get('/api/v1/users')
@@ -96,6 +121,206 @@ def test_list_users_filter_by_username(admin_client):
     assert data['items'][0]['username'] == config('DJANGO_ADMIN_USER')
 
 
+@pytest.fixture
+def search_users_data():
+    User = get_user_model()  # NOSONAR
+    User.objects.create_user(username='jsmith', first_name='John', last_name='Smith', email='john@example.com')
+    User.objects.create_user(username='maria', first_name='Maria', last_name='Johnson', email='maria@corp.io')
+    User.objects.create_user(username='pedro_souza', first_name='Pedro', last_name='Souza', email='ps@corp.io')
+
+
+@pytest.mark.django_db
+def test_list_users_search_ranks_username_first(admin_client, search_users_data):
+    response = admin_client.get('/api/v1/users?search=joh')
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [item['username'] for item in data['items']] == ['jsmith', 'maria']
+
+
+@pytest.mark.django_db
+def test_list_users_search_multiple_terms_and_email_parts(admin_client, search_users_data):
+    response = admin_client.get('/api/v1/users?search=Pedro Sou')
+    assert [item['username'] for item in response.json()['items']] == ['pedro_souza']
+
+    response = admin_client.get('/api/v1/users?search=corp')
+    assert {item['username'] for item in response.json()['items']} == {'maria', 'pedro_souza'}
+
+
+@pytest.mark.django_db
+def test_list_users_search_without_terms(admin_client, search_users_data):
+    response = admin_client.get('/api/v1/users?search=@@')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['count'] == 0
+
+
+@pytest.mark.django_db
+def test_user_search_uses_gin_index():
+    from django.db import connection  # noqa: PLC0415
+
+    from myapi.users.search import search_users  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = search_users(User.objects.all(), 'john').explain()
+    assert 'users_uuiduser_search_gin' in plan
+
+
+@pytest.mark.django_db
+def test_admin_user_search(client, search_users_data):
+    User = get_user_model()  # NOSONAR
+    client.force_login(User.objects.get(username=config('DJANGO_ADMIN_USER')))
+
+    response = client.get('/admin/users/uuiduser/', {'q': 'johnson'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert [user.username for user in response.context['cl'].result_list] == ['maria']
+
+
+@pytest.fixture
+def filter_users_data():
+    from django.contrib.auth.models import Group  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    support = Group.objects.create(name='support')
+    with freeze_time('2024-01-10'):
+        User.objects.create_user(username='old_inactive', email='old@test.com', is_active=False)
+    with freeze_time('2024-06-10'):
+        User.objects.create_user(username='new_staff', email='staff@test.com', is_staff=True).groups.add(support)
+
+
+@pytest.mark.django_db
+def test_list_users_filter_is_active(admin_client, filter_users_data):
+    response = admin_client.get('/api/v1/users?is_active=false')
+
+    assert response.status_code == HTTPStatus.OK
+    assert [item['username'] for item in response.json()['items']] == ['old_inactive']
+
+
+@pytest.mark.django_db
+def test_list_users_filter_is_staff_and_joined_range(admin_client, filter_users_data):
+    response = admin_client.get('/api/v1/users?is_staff=true&joined_after=2024-01-01&joined_before=2025-01-01')
+
+    assert [item['username'] for item in response.json()['items']] == ['new_staff']
+
+
+@pytest.mark.django_db
+def test_list_users_filter_group(admin_client, filter_users_data):
+    response = admin_client.get('/api/v1/users?group=support')
+
+    assert [item['username'] for item in response.json()['items']] == ['new_staff']
+
+
+@pytest.mark.django_db
+def test_list_users_newest_first(admin_client, filter_users_data):
+    response = admin_client.get('/api/v1/users')
+
+    assert [item['username'] for item in response.json()['items']] == ['admin', 'new_staff', 'old_inactive']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ('filters', 'index'),
+    [
+        ({'is_active': False}, 'users_uuiduser_inactive_idx'),
+        ({'is_staff': True, 'joined_after': '2024-01-01'}, 'users_uuiduser_staff_idx'),
+        ({'joined_after': '2024-01-01', 'joined_before': '2025-01-01'}, 'users_uuiduser_joined_idx'),
+    ],
+)
+def test_user_filters_use_indexes(filters, index):
+    from django.db import connection  # noqa: PLC0415
+
+    from myapi.users.schemas import UserFilterSchema  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    queryset = UserFilterSchema(**filters).filter(User.objects.order_by('-date_joined', '-id'))
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset[:20].explain()
+    assert index in plan
+
+
+@pytest.mark.django_db
+def test_get_users_batch_keeps_request_order(admin_client, non_admin_client, django_assert_max_num_queries):
+    User = get_user_model()
+    admin = User.objects.get(username=config('DJANGO_ADMIN_USER'))
+    user = User.objects.get(username='new_user_non_admin')
+    unknown = uuid.uuid4()
+
+    # auth + id__in + prefetch de grupos
+    with django_assert_max_num_queries(3):
+        response = admin_client.get(f'/api/v1/users/batch?ids={user.id},{unknown},{admin.id}')
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [item['id'] for item in data['items']] == [str(user.id), str(unknown), str(admin.id)]
+    assert [item['found'] for item in data['items']] == [True, False, True]
+    assert data['items'][0]['user']['username'] == 'new_user_non_admin'
+    assert data['items'][1]['user'] is None
+    assert data['missing'] == [str(unknown)]
+
+
+@pytest.mark.django_db
+def test_get_users_batch_limit(admin_client, settings):
+    settings.USERS_BATCH_MAX_IDS = 2
+    ids = ','.join(str(uuid.uuid4()) for _ in range(3))
+
+    response = admin_client.get(f'/api/v1/users/batch?ids={ids}')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['name'] == 'ValidationError'
+
+
+@pytest.mark.django_db
+def test_get_users_batch_invalid_id(admin_client):
+    response = admin_client.get('/api/v1/users/batch?ids=not-a-uuid')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_get_users_batch_unauthorized(non_admin_client):
+    response = non_admin_client.get(f'/api/v1/users/batch?ids={uuid.uuid4()}')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_export_users_ndjson(admin_client, non_admin_client):
+    response = admin_client.get('/api/v1/users/export')
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert {row['username'] for row in rows} == {config('DJANGO_ADMIN_USER'), 'new_user_non_admin'}
+    assert 'password' not in rows[0]
+
+
+@pytest.mark.django_db
+def test_export_users_csv(admin_client, settings):
+    settings.USERS_EXPORT_CHUNK_SIZE = 1
+    User = get_user_model()
+    User.objects.bulk_create([User(username=f'export_{i}', email=f'export_{i}@test.com') for i in range(3)])
+
+    response = admin_client.get('/api/v1/users/export?format=csv')
+    lines = b''.join(response.streaming_content).decode().splitlines()
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Disposition'] == 'attachment; filename="users.csv"'
+    assert lines[0].startswith('id,username,email')
+    assert len(lines) == 1 + User.objects.count()
+
+
+@pytest.mark.django_db
+def test_export_users_unauthorized(non_admin_client):
+    response = non_admin_client.get('/api/v1/users/export')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
 @pytest.mark.django_db
 def test_get_user_detail_admin(admin_client):
     User = get_user_model()
@@ -163,63 +388,461 @@ def test_create_users_success(client):
     assert response_json['username'] == user_payload['username']
     assert not response_json['is_active']
 
+    deliver_outbox()
     assert len(mail.outbox) == 1
     email = mail.outbox[0]
     assert email.subject == 'Ative sua conta'
     assert 'admin_new@admin.com' in email.to
     assert 'New' in email.body
     assert '/activate/' in email.body
+    # Texto puro no corpo, HTML na alternativa
+    assert '<html>' not in email.body
+    assert '/activate/' in email.alternatives[0].content
+
+
+@pytest.mark.django_db
+def test_create_users_queues_email_without_smtp(client):
+    mail.outbox = []
+
+    user_payload = {
+        'username': 'queued',
+        'first_name': 'Queued',
+        'last_name': 'User',
+        'email': 'queued@test.com',
+        'password': 'myadminpassword',
+    }
+    response = client.post('/api/v1/users', data=json.dumps(user_payload), content_type='application/json')
+
+    # Nada é enviado durante a requisição: o email fica no outbox para o worker
+    assert response.status_code == HTTPStatus.CREATED
+    assert mail.outbox == []
+    message = OutboxMessage.objects.get(to=['queued@test.com'])
+    assert message.subject == 'Ative sua conta'
+    assert str(ActivationToken.objects.get(user_id=response.json()['id']).id) in message.body
+
+
+@pytest.mark.django_db
+def test_create_users_duplicated_username(admin_client):
+    user_payload = {
+        'username': 'admin',
+        'first_name': 'New',
+        'last_name': 'Admin',
+        'email': 'admin_new@admin.com',
+        'password': 'myadminpassword',
+    }
+    response = admin_client.post(
+        '/api/v1/users',
+        data=json.dumps(user_payload),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+@pytest.mark.django_db
+def test_create_users_duplicated_email(admin_client):
+    user_payload = {
+        'username': 'admin_new',
+        'first_name': 'New',
+        'last_name': 'Admin',
+        'email': 'admin@admin.com',
+        'password': 'myadminpassword',
+    }
+    response = admin_client.post(
+        '/api/v1/users',
+        data=json.dumps(user_payload),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+@pytest.mark.django_db
+def test_create_users_duplicated_email_case_insensitive(admin_client):
+    user_payload = {
+        'username': 'admin_new',
+        'first_name': 'New',
+        'last_name': 'Admin',
+        'email': config('DJANGO_ADMIN_EMAIL').upper(),
+        'password': 'myadminpassword',
+    }
+    response = admin_client.post(
+        '/api/v1/users',
+        data=json.dumps(user_payload),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json()['message'] == 'Email already exists'
+
+
+@pytest.mark.django_db
+def test_email_lookup_uses_lower_email_index():
+    from django.db import connection  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    queryset = User.objects.with_email('Admin@Admin.com')
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+    assert 'users_uuiduser_email_lower_uniq' in plan
+
+
+@pytest.mark.django_db
+def test_create_users_weak_password(client):
+    user_payload = {
+        'username': 'weakuser',
+        'first_name': 'Weak',
+        'last_name': 'User',
+        'email': 'weak@test.com',
+        'password': '123',  # NOSONAR — intentionally weak password to test validation
+    }
+    response = client.post(
+        '/api/v1/users',
+        data=json.dumps(user_payload),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_import_users_csv_with_error_report(admin_client, non_admin_client):
+    body = (
+        'username,first_name,last_name,email,password\n'
+        'imported_1,Imp,One,imported_1@test.com,Str0ngPassw0rd!\n'
+        'imported_2,Imp,Two,imported_2@test.com,Str0ngPassw0rd!\n'
+        'new_user_non_admin,Dup,User,dup@test.com,Str0ngPassw0rd!\n'
+        'imported_3,Imp,Three,IMPORTED_1@test.com,Str0ngPassw0rd!\n'
+        'imported_4,Imp,Four,imported_4@test.com,123\n'
+    )
+
+    response = admin_client.post('/api/v1/users/import?format=csv', data=body, content_type='text/csv')
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert data['total'] == 5  # noqa: PLR2004
+    assert data['created'] == 2  # noqa: PLR2004
+    assert [error['row'] for error in data['errors']] == [4, 5, 6]
+    assert data['errors'][0]['errors'] == ['Username already exists']
+    assert data['errors'][1]['errors'] == ['Email is duplicated in the import file']
+
+    User = get_user_model()
+    user = User.objects.get(username='imported_1')
+    assert not user.is_active
+    assert user.check_password('Str0ngPassw0rd!')
+    assert ActivationToken.objects.filter(user__username__startswith='imported_').count() == 2  # noqa: PLR2004
+    # Emails vão para o outbox na mesma transação dos usuários
+    imported_emails = ['imported_1@test.com', 'imported_2@test.com']
+    assert OutboxMessage.objects.filter(to__overlap=imported_emails).count() == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_import_users_ndjson_without_activation(admin_client):
+    rows = [
+        {
+            'username': 'nd_1',
+            'first_name': 'N',
+            'last_name': 'D',
+            'email': 'nd_1@test.com',
+            'password': 'Str0ngPassw0rd!',
+        },
+        {'username': 'nd_2', 'email': 'nd_2@test.com'},
+    ]
+    body = '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n'
+
+    response = admin_client.post(
+        '/api/v1/users/import?format=ndjson&send_activation=false', data=body, content_type='application/x-ndjson'
+    )
+    data = response.json()
+
+    assert data['created'] == 1
+    assert [error['row'] for error in data['errors']] == [2, 3]
+    assert get_user_model().objects.get(username='nd_1').is_active
+    assert not ActivationToken.objects.filter(user__username='nd_1').exists()
+
+
+@pytest.mark.django_db
+def test_import_users_invalid_utf8_is_reported(admin_client):
+    body = (
+        b'username,first_name,last_name,email,password\n'
+        b'imported_ok,Imp,Ok,imported_ok@test.com,Str0ngPassw0rd!\n' + b'x' * 200 + b'\n'
+        b'imported_bad,Imp,\xff\xfe,imported_bad@test.com,Str0ngPassw0rd!\n'
+    )
+
+    response = admin_client.post('/api/v1/users/import?format=csv', data=body, content_type='text/csv')
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert data['created'] == 1
+    assert 'Invalid UTF-8' in data['errors'][-1]['errors'][0]
+    assert not get_user_model().objects.filter(username='imported_bad').exists()
+
+
+@pytest.mark.django_db
+def test_import_users_unauthorized(non_admin_client):
+    response = non_admin_client.post('/api/v1/users/import', data='', content_type='text/csv')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.fixture
+def bulk_users():
+    User = get_user_model()
+    return User.objects.bulk_create([
+        User(username=f'bulk_{i}', email=f'bulk_{i}@test.com', is_active=i % 2 == 0) for i in range(4)
+    ])
+
+
+@pytest.mark.django_db
+def test_bulk_patch_users_by_ids(admin_client, bulk_users):
+    ids = [str(user.id) for user in bulk_users[:3]] + [str(uuid.uuid4())]
+
+    response = admin_client.patch(
+        '/api/v1/users/bulk',
+        data=json.dumps({'ids': ids, 'changes': {'is_active': False, 'last_name': 'Bulk'}}),
+        content_type='application/json',
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'matched': 4, 'affected': 3}
+    User = get_user_model()
+    assert User.objects.filter(last_name='Bulk', is_active=False).count() == 3  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_bulk_patch_users_by_filter(admin_client, bulk_users, settings):
+    settings.USERS_BULK_CHUNK_SIZE = 1
+
+    response = admin_client.patch(
+        '/api/v1/users/bulk',
+        data=json.dumps({'filter': {'is_active': False}, 'changes': {'is_active': True}}),
+        content_type='application/json',
+    )
+
+    assert response.json() == {'matched': 2, 'affected': 2}
+    assert not get_user_model().objects.filter(is_active=False).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_delete_users_by_filter_streams_chunks(admin_client, bulk_users, settings, django_assert_max_num_queries):
+    settings.USERS_BULK_CHUNK_SIZE = 1
+
+    with django_assert_max_num_queries(40) as queries:  # noqa: PLR2004
+        response = admin_client.delete(
+            '/api/v1/users/bulk', data=json.dumps({'filter': {'is_active': False}}), content_type='application/json'
+        )
+
+    assert response.json() == {'matched': 2, 'affected': 2}
+    # Um SELECT de ids por chunk (mais o que encerra a iteração), nunca todos os ids de uma vez
+    selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT "users_uuiduser"."id"')]
+    assert len(selects) == 3  # noqa: PLR2004
+    assert all(sql.endswith('LIMIT 1') for sql in selects)
+    assert get_user_model().objects.filter(username__startswith='bulk_').count() == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_bulk_patch_users_invalidates_cache(admin_client, bulk_users):
+    user = bulk_users[0]
+    etag = admin_client.get(f'/api/v1/users/{user.id}')['ETag']
+
+    admin_client.patch(
+        '/api/v1/users/bulk',
+        data=json.dumps({'ids': [str(user.id)], 'changes': {'first_name': 'Fresh'}}),
+        content_type='application/json',
+    )
+    response = admin_client.get(f'/api/v1/users/{user.id}', HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['first_name'] == 'Fresh'
+
+
+@pytest.mark.django_db
+def test_bulk_patch_users_unique_conflicts(admin_client, bulk_users):
+    ids = [str(user.id) for user in bulk_users]
+
+    response = admin_client.patch(
+        '/api/v1/users/bulk',
+        data=json.dumps({'ids': ids[:2], 'changes': {'email': 'same@test.com'}}),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.CONFLICT
+
+    response = admin_client.patch(
+        '/api/v1/users/bulk',
+        data=json.dumps({'ids': ids[:1], 'changes': {'username': 'bulk_1'}}),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json()['message'] == 'Username already exists'
+
+
+@pytest.mark.django_db
+def test_bulk_patch_users_rejects_null_changes(admin_client, bulk_users):
+    response = admin_client.patch(
+        '/api/v1/users/bulk',
+        data=json.dumps({'ids': [str(bulk_users[0].id)], 'changes': {'is_active': None}}),
+        content_type='application/json',
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert get_user_model().objects.get(id=bulk_users[0].id).is_active is True
+
+
+@pytest.mark.django_db
+def test_bulk_patch_users_non_unique_integrity_error(admin_client, bulk_users, monkeypatch):
+    from django.db import IntegrityError  # noqa: PLC0415
+
+    from myapi.users import bulk  # noqa: PLC0415
+
+    def fail(chunk):
+        raise IntegrityError('null value in column "is_active" violates not-null constraint')
+
+    monkeypatch.setattr(bulk, 'invalidate_users', fail)
+
+    response = admin_client.patch(
+        '/api/v1/users/bulk',
+        data=json.dumps({'ids': [str(bulk_users[0].id)], 'changes': {'first_name': 'X'}}),
+        content_type='application/json',
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert 'already exists' not in response.json()['message']
+
+
+@pytest.mark.django_db
+def test_bulk_patch_users_requires_target(admin_client):
+    response = admin_client.patch(
+        '/api/v1/users/bulk', data=json.dumps({'changes': {'is_active': False}}), content_type='application/json'
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_delete_users(admin_client, bulk_users):
+    ids = [str(user.id) for user in bulk_users[:2]]
+
+    response = admin_client.delete(
+        '/api/v1/users/bulk', data=json.dumps({'ids': ids}), content_type='application/json'
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'matched': 2, 'affected': 2}
+    assert not get_user_model().objects.filter(id__in=ids).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_delete_users_is_set_based(admin_client, bulk_users, django_assert_max_num_queries):
+    from allauth.account.models import EmailAddress  # noqa: PLC0415
+    from allauth.socialaccount.models import SocialAccount  # noqa: PLC0415
+    from django.contrib.admin.models import LogEntry  # noqa: PLC0415
+    from django.contrib.auth.models import Group, Permission  # noqa: PLC0415
+    from django.contrib.contenttypes.models import ContentType  # noqa: PLC0415
+
+    user = bulk_users[0]
+    user.groups.add(Group.objects.create(name='bulk-group'))
+    user.user_permissions.add(Permission.objects.first())
+    EmailAddress.objects.create(user=user, email=user.email)
+    SocialAccount.objects.create(user=user, provider='google', uid='bulk-0')
+    LogEntry.objects.create(
+        user=user, content_type=ContentType.objects.get_for_model(Group), object_repr='g', action_flag=1
+    )
+    ActivationToken.objects.create(user=user, expires_at=timezone.now())
+    ids = [str(u.id) for u in bulk_users]
+
+    with django_assert_max_num_queries(20) as queries:
+        response = admin_client.delete(
+            '/api/v1/users/bulk', data=json.dumps({'ids': ids}), content_type='application/json'
+        )
+
+    assert response.json() == {'matched': 4, 'affected': 4}
+    # Só o SELECT da autenticação: usuários e dependentes saem com DELETEs set-based, sem carregar linhas
+    assert [query['sql'] for query in queries if query['sql'].startswith('SELECT')] == [queries[0]['sql']]
+    assert queries[-2]['sql'].startswith('DELETE FROM "users_uuiduser" WHERE "id" = ANY(')
+    assert not get_user_model().objects.filter(id__in=ids).exists()
+    assert not EmailAddress.objects.exists()
+    assert not SocialAccount.objects.exists()
+    assert not LogEntry.objects.filter(user_id=user.id).exists()
+    assert not ActivationToken.objects.filter(user_id=user.id).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_delete_dependents_sets_null(bulk_users, monkeypatch):
+    from django.contrib.admin.models import LogEntry  # noqa: PLC0415
+    from django.contrib.contenttypes.models import ContentType  # noqa: PLC0415
+
+    from myapi.users.bulk import delete_dependents  # noqa: PLC0415
+
+    content_type = ContentType.objects.get_for_model(LogEntry)
+    entry = LogEntry.objects.create(user=bulk_users[0], content_type=content_type, object_repr='e', action_flag=1)
+    # Só a FK content_type do LogEntry (SET_NULL), para não apagar as permissões do content type
+    monkeypatch.setattr(ContentType._meta, 'related_objects', [LogEntry._meta.get_field('content_type').remote_field])
+
+    delete_dependents(ContentType, 'id', [content_type.id])
+
+    entry.refresh_from_db()
+    assert entry.content_type_id is None
+
+
+def test_bulk_delete_dependents_refuses_unsupported_on_delete(monkeypatch):
+    from types import SimpleNamespace  # noqa: PLC0415
+
+    from django.contrib.admin.models import LogEntry  # noqa: PLC0415
+    from django.core.exceptions import ImproperlyConfigured  # noqa: PLC0415
+    from django.db import models  # noqa: PLC0415
+
+    from myapi.users.bulk import delete_dependents  # noqa: PLC0415
+
+    User = get_user_model()
+    relation = SimpleNamespace(
+        many_to_many=False, on_delete=models.PROTECT, related_model=LogEntry, field=SimpleNamespace(name='user')
+    )
+    monkeypatch.setattr(User._meta, 'related_objects', [relation])
+
+    with pytest.raises(ImproperlyConfigured, match='on_delete=PROTECT'):
+        delete_dependents(User, 'id', [uuid.uuid4()])
+
+
+@pytest.mark.django_db
+def test_bulk_delete_users_refuses_own_account(admin_client, bulk_users):
+    admin = get_user_model().objects.get(username=config('DJANGO_ADMIN_USER'))
+
+    response = admin_client.delete(
+        '/api/v1/users/bulk',
+        data=json.dumps({'ids': [str(admin.id), str(bulk_users[0].id)]}),
+        content_type='application/json',
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert get_user_model().objects.filter(id__in=[admin.id, bulk_users[0].id]).count() == 2  # noqa: PLR2004
 
 
 @pytest.mark.django_db
-def test_create_users_duplicated_username(admin_client):
-    user_payload = {
-        'username': 'admin',
-        'first_name': 'New',
-        'last_name': 'Admin',
-        'email': 'admin_new@admin.com',
-        'password': 'myadminpassword',
-    }
-    response = admin_client.post(
-        '/api/v1/users',
-        data=json.dumps(user_payload),
-        content_type='application/json',
+def test_bulk_delete_users_by_filter_refuses_own_account(admin_client, bulk_users):
+    response = admin_client.delete(
+        '/api/v1/users/bulk', data=json.dumps({'filter': {'is_staff': True}}), content_type='application/json'
     )
-    assert response.status_code == HTTPStatus.CONFLICT
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert get_user_model().objects.filter(username=config('DJANGO_ADMIN_USER')).exists()
 
 
 @pytest.mark.django_db
-def test_create_users_duplicated_email(admin_client):
-    user_payload = {
-        'username': 'admin_new',
-        'first_name': 'New',
-        'last_name': 'Admin',
-        'email': 'admin@admin.com',
-        'password': 'myadminpassword',
-    }
-    response = admin_client.post(
-        '/api/v1/users',
-        data=json.dumps(user_payload),
-        content_type='application/json',
+def test_bulk_users_ids_limit(admin_client, settings):
+    settings.USERS_BULK_MAX_IDS = 2
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+
+    response = admin_client.delete(
+        '/api/v1/users/bulk', data=json.dumps({'ids': ids}), content_type='application/json'
     )
-    assert response.status_code == HTTPStatus.CONFLICT
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
 
 
 @pytest.mark.django_db
-def test_create_users_weak_password(client):
-    user_payload = {
-        'username': 'weakuser',
-        'first_name': 'Weak',
-        'last_name': 'User',
-        'email': 'weak@test.com',
-        'password': '123',  # NOSONAR — intentionally weak password to test validation
-    }
-    response = client.post(
-        '/api/v1/users',
-        data=json.dumps(user_payload),
-        content_type='application/json',
+def test_bulk_delete_users_unauthorized(non_admin_client, bulk_users):
+    response = non_admin_client.delete(
+        '/api/v1/users/bulk', data=json.dumps({'ids': [str(bulk_users[0].id)]}), content_type='application/json'
     )
-    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
 
 
 @pytest.mark.django_db
@@ -260,6 +883,29 @@ def test_delete_user_to_himself(non_admin_client):
     assert response.status_code == HTTPStatus.NO_CONTENT
 
 
+@pytest.mark.django_db
+def test_delete_user_cascades_tokens_in_database(admin_client, non_admin_client):
+    from django.db import connection  # noqa: PLC0415
+    from django.test.utils import CaptureQueriesContext  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    user = User.objects.get(username='new_user_non_admin')
+    expires_at = timezone.now() + timedelta(minutes=15)
+    ActivationToken.objects.bulk_create(ActivationToken(user=user, expires_at=expires_at) for _ in range(5))
+    PasswordResetToken.objects.bulk_create(PasswordResetToken(user=user, expires_at=expires_at) for _ in range(3))
+    assert admin_client.get(f'/api/v1/users/{user.id}').status_code == HTTPStatus.OK
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.delete(f'/api/v1/users/{user.id}')
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert not [query for query in queries.captured_queries if 'token' in query['sql']]
+    assert not ActivationToken.objects.filter(user_id=user.id).exists()
+    assert not PasswordResetToken.objects.filter(user_id=user.id).exists()
+    # Invalidação por signal continua funcionando
+    assert admin_client.get(f'/api/v1/users/{user.id}').status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.django_db
 def test_delete_user_to_other_user_fail(non_admin_client):
     User = get_user_model()
@@ -388,6 +1034,199 @@ def test_patch_user_duplicate_email(admin_client, non_admin_client):
     assert response.status_code == HTTPStatus.CONFLICT
 
 
+@pytest.mark.django_db
+def test_patch_user_duplicate_email_case_insensitive(admin_client, non_admin_client):
+    User = get_user_model()  # NOSONAR
+    non_admin = User.objects.get(username='new_user_non_admin')
+
+    response = admin_client.patch(
+        f'/api/v1/users/{non_admin.id}',
+        data=json.dumps({'email': config('DJANGO_ADMIN_EMAIL').title()}),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json()['message'] == 'Email already exists'
+
+
+@pytest.mark.django_db
+def test_patch_user_single_update_statement(admin_client, non_admin_client):
+    from django.db import connection  # noqa: PLC0415
+    from django.test.utils import CaptureQueriesContext  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    non_admin = User.objects.get(username='new_user_non_admin')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.patch(
+            f'/api/v1/users/{non_admin.id}',
+            data=json.dumps({'first_name': 'Changed'}),
+            content_type='application/json',
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['first_name'] == 'Changed'
+    assert response.json()['groups'] == []
+    user_queries = [query['sql'] for query in queries.captured_queries if 'users_uuiduser' in query['sql']]
+    updates = [sql for sql in user_queries if sql.startswith('UPDATE')]
+    assert len(updates) == 1
+    assert '"first_name" = ' in updates[0]
+    assert '"email" = ' not in updates[0]
+    assert not [sql for sql in queries.captured_queries if 'auth_group"' in sql['sql']]
+
+
+@pytest.mark.django_db
+def test_patch_user_without_changes_does_not_write(admin_client, non_admin_client):
+    from django.db import connection  # noqa: PLC0415
+    from django.test.utils import CaptureQueriesContext  # noqa: PLC0415
+
+    non_admin = get_user_model().objects.get(username='new_user_non_admin')
+    etag = admin_client.get(f'/api/v1/users/{non_admin.id}')['ETag']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.patch(
+            f'/api/v1/users/{non_admin.id}', data=json.dumps({}), content_type='application/json', HTTP_IF_MATCH=etag
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] == etag
+    assert not [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+    user = get_user_model().objects.get(id=non_admin.id)
+    assert (user.version, user.updated_at) == (non_admin.version, non_admin.updated_at)
+
+
+@pytest.mark.django_db
+def test_patch_user_not_found(admin_client):
+    response = admin_client.patch(
+        f'/api/v1/users/{uuid.uuid4()}',
+        data=json.dumps({'first_name': 'Changed'}),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_patch_user_returns_groups_and_invalidates_cache(admin_client, non_admin_client):
+    from django.contrib.auth.models import Group  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    non_admin = User.objects.get(username='new_user_non_admin')
+    non_admin.groups.add(Group.objects.create(name='support'))
+    assert admin_client.get(f'/api/v1/users/{non_admin.id}').json()['last_name'] != 'Changed'
+
+    response = admin_client.patch(
+        f'/api/v1/users/{non_admin.id}',
+        data=json.dumps({'last_name': 'Changed'}),
+        content_type='application/json',
+    )
+
+    assert [group['name'] for group in response.json()['groups']] == ['support']
+    assert admin_client.get(f'/api/v1/users/{non_admin.id}').json()['last_name'] == 'Changed'
+
+
+@pytest.mark.django_db
+def test_patch_user_if_match_conflict(admin_client, non_admin_client):
+    from django.db import connection  # noqa: PLC0415
+    from django.test.utils import CaptureQueriesContext  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    non_admin = User.objects.get(username='new_user_non_admin')
+    etag = admin_client.get(f'/api/v1/users/{non_admin.id}')['ETag']
+
+    first = admin_client.patch(
+        f'/api/v1/users/{non_admin.id}',
+        data=json.dumps({'first_name': 'First'}),
+        content_type='application/json',
+        HTTP_IF_MATCH=etag,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        second = admin_client.patch(
+            f'/api/v1/users/{non_admin.id}',
+            data=json.dumps({'first_name': 'Second'}),
+            content_type='application/json',
+            HTTP_IF_MATCH=etag,
+        )
+
+    assert first.status_code == HTTPStatus.OK
+    assert first['ETag'] != etag
+    assert second.status_code == HTTPStatus.PRECONDITION_FAILED
+    assert not [query for query in queries.captured_queries if 'FOR UPDATE' in query['sql']]
+    assert User.objects.get(id=non_admin.id).first_name == 'First'
+
+    # O ETag devolvido pelo PATCH (inclusive na forma fraca) libera o próximo update
+    third = admin_client.patch(
+        f'/api/v1/users/{non_admin.id}',
+        data=json.dumps({'first_name': 'Third'}),
+        content_type='application/json',
+        HTTP_IF_MATCH=f'W/{first["ETag"]}',
+    )
+    assert third.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('if_match', [None, '*'])
+def test_patch_user_without_precondition(admin_client, non_admin_client, if_match):
+    User = get_user_model()  # NOSONAR
+    non_admin = User.objects.get(username='new_user_non_admin')
+    headers = {'HTTP_IF_MATCH': if_match} if if_match else {}
+
+    response = admin_client.patch(
+        f'/api/v1/users/{non_admin.id}',
+        data=json.dumps({'first_name': 'Changed'}),
+        content_type='application/json',
+        **headers,
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'].startswith(f'"{non_admin.version + 1}-')
+
+
+@pytest.mark.django_db
+def test_patch_user_if_match_unknown_etag(admin_client, non_admin_client):
+    User = get_user_model()  # NOSONAR
+    non_admin = User.objects.get(username='new_user_non_admin')
+
+    response = admin_client.patch(
+        f'/api/v1/users/{non_admin.id}',
+        data=json.dumps({'first_name': 'Changed'}),
+        content_type='application/json',
+        HTTP_IF_MATCH='"not-ours"',
+    )
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+
+@pytest.mark.django_db
+def test_user_version_bumps_on_save_but_not_on_login(non_admin_client):
+    from django.contrib.auth.models import update_last_login  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    user = User.objects.get(username='new_user_non_admin')
+    version = user.version
+
+    update_last_login(None, user)
+    assert User.objects.get(id=user.id).version == version
+
+    user.first_name = 'Changed'
+    user.save(update_fields=['first_name'])
+    assert User.objects.get(id=user.id).version == version + 1
+
+
+@pytest.mark.django_db
+def test_user_concurrent_saves_get_distinct_versions(non_admin_client):
+    User = get_user_model()  # NOSONAR
+    first = User.objects.get(username='new_user_non_admin')
+    second = User.objects.get(id=first.id)
+    version = first.version
+
+    first.first_name = 'First'
+    first.save()
+    second.last_name = 'Second'
+    second.save()
+
+    # O segundo save não reescreve a versão lida antes do primeiro
+    assert (first.version, second.version) == (version + 1, version + 2)
+    assert User.objects.get(id=first.id).version == version + 2  # noqa: PLR2004
+
+
 @pytest.mark.django_db
 def test_change_password_success(non_admin_client):
     """Test successful password change"""
@@ -506,6 +1345,7 @@ def test_activate_user_success(client):
 
     assert user_created['is_active'] is False
 
+    deliver_outbox()
     assert len(mail.outbox) == 1
     email = mail.outbox[0]
     match = re.search(r'/activate/([0-9a-fA-F-]{36})', email.body)
@@ -550,6 +1390,7 @@ def test_activate_user_already_used_token(client):
 
     assert user_created['is_active'] is False
 
+    deliver_outbox()
     assert len(mail.outbox) == 1
     email = mail.outbox[0]
     match = re.search(r'/activate/([0-9a-fA-F-]{36})', email.body)
@@ -570,6 +1411,57 @@ def test_activate_user_already_used_token(client):
     assert response.status_code == HTTPStatus.BAD_REQUEST
 
 
+@pytest.mark.django_db
+def test_activate_user_queries(client, django_assert_num_queries):
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='activate_queries', email='queries@test.com', is_active=False)
+    token = ActivationToken.objects.create(user=user, expires_at=timezone.now() + timedelta(minutes=15))
+
+    # savepoint + UPDATE do token + UPDATE ... RETURNING do usuário + release
+    with django_assert_num_queries(4):
+        response = client.patch(f'/api/v1/users/activate/{token.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['is_active'] is True
+
+
+@pytest.mark.django_db(transaction=True)
+def test_activate_user_concurrent_requests_activate_once():
+    from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+    from threading import Barrier  # noqa: PLC0415
+
+    from django.db import connection  # noqa: PLC0415
+
+    from myapi.core.exceptions import ValidationError  # noqa: PLC0415
+    from myapi.users.services import verify_activation_token  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='concurrent_activation', email='concurrent@test.com', is_active=False)
+    token = ActivationToken.objects.create(user=user, expires_at=timezone.now() + timedelta(minutes=15))
+    version = User.objects.get(id=user.id).version
+    workers = 8
+    barrier = Barrier(workers)
+
+    def activate(_):
+        barrier.wait()
+        try:
+            verify_activation_token(str(token.id))
+            return 'activated'
+        except ValidationError as e:
+            return e.message
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(activate, range(workers)))
+
+    assert results.count('activated') == 1
+    assert set(results) - {'activated'} <= {'User account is already activated'}
+    user = User.objects.get(id=user.id)
+    assert user.is_active is True
+    assert user.version == version + 1
+
+
 @pytest.mark.django_db
 def test_activate_user_expired_token(client):
     """Test activation with expired token"""
@@ -632,6 +1524,7 @@ def test_resend_activation_success(client):
         old_activation_token = ActivationToken.objects.get(user=user)
         old_token_id = str(old_activation_token.id)
 
+        deliver_outbox()
         mail.outbox = []
 
     with freeze_time(now + timedelta(minutes=16)):
@@ -651,6 +1544,7 @@ def test_resend_activation_success(client):
         assert response_json['username'] == 'resend_test'
         assert response_json['is_active'] is False
 
+        deliver_outbox()
         assert len(mail.outbox) == 1
         email = mail.outbox[0]
         assert email.subject == 'Ative sua conta'
@@ -736,6 +1630,7 @@ def test_resend_activation_with_already_used_token(client):
         user = User.objects.get(id=user_id)
         activation_token = ActivationToken.objects.get(user=user)
 
+        deliver_outbox()
         assert len(mail.outbox) == 1
         email = mail.outbox[0]
         match = re.search(r'/activate/([0-9a-fA-F-]{36})', email.body)
@@ -772,38 +1667,219 @@ def test_resend_activation_with_already_active_user(client):
         )
         user_id = response.json()['id']
 
-        User = get_user_model()
-        user = User.objects.get(id=user_id)
-        activation_token = ActivationToken.objects.get(user=user)
+        User = get_user_model()
+        user = User.objects.get(id=user_id)
+        activation_token = ActivationToken.objects.get(user=user)
+
+        deliver_outbox()
+        assert len(mail.outbox) == 1
+        email = mail.outbox[0]
+        match = re.search(r'/activate/([0-9a-fA-F-]{36})', email.body)
+        token_from_email = match.group(1) if match else None
+
+        response = client.patch(f'/api/v1/users/activate/{token_from_email}')
+        assert response.status_code == HTTPStatus.OK
+
+    with freeze_time(now + timedelta(minutes=16)):
+        response = client.post(
+            f'/api/v1/users/resend-activation/{activation_token.id}',
+            content_type='application/json',
+        )
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_resend_activation_invalid_token(client):
+    """Test that resend fails with invalid token ID"""
+    token_id = uuid.uuid4()
+
+    response = client.post(
+        f'/api/v1/users/resend-activation/{token_id}',
+        content_type='application/json',
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.fixture
+def stateless_tokens(settings):
+    settings.USERS_STATELESS_TOKENS = True
+
+
+def signed_token_from_email(path):
+    deliver_outbox()
+    match = re.search(rf'/{path}/([\w.-]+)', mail.outbox[-1].body)
+    assert match is not None, 'Token not found in email body'
+    return match.group(1)
+
+
+@pytest.mark.django_db
+def test_activate_user_signed_token(client, stateless_tokens, django_assert_num_queries):
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='signed_activation', email='signed@test.com', is_active=False)
+    from myapi.users.services import send_activation_email  # noqa: PLC0415
+
+    send_activation_email(user)
+    token = signed_token_from_email('activate')
+    assert not ActivationToken.objects.exists()
+
+    # SELECT do usuário + savepoint + UPDATE ... RETURNING + release: nenhuma tabela de token
+    with django_assert_num_queries(4):
+        response = client.patch(f'/api/v1/users/activate/{token}')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['is_active'] is True
+
+    # Uso único: a conta ativa invalida o link
+    response = client.patch(f'/api/v1/users/activate/{token}')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['message'] == 'User account is already activated'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('token', ['garbage', 'AAAAAAAAAAAAAAAAAAAAAA.zzzz.abc', 'not.a.token'])
+def test_activate_user_invalid_signed_token(client, token):
+    response = client.patch(f'/api/v1/users/activate/{token}')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['message'] == 'Activation token not found'
+
+
+@pytest.mark.django_db
+def test_activate_user_tampered_signed_token(client):
+    from myapi.users.tokens import activation_tokens  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='signed_tampered', email='tampered@test.com', is_active=False)
+    uid, expires, signature = activation_tokens.make_token(user, 15).split('.')
+    # Estender a expiração quebra a assinatura
+    forged = f'{uid}.{expires}z.{signature}'
+
+    response = client.patch(f'/api/v1/users/activate/{forged}')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    user.refresh_from_db()
+    assert user.is_active is False
+
+
+@pytest.mark.django_db
+def test_resend_activation_signed_token(client, stateless_tokens):
+    from myapi.users.tokens import activation_tokens  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='signed_resend', email='resend@test.com', is_active=False)
+    with freeze_time(timezone.now() - timedelta(hours=1)):
+        expired = activation_tokens.make_token(user, 15)
+
+    response = client.patch(f'/api/v1/users/activate/{expired}')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['message'] == 'This link is expired, please request a new one'
+
+    response = client.post(f'/api/v1/users/resend-activation/{expired}')
+    assert response.status_code == HTTPStatus.OK
+    response = client.patch(f'/api/v1/users/activate/{signed_token_from_email("activate")}')
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.fixture
+def lifecycle_tokens():
+    """Tokens em cada fase do ciclo de vida, com retenção padrão de 7 dias"""
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='token_owner', email='owner@test.com')
+    now = timezone.now()
+    states = {
+        'live': {'expires_at': now + timedelta(hours=1)},
+        'recently_expired': {'expires_at': now - timedelta(days=1)},
+        'old_expired': {'expires_at': now - timedelta(days=30)},
+        'recently_used': {'expires_at': now - timedelta(days=30), 'used_at': now - timedelta(days=1)},
+        'old_used': {'expires_at': now - timedelta(days=30), 'used_at': now - timedelta(days=10)},
+    }
+    return {
+        model: {name: model.objects.create(user=user, **fields).id for name, fields in states.items()}
+        for model in (ActivationToken, PasswordResetToken)
+    }
+
+
+@pytest.mark.django_db
+def test_purge_tokens_keeps_live_and_recent_tokens(lifecycle_tokens):
+    from myapi.users.retention import purge_tokens  # noqa: PLC0415
+
+    result = purge_tokens()
+
+    assert result == {
+        'users_activationtoken': {'used': 1, 'expired': 1},
+        'users_passwordresettoken': {'used': 1, 'expired': 1},
+    }
+    for model, ids in lifecycle_tokens.items():
+        assert set(model.objects.values_list('id', flat=True)) == {
+            ids['live'],
+            ids['recently_expired'],
+            ids['recently_used'],
+        }
+
+
+@pytest.mark.django_db
+def test_purge_tokens_in_batches(django_assert_num_queries):
+    from myapi.users.retention import purge_batches, purge_conditions  # noqa: PLC0415
 
-        assert len(mail.outbox) == 1
-        email = mail.outbox[0]
-        match = re.search(r'/activate/([0-9a-fA-F-]{36})', email.body)
-        token_from_email = match.group(1) if match else None
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='token_owner', email='owner@test.com')
+    expired = timezone.now() - timedelta(days=30)
+    ActivationToken.objects.bulk_create(ActivationToken(user=user, expires_at=expired) for _ in range(5))
+    condition = purge_conditions(timezone.now(), 7)['expired']
 
-        response = client.patch(f'/api/v1/users/activate/{token_from_email}')
-        assert response.status_code == HTTPStatus.OK
+    # 2 + 2 + 1 (lote incompleto encerra): um DELETE por lote
+    with django_assert_num_queries(3, exact=False):
+        assert purge_batches(ActivationToken, condition, batch_size=2) == 5  # noqa: PLR2004
+    assert not ActivationToken.objects.exists()
 
-    with freeze_time(now + timedelta(minutes=16)):
-        response = client.post(
-            f'/api/v1/users/resend-activation/{activation_token.id}',
-            content_type='application/json',
-        )
 
-        assert response.status_code == HTTPStatus.BAD_REQUEST
+@pytest.mark.django_db
+def test_purge_tokens_max_batches(lifecycle_tokens):
+    from myapi.users.retention import purge_batches, purge_conditions  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    expired = timezone.now() - timedelta(days=30)
+    user = User.objects.get(username='token_owner')
+    ActivationToken.objects.bulk_create(ActivationToken(user=user, expires_at=expired) for _ in range(4))
+    condition = purge_conditions(timezone.now(), 7)['expired']
+
+    assert purge_batches(ActivationToken, condition, batch_size=2, max_batches=1) == 2  # noqa: PLR2004
+    assert ActivationToken.objects.filter(condition).count() == 3  # noqa: PLR2004
 
 
 @pytest.mark.django_db
-def test_resend_activation_invalid_token(client):
-    """Test that resend fails with invalid token ID"""
-    token_id = uuid.uuid4()
+def test_purge_tokens_command(lifecycle_tokens):
+    from io import StringIO  # noqa: PLC0415
 
-    response = client.post(
-        f'/api/v1/users/resend-activation/{token_id}',
-        content_type='application/json',
-    )
+    from django.core.management import call_command  # noqa: PLC0415
 
-    assert response.status_code == HTTPStatus.BAD_REQUEST
+    out = StringIO()
+    call_command('purge_tokens', '--retention-days', '0', stdout=out)
+
+    assert 'users_activationtoken: 2 usados, 2 expirados removidos' in out.getvalue()
+    for model, ids in lifecycle_tokens.items():
+        assert list(model.objects.values_list('id', flat=True)) == [ids['live']]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ('model', 'index'),
+    [
+        (ActivationToken, 'users_activation_live_idx'),
+        (PasswordResetToken, 'users_reset_live_idx'),
+    ],
+)
+def test_token_purge_uses_partial_indexes(model, index):
+    from django.db import connection  # noqa: PLC0415
+
+    from myapi.users.retention import purge_conditions  # noqa: PLC0415
+
+    condition = purge_conditions(timezone.now(), 7)['expired']
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = model.objects.filter(condition).values('id').explain()
+    assert index in plan
 
 
 @pytest.mark.django_db
@@ -830,6 +1906,175 @@ def test_get_current_user_non_admin(non_admin_client):
     assert 'id' in data
 
 
+@pytest.mark.django_db
+def test_get_current_user_not_modified(admin_client):
+    response = admin_client.get('/api/v1/me')
+    etag = response['ETag']
+
+    response = admin_client.get('/api/v1/me', HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_get_current_user_etag_is_per_user(admin_client, non_admin_client):
+    User = get_user_model()
+    admin = User.objects.get(username=config('DJANGO_ADMIN_USER'))
+    User.objects.filter(id=admin.id).update(version=1)
+    User.objects.filter(username='new_user_non_admin').update(version=1)
+    user_response_cache.clear()
+
+    response = admin_client.get('/api/v1/me')
+    assert response['Cache-Control'] == 'private'
+    assert 'Cookie' in response['Vary']
+
+    # Mesma versão, outro usuário: o ETag do admin não vale para o /me dele
+    other = non_admin_client.get('/api/v1/me', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert other.status_code == HTTPStatus.OK
+    assert other.json()['username'] == 'new_user_non_admin'
+    assert other['ETag'] != response['ETag']
+
+
+@pytest.mark.django_db
+def test_patch_user_if_match_of_other_user(admin_client, non_admin_client):
+    User = get_user_model()
+    admin = User.objects.get(username=config('DJANGO_ADMIN_USER'))
+    non_admin = User.objects.get(username='new_user_non_admin')
+    User.objects.filter(id__in=[admin.id, non_admin.id]).update(version=1)
+    etag = admin_client.get(f'/api/v1/users/{admin.id}')['ETag']
+
+    response = admin_client.patch(
+        f'/api/v1/users/{non_admin.id}',
+        data=json.dumps({'first_name': 'Changed'}),
+        content_type='application/json',
+        HTTP_IF_MATCH=etag,
+    )
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+
+@pytest.mark.django_db
+def test_get_user_detail_not_modified_skips_full_load(admin_client, django_assert_num_queries):
+    User = get_user_model()
+    admin = User.objects.get(username=config('DJANGO_ADMIN_USER'))
+    etag = admin_client.get(f'/api/v1/users/{admin.id}')['ETag']
+    user_response_cache.clear()
+
+    # 1 query para autenticar + 1 lookup do updated_at
+    with django_assert_num_queries(2):
+        response = admin_client.get(f'/api/v1/users/{admin.id}', HTTP_IF_NONE_MATCH=f'W/{etag}')
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_get_user_detail_etag_changes_after_update(admin_client, non_admin_client):
+    from django.contrib.auth.models import Group  # noqa: PLC0415
+
+    User = get_user_model()
+    user = User.objects.get(username='new_user_non_admin')
+    etag = admin_client.get(f'/api/v1/users/{user.id}')['ETag']
+
+    admin_client.patch(
+        f'/api/v1/users/{user.id}', data=json.dumps({'first_name': 'Changed'}), content_type='application/json'
+    )
+    response = admin_client.get(f'/api/v1/users/{user.id}', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+    etag = response['ETag']
+    user.groups.add(Group.objects.create(name='customers'))
+    response = admin_client.get(f'/api/v1/users/{user.id}', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['groups'][0]['name'] == 'customers'
+
+
+@pytest.mark.django_db
+def test_group_delete_changes_members_etag(admin_client, non_admin_client):
+    from django.contrib.auth.models import Group  # noqa: PLC0415
+
+    User = get_user_model()
+    user = User.objects.get(username='new_user_non_admin')
+    group = Group.objects.create(name='to-be-removed')
+    user.groups.add(group)
+    first = admin_client.get(f'/api/v1/users/{user.id}')
+    assert first.json()['groups'][0]['name'] == 'to-be-removed'
+
+    group.delete()
+
+    response = admin_client.get(f'/api/v1/users/{user.id}', HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['groups'] == []
+
+
+@pytest.mark.django_db
+def test_get_user_detail_served_from_cache(admin_client, django_assert_num_queries):
+    User = get_user_model()
+    admin = User.objects.get(username=config('DJANGO_ADMIN_USER'))
+    first = admin_client.get(f'/api/v1/users/{admin.id}')
+
+    # Autenticação + lookup da version: sem carregar o usuário nem serializar
+    with django_assert_num_queries(2):
+        second = admin_client.get(f'/api/v1/users/{admin.id}')
+
+    assert second.status_code == HTTPStatus.OK
+    assert second.content == first.content
+    assert second['ETag'] == first['ETag']
+    stats = admin_client.get('/api/v1/users/cache-stats').json()
+    assert stats['hits'] >= 1
+    assert 0 < stats['hit_rate'] <= 1
+
+
+@pytest.mark.django_db
+def test_user_cache_entry_checked_against_current_version(admin_client, non_admin_client):
+    User = get_user_model()
+    user = User.objects.get(username='new_user_non_admin')
+    admin_client.get(f'/api/v1/users/{user.id}')
+
+    # Escritas feitas por outro worker não passam pelos signals deste processo
+    User.objects.filter(id=user.id).update(first_name='Elsewhere', version=F('version') + 1)
+    assert admin_client.get(f'/api/v1/users/{user.id}').json()['first_name'] == 'Elsewhere'
+
+    User.objects.filter(id=user.id).delete()
+    assert admin_client.get(f'/api/v1/users/{user.id}').status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_user_cache_stats_requires_admin(non_admin_client):
+    assert non_admin_client.get('/api/v1/users/cache-stats').status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_user_cache_invalidated_on_save_and_group_change(admin_client, non_admin_client):
+    from django.contrib.auth.models import Group  # noqa: PLC0415
+
+    User = get_user_model()
+    user = User.objects.get(username='new_user_non_admin')
+    admin_client.get(f'/api/v1/users/{user.id}')
+
+    user.first_name = 'Renamed'
+    user.save()
+    assert admin_client.get(f'/api/v1/users/{user.id}').json()['first_name'] == 'Renamed'
+
+    user.groups.add(Group.objects.create(name='staff-readers'))
+    assert admin_client.get(f'/api/v1/users/{user.id}').json()['groups'][0]['name'] == 'staff-readers'
+
+
+@pytest.mark.django_db
+def test_user_cache_is_keyed_by_viewer_role(admin_client, non_admin_client):
+    User = get_user_model()
+    user = User.objects.get(username='new_user_non_admin')
+
+    admin_client.get(f'/api/v1/users/{user.id}')
+    non_admin_client.get(f'/api/v1/users/{user.id}')
+    admin = User.objects.get(username=config('DJANGO_ADMIN_USER'))
+    response = non_admin_client.get(f'/api/v1/users/{admin.id}')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert user_response_cache.stats()['entries'] == 2  # noqa: PLR2004
+
+
 ##############
 # Password Reset
 ##############
@@ -850,6 +2095,7 @@ def test_request_password_reset_success(client):
     )
     assert response.status_code == HTTPStatus.CREATED
 
+    deliver_outbox()
     mail.outbox.clear()
 
     reset_payload = {'email': 'reset@test.com'}
@@ -861,6 +2107,22 @@ def test_request_password_reset_success(client):
     data = response.json()
     assert 'message' in data
     assert response.status_code == HTTPStatus.OK
+    deliver_outbox()
+    assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db
+def test_request_password_reset_email_case_insensitive(client):
+    User = get_user_model()  # NOSONAR
+    User.objects.create_user(username='reset_case', email='Reset.Case@Test.com', password='testpassword')
+
+    response = client.post(
+        '/api/v1/users/password-reset/request',
+        data=json.dumps({'email': 'reset.case@test.com'}),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.OK
+    deliver_outbox()
     assert len(mail.outbox) == 1
 
 
@@ -877,6 +2139,7 @@ def test_request_password_reset_non_existent_email(client):
 
     assert response.status_code == HTTPStatus.OK
     assert 'message' in data
+    deliver_outbox()
     assert len(mail.outbox) == 0
 
 
@@ -1118,3 +2381,291 @@ def test_validate_password_reset_token_already_used(client):
     assert response.status_code == HTTPStatus.OK
     assert data['valid'] is False
     assert 'used' in data['message'].lower()
+
+
+@pytest.mark.django_db
+def test_password_reset_signed_token(client, stateless_tokens):
+    User = get_user_model()  # NOSONAR
+    User.objects.create_user(username='signed_reset', email='signed_reset@test.com', password='oldpassword')
+
+    client.post(
+        '/api/v1/users/password-reset/request',
+        data=json.dumps({'email': 'signed_reset@test.com'}),
+        content_type='application/json',
+    )
+    token = signed_token_from_email('reset-password')
+    assert not PasswordResetToken.objects.exists()
+
+    response = client.get(f'/api/v1/users/password-reset/{token}/validate')
+    assert response.json() == {'valid': True, 'message': 'Token is valid'}
+
+    response = client.post(
+        f'/api/v1/users/password-reset/{token}/confirm',
+        data=json.dumps({'new_password': 'newpassword123'}),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert User.objects.get(username='signed_reset').check_password('newpassword123')
+
+    # A troca de senha muda o hash assinado: o link não vale mais
+    response = client.get(f'/api/v1/users/password-reset/{token}/validate')
+    assert response.json() == {'valid': False, 'message': 'Token has already been used'}
+    response = client.post(
+        f'/api/v1/users/password-reset/{token}/confirm',
+        data=json.dumps({'new_password': 'anotherpassword123'}),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_password_reset_signed_token_expired_and_wrong_purpose(client):
+    from myapi.users.tokens import activation_tokens, password_reset_tokens  # noqa: PLC0415
+
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='signed_reset', email='signed_reset@test.com', password='oldpassword')
+    with freeze_time(timezone.now() - timedelta(hours=1)):
+        expired = password_reset_tokens.make_token(user, 15)
+
+    response = client.get(f'/api/v1/users/password-reset/{expired}/validate')
+    assert response.json() == {'valid': False, 'message': 'Token has expired'}
+
+    # Token de ativação não serve para redefinir senha
+    activation = activation_tokens.make_token(user, 15)
+    response = client.get(f'/api/v1/users/password-reset/{activation}/validate')
+    assert response.json()['valid'] is False
+
+
+@pytest.mark.django_db
+def test_request_password_reset_coalesces_repeated_requests(client):
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='coalesce', email='coalesce@test.com', password='oldpassword')
+    now = timezone.now()
+
+    with freeze_time(now):
+        for _ in range(5):
+            response = client.post(
+                '/api/v1/users/password-reset/request',
+                data=json.dumps({'email': 'coalesce@test.com'}),
+                content_type='application/json',
+            )
+            assert response.json() == {'message': 'If email exists, a reset link will be sent'}
+
+    # Um token e um email só, não importa quantos pedidos na janela
+    assert PasswordResetToken.objects.filter(user=user).count() == 1
+    assert OutboxMessage.objects.filter(to=['coalesce@test.com']).count() == 1
+
+    with freeze_time(now + timedelta(minutes=6)):
+        client.post(
+            '/api/v1/users/password-reset/request',
+            data=json.dumps({'email': 'coalesce@test.com'}),
+            content_type='application/json',
+        )
+    assert PasswordResetToken.objects.filter(user=user).count() == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_request_password_reset_without_coalescing(client, settings):
+    settings.USERS_EMAIL_COALESCE_SECONDS = 0
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='coalesce', email='coalesce@test.com', password='oldpassword')
+
+    for _ in range(3):
+        client.post(
+            '/api/v1/users/password-reset/request',
+            data=json.dumps({'email': 'coalesce@test.com'}),
+            content_type='application/json',
+        )
+
+    assert PasswordResetToken.objects.filter(user=user).count() == 3  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_confirm_password_reset_reopens_coalescing_window(client):
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='coalesce', email='coalesce@test.com', password='oldpassword')
+    request_reset = {'data': json.dumps({'email': 'coalesce@test.com'}), 'content_type': 'application/json'}
+
+    client.post('/api/v1/users/password-reset/request', **request_reset)
+    token = PasswordResetToken.objects.get(user=user)
+    client.post(
+        f'/api/v1/users/password-reset/{token.id}/confirm',
+        data=json.dumps({'new_password': 'newpassword123'}),
+        content_type='application/json',
+    )
+    client.post('/api/v1/users/password-reset/request', **request_reset)
+
+    assert PasswordResetToken.objects.filter(user=user).count() == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_resend_activation_coalesces_repeated_requests(client):
+    User = get_user_model()  # NOSONAR
+    user = User.objects.create_user(username='coalesce', email='coalesce@test.com', is_active=False)
+    expired = ActivationToken.objects.create(user=user, expires_at=timezone.now() - timedelta(minutes=1))
+
+    for _ in range(3):
+        response = client.post(f'/api/v1/users/resend-activation/{expired.id}')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == 'coalesce'
+
+    assert ActivationToken.objects.filter(user=user).count() == 2  # noqa: PLR2004
+    assert OutboxMessage.objects.filter(to=['coalesce@test.com']).count() == 1
+
+
+@pytest.fixture
+def campaign_users():
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(username=f'camp_{i}', first_name=f'Nome{i}', email=f'camp_{i}@test.com', is_active=i != 4)  # noqa: PLR2004
+        for i in range(5)
+    ])
+    return sorted(users, key=lambda user: user.id)
+
+
+def new_campaign(**fields):
+    from myapi.users.models import Campaign  # noqa: PLC0415
+
+    fields = {
+        'name': 'Novidades',
+        'filters': {'is_active': True, 'is_staff': False},
+        'context': {'subject': 'Novidades da semana', 'message': 'Linha 1\nLinha 2'},
+        **fields,
+    }
+    return Campaign.objects.create(**fields)
+
+
+@pytest.mark.django_db
+def test_run_campaign_sends_to_filtered_users(campaign_users):
+    from myapi.users.campaigns import run_campaign  # noqa: PLC0415
+
+    filters = {'is_active': True, 'is_staff': False, 'joined_after': '2000-01-01T00:00:00Z'}
+
+    campaign = run_campaign(new_campaign(filters=filters), 2, 2, 0)
+
+    assert (campaign.status, campaign.total, campaign.sent, campaign.failed) == ('done', 4, 4, 0)
+    assert campaign.cursor == max(user.id for user in campaign_users if user.is_active)
+    assert campaign.finished_at is not None
+    assert sorted(email.to[0] for email in mail.outbox) == [f'camp_{i}@test.com' for i in range(4)]
+    email = next(email for email in mail.outbox if email.to == ['camp_0@test.com'])
+    assert email.subject == 'Novidades da semana'
+    assert 'Nome0' in email.body
+    assert '<p>Linha 1<br>Linha 2</p>' in email.alternatives[0].content
+
+
+@pytest.mark.django_db
+def test_run_campaign_resumes_from_checkpoint(campaign_users):
+    from myapi.users.campaigns import run_campaign  # noqa: PLC0415
+
+    active = [user for user in campaign_users if user.is_active]
+    # Worker anterior caiu depois de gravar o checkpoint do segundo usuário
+    campaign = new_campaign(status='running', cursor=active[1].id, sent=2, total=4, started_at=timezone.now())
+
+    campaign = run_campaign(campaign, 10, 1, 0)
+
+    assert sorted(email.to[0] for email in mail.outbox) == sorted(user.email for user in active[2:])
+    assert (campaign.status, campaign.total, campaign.sent) == ('done', 4, 4)
+
+
+@pytest.mark.django_db
+def test_run_campaign_stops_when_paused(campaign_users, monkeypatch):
+    from myapi.users import campaigns  # noqa: PLC0415
+    from myapi.users.models import Campaign  # noqa: PLC0415
+
+    checkpoint = campaigns.checkpoint
+
+    def pause_after_first_batch(campaign, last_id, results):
+        Campaign.objects.filter(pk=campaign.pk).update(status=Campaign.Status.PAUSED)
+        return checkpoint(campaign, last_id, results)
+
+    monkeypatch.setattr(campaigns, 'checkpoint', pause_after_first_batch)
+
+    campaign = campaigns.run_campaign(new_campaign(), 2, 1, 0)
+
+    active = [user for user in campaign_users if user.is_active]
+    assert (campaign.status, campaign.sent, campaign.cursor) == ('paused', 2, active[1].id)
+    assert len(mail.outbox) == 2  # noqa: PLR2004
+    # Pausada, a campanha não é pega pelo worker
+    assert campaigns.run_campaign(campaign).sent == 2  # noqa: PLR2004
+    assert not campaigns.pending_campaigns().exists()
+
+
+@pytest.mark.django_db
+def test_run_campaign_counts_failures(campaign_users, monkeypatch):
+    from infra import mailer  # noqa: PLC0415
+    from myapi.users.campaigns import run_campaign  # noqa: PLC0415
+
+    send_message = mailer.send_message
+
+    def send(mailOptions, connection=None):
+        if mailOptions['to'] == ['camp_1@test.com']:
+            raise ConnectionError('SMTP recusou')
+        return send_message(mailOptions, connection=connection)
+
+    monkeypatch.setattr(mailer, 'send_message', send)
+
+    campaign = run_campaign(new_campaign(), 3, 2, 0)
+
+    assert (campaign.status, campaign.sent, campaign.failed) == ('done', 3, 1)
+    assert campaign.last_error == 'SMTP recusou'
+
+
+@pytest.mark.django_db
+def test_run_campaigns_command(campaign_users):
+    from io import StringIO  # noqa: PLC0415
+
+    from django.core.management import call_command  # noqa: PLC0415
+
+    new_campaign()
+    out = StringIO()
+
+    call_command('run_campaigns', '--once', '--rate', '0', stdout=out)
+
+    assert out.getvalue().startswith('Novidades: done, 4 enviados, 0 falhas de 4')
+    assert len(mail.outbox) == 4  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_campaign_api(admin_client, non_admin_client, campaign_users):
+    payload = {
+        'name': 'Novidades',
+        'filter': {'is_staff': False},
+        'context': {'subject': 'Oi', 'message': 'Bem-vindo'},
+    }
+
+    response = admin_client.post('/api/v1/users/campaigns', data=json.dumps(payload), content_type='application/json')
+    assert response.status_code == HTTPStatus.CREATED
+    campaign = response.json()
+    assert (campaign['status'], campaign['template'], campaign['processed']) == ('queued', 'announcement', 0)
+    url = f'/api/v1/users/campaigns/{campaign["id"]}'
+
+    assert admin_client.post(f'{url}/pause').json()['status'] == 'paused'
+    assert admin_client.post(f'{url}/pause').status_code == HTTPStatus.CONFLICT
+    assert admin_client.post(f'{url}/resume').json()['status'] == 'queued'
+    assert admin_client.get(url).json()['name'] == 'Novidades'
+    assert admin_client.get(f'/api/v1/users/campaigns/{uuid.uuid4()}').status_code == HTTPStatus.NOT_FOUND
+    assert non_admin_client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('template', ['nao_existe', '../activation', 'emails/activation', 'activation'])
+def test_campaign_api_unknown_template(admin_client, template):
+    response = admin_client.post(
+        '/api/v1/users/campaigns',
+        data=json.dumps({'name': 'X', 'template': template}),
+        content_type='application/json',
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_run_campaign_skips_inactive_users_by_default(campaign_users):
+    from myapi.users.campaigns import run_campaign  # noqa: PLC0415
+
+    campaign = run_campaign(new_campaign(filters={'is_staff': False}), 10, 1, 0)
+
+    assert campaign.total == 4  # noqa: PLR2004
+    assert 'camp_4@test.com' not in [email.to[0] for email in mail.outbox]
+    # Filtro explícito alcança os não ativados
+    assert run_campaign(new_campaign(filters={'is_active': False}), 10, 1, 0).total == 1